@@ -3,6 +3,13 @@ ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The live attendance stream (/api/events/attendance/, students.events) needs this
+entry point. Under WSGI that view answers 503 and clients keep polling. Serve the
+app through an ASGI worker instead, for example
+``gunicorn config.asgi:application -k uvicorn.workers.UvicornWorker``.
+Each worker keeps its own subscribers. Changes made in other workers reach
+them through a per-topic database poll every EVENTS_POLL_SECONDS.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
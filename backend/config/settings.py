@@ -51,12 +51,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "students.middleware.SlowQueryMiddleware",  # 느린 쿼리 + EXPLAIN 기록
+    "students.middleware.MetricsMiddleware",  # 요청 지연시간/쿼리 수 메트릭
+    "students.middleware.CompressionMiddleware",  # 큰 응답 gzip 압축
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",  # CORS middleware
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "students.middleware.ReplicaRoutingMiddleware",  # 조회 요청을 읽기 복제 DB 로 라우팅
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -117,6 +121,80 @@ else:
         }
     }
 
+# 읽기 전용 복제 DB (선택). 설정하면 목록/대시보드/통계 조회가 복제 DB 를 사용한다
+# 로컬에서는 sqlite:////path/to/replica.sqlite3 처럼 두 번째 SQLite 파일로 시험할 수 있다
+REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+
+if REPLICA_DATABASE_URL:
+    DATABASES["replica"] = dj_database_url.parse(
+        REPLICA_DATABASE_URL,
+        conn_max_age=600,
+        # SQLite 연결에는 sslmode 옵션이 없음
+        ssl_require=os.getenv("DB_SSL_REQUIRE", "True") == "True"
+        and not REPLICA_DATABASE_URL.startswith("sqlite"),
+    )
+    # 테스트에서는 별도 DB 를 만들지 않고 기본 DB 를 그대로 사용
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+    DATABASE_ROUTERS = ["students.routers.ReplicaRouter"]
+
+# 쓰기 요청 후 해당 사용자의 읽기를 기본 DB 로 고정하는 시간 (초, 복제 지연보다 길게, 서명된 쿠키로 표시)
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+
+
+# Cache
+# REDIS_URL 이 있으면 워커 간 공유 캐시(Redis, redis 패키지 필요)를 사용
+# 없으면 워커별 메모리 캐시를 사용하며, 캐시 무효화 버전은 DB(CacheVersion)에 둔다 (students.caching)
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# 세션 저장소 (예: django.contrib.sessions.backends.cached_db)
+SESSION_ENGINE = os.getenv("SESSION_ENGINE", "django.contrib.sessions.backends.db")
+
+# 캐시된 인증 주체(사용자 + 권한 과목) 유지 시간 (초)
+PRINCIPAL_CACHE_TIMEOUT = int(os.getenv("PRINCIPAL_CACHE_TIMEOUT", "300"))
+
+# 학생별 성적/출석 추이 캐시 유지 시간 (초). 기록이 바뀌면 캐시 키가 달라진다
+TREND_CACHE_TIMEOUT = int(os.getenv("TREND_CACHE_TIMEOUT", "3600"))
+
+# 과목/반 참조 데이터 캐시가 공유 버전을 확인하는 간격 (초). 변경은 이 시간 안에 모든 워커에 반영된다
+REFERENCE_CACHE_CHECK_SECONDS = float(os.getenv("REFERENCE_CACHE_CHECK_SECONDS", "1"))
+# 버전이 그대로여도 참조 데이터를 다시 읽는 최대 보관 시간 (초)
+REFERENCE_CACHE_TTL = float(os.getenv("REFERENCE_CACHE_TTL", "60"))
+
+# 대시보드/시험 통계 캐시 유지 시간 (초). 기록이 바뀌면 기록 버전이 올라 캐시 키가 달라진다
+REPORT_CACHE_TIMEOUT = int(os.getenv("REPORT_CACHE_TIMEOUT", "3600"))
+
+# 첫 화면 데이터(/api/bootstrap/) 캐시 유지 시간 (초). 사용자/과목/반/반 배정이 바뀌면 캐시 키가 달라진다
+BOOTSTRAP_CACHE_TIMEOUT = int(os.getenv("BOOTSTRAP_CACHE_TIMEOUT", "3600"))
+
+# 증분 동기화 삭제 기록 보존 기간 (일). 이보다 오래된 since 는 전체 다시 불러오기(reset)로 응답한다
+SYNC_TOMBSTONE_DAYS = int(os.getenv("SYNC_TOMBSTONE_DAYS", "30"))
+
+# 증분 동기화/실시간 이벤트 watermark 를 요청 시각보다 앞당기는 최소 시간 (초).
+# MySQL 에서는 열려 있는 쓰기 트랜잭션 중 가장 오래된 것의 시작 시각까지 더 앞당긴다
+SYNC_OVERLAP_SECONDS = float(os.getenv("SYNC_OVERLAP_SECONDS", "30"))
+
+# 실시간 출석 이벤트: 다른 워커의 변경을 조회하는 간격과 연결 유지용 빈 이벤트 간격 (초)
+EVENTS_POLL_SECONDS = float(os.getenv("EVENTS_POLL_SECONDS", "5"))
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+
+# 학년도 시작 월 (3월). 지난 학년도 기록은 archive_school_year 명령으로 보관 테이블로 옮긴다
+SCHOOL_YEAR_START_MONTH = int(os.getenv("SCHOOL_YEAR_START_MONTH", "3"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -190,13 +268,38 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.SessionAuthentication",
+        "students.authentication.CachedSessionAuthentication",
         "rest_framework.authentication.BasicAuthentication",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "students.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "students.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
+# 이 크기(바이트) 이상인 응답만 gzip 으로 압축
+GZIP_MIN_LENGTH = int(os.getenv("GZIP_MIN_LENGTH", "1024"))
+
 # BizM Alimtalk Settings
 BIZM_API_URL = os.getenv("BIZM_API_URL", "https://alimtalk-api.bizmsg.kr/v2/sender/send")
 BIZM_USER_ID = os.getenv("BIZM_USER_ID", "")
 BIZM_PROFILE_KEY = os.getenv("BIZM_PROFILE_KEY", "")
 BIZM_TEMPLATE_ID = os.getenv("BIZM_TEMPLATE_ID", "")
+
+# Metrics Settings
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True") == "True"
+# gunicorn 워커 간 메트릭 합산과 느린 쿼리 로그 공유를 위한 디렉터리 (비어 있으면 워커별 집계)
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+# Prometheus 수집기용 Bearer 토큰 (비어 있으면 관리자 세션만 허용)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Slow Query Log Settings (임계값 0 이면 비활성화)
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "100"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "True") == "True"
@@ -18,7 +18,14 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from students.admin import slow_query_log_view
+
 urlpatterns = [
+    path(
+        "admin/slow-queries/",
+        admin.site.admin_view(slow_query_log_view),
+        name="admin-slow-queries",
+    ),
     path("admin/", admin.site.urls),
     path("api/", include("students.urls")),
 ]
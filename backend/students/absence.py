@@ -0,0 +1,80 @@
+"""
+결석 계산
+
+반의 수업일(출석 기록이 있는 날짜)마다 그날 등록되어 있던 학생(Enrollment 기간 기준) 중
+출석 기록이 없는 학생을 결석으로 본다. 현재 명단이 아니라 등록 기간을 쓰므로
+지난 달도 당시 명단으로 계산되고, 반과 기간에 관계없이 쿼리 2번으로 끝난다.
+"""
+
+from django.db.models import Q
+
+from .models import Attendance, Enrollment
+
+
+def enrollment_periods(class_info, first, last):
+    """기간과 겹치는 등록 기간: {학생 id: (이름, [(시작일, 종료일 또는 None), ...])}"""
+    rows = (
+        Enrollment.objects.filter(class_info=class_info, start_date__lte=last)
+        .filter(Q(end_date__isnull=True) | Q(end_date__gt=first))
+        .values_list("student_id", "student__name", "start_date", "end_date")
+    )
+    periods = {}
+    for student_id, name, start_date, end_date in rows:
+        periods.setdefault(student_id, (name, []))[1].append((start_date, end_date))
+    return periods
+
+
+def is_enrolled(spans, date):
+    return any(start <= date and (end is None or date < end) for start, end in spans)
+
+
+def class_absences(class_info, first, last):
+    """
+    반의 기간 내 날짜별/학생별 출석 현황
+
+    dates: 수업일별 등록 인원(expected), present, late, absent 와 결석 학생 id
+    students: 결석이 있는 학생별 결석 횟수와 날짜
+    """
+    records = (
+        Attendance.objects.filter(class_info=class_info, date__range=(first, last))
+        .order_by()
+        .values_list("student_id", "date", "is_late")
+    )
+    attended = {}
+    for student_id, date, is_late in records:
+        attended.setdefault(date, {})[student_id] = is_late
+
+    periods = enrollment_periods(class_info, first, last)
+
+    dates = []
+    absent_by_student = {}
+    for date in sorted(attended):
+        rows = attended[date]
+        expected = [pk for pk, (_, spans) in periods.items() if is_enrolled(spans, date)]
+        absent_ids = sorted(pk for pk in expected if pk not in rows)
+        late = sum(1 for is_late in rows.values() if is_late)
+        dates.append(
+            {
+                "date": date.isoformat(),
+                "expected": len(expected),
+                "present": len(rows) - late,
+                "late": late,
+                "absent": len(absent_ids),
+                "absent_student_ids": absent_ids,
+            }
+        )
+        for pk in absent_ids:
+            absent_by_student.setdefault(pk, []).append(date.isoformat())
+
+    students = [
+        {
+            "student_id": pk,
+            "student_name": periods[pk][0],
+            "absent_count": len(absent_dates),
+            "absent_dates": absent_dates,
+        }
+        for pk, absent_dates in sorted(
+            absent_by_student.items(), key=lambda item: (periods[item[0]][0], item[0])
+        )
+    ]
+    return {"dates": dates, "students": students}
@@ -1,6 +1,14 @@
-from django.contrib import admin
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
 from django.contrib.auth.admin import UserAdmin
-from .models import Subject, User, Class, Student, Attendance, Exam
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from .models import Subject, User, Class, Student, Enrollment, Attendance, Exam
+from .rollover import WITHDRAWN_CLASS_NAME, apply_rollover
+from .slow_queries import slow_query_log
 
 
 @admin.register(Subject)
@@ -22,6 +30,18 @@ class CustomUserAdmin(UserAdmin):
     )
 
 
+class RolloverClassForm(forms.Form):
+    """반 복제 액션에서 새 반 하나의 이름/요일/시간"""
+
+    source = forms.IntegerField(widget=forms.HiddenInput)
+    name = forms.CharField(label="새 반 이름", min_length=2, max_length=100)
+    day_of_week = forms.ChoiceField(label="요일", choices=Class.DayOfWeek.choices)
+    start_time = forms.TimeField(label="시작 시간")
+
+
+RolloverClassFormSet = forms.formset_factory(RolloverClassForm, extra=0)
+
+
 @admin.register(Class)
 class ClassAdmin(admin.ModelAdmin):
     list_display = [
@@ -36,20 +56,101 @@ class ClassAdmin(admin.ModelAdmin):
     search_fields = ["name"]
     ordering = ["-created_at"]
 
+    actions = ["rollover_classes"]
+
     def student_count(self, obj):
         return obj.students.count()
 
     student_count.short_description = "학생 수"
 
+    @admin.action(description="선택한 반을 다음 학기 반으로 복제 (학생 배정 복사)")
+    def rollover_classes(self, request, queryset):
+        """
+        새 반의 이름/요일/시간을 입력받는 확인 화면을 보여주고, 제출하면 복제
+
+        미등록 학생 퇴원 처리 등은 rollover_semester 명령의 계획 파일로 지정한다.
+        """
+        sources = list(queryset.exclude(name=WITHDRAWN_CLASS_NAME).order_by("pk"))
+        if not sources:
+            self.message_user(request, "복제할 반을 선택해주세요.", messages.WARNING)
+            return None
+
+        if "apply" in request.POST:
+            formset = RolloverClassFormSet(request.POST, prefix="rollover")
+            if formset.is_valid():
+                plan = {
+                    "classes": [
+                        {
+                            "source": form["source"],
+                            "name": form["name"],
+                            "day_of_week": form["day_of_week"],
+                            "start_time": form["start_time"],
+                        }
+                        for form in formset.cleaned_data
+                    ],
+                    "keep_source": True,
+                    "withdraw_non_returning": False,
+                }
+                try:
+                    summary = apply_rollover(plan)
+                except ValueError as e:
+                    self.message_user(request, str(e), messages.ERROR)
+                else:
+                    self.message_user(
+                        request,
+                        f"{len(summary['classes'])}개 반을 복제하고 "
+                        f"{summary['added']}명의 학생을 배정했습니다.",
+                        messages.SUCCESS,
+                    )
+                    return None
+        else:
+            formset = RolloverClassFormSet(
+                prefix="rollover",
+                initial=[
+                    {
+                        "source": source.pk,
+                        "name": f"{source.name} (다음 학기)",
+                        "day_of_week": source.day_of_week,
+                        "start_time": source.start_time,
+                    }
+                    for source in sources
+                ],
+            )
+
+        context = {
+            **self.admin_site.each_context(request),
+            "title": "다음 학기 반으로 복제",
+            "opts": self.model._meta,
+            "rows": zip(sources, formset.forms),
+            "formset": formset,
+            "selected": [source.pk for source in sources],
+            "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(request, "admin/students/class/rollover.html", context)
+
 
 @admin.register(Student)
 class StudentAdmin(admin.ModelAdmin):
     list_display = ["name", "parent_phone", "student_phone", "created_at"]
     list_filter = ["classes__subject__name", "classes", "created_at"]
-    search_fields = ["name", "parent_phone", "student_phone"]
+    search_fields = [
+        "name",
+        "parent_phone",
+        "student_phone",
+        "parent_phone_digits",
+        "student_phone_digits",
+    ]
     ordering = ["-created_at"]
 
 
+@admin.register(Enrollment)
+class EnrollmentAdmin(admin.ModelAdmin):
+    list_display = ["student", "class_info", "start_date", "end_date"]
+    list_filter = ["class_info__subject__name", "class_info", "end_date"]
+    search_fields = ["student__name", "class_info__name"]
+    ordering = ["-start_date"]
+
+
 @admin.register(Attendance)
 class AttendanceAdmin(admin.ModelAdmin):
     list_display = [
@@ -74,3 +175,23 @@ class ExamAdmin(admin.ModelAdmin):
     list_filter = ["score", "created_at", "attendance__class_info__subject__name"]
     search_fields = ["name", "attendance__student__name"]
     ordering = ["-created_at"]
+
+
+def slow_query_log_view(request):
+    """느린 쿼리 로그 조회 (슈퍼유저 전용)"""
+    if not request.user.is_superuser:
+        raise PermissionDenied
+
+    if request.method == "POST":
+        slow_query_log.clear()
+        return redirect("admin-slow-queries")
+
+    context = {
+        **admin.site.each_context(request),
+        "title": "느린 쿼리 로그",
+        "entries": slow_query_log.entries(),
+        "threshold_ms": settings.SLOW_QUERY_THRESHOLD_MS,
+        "capacity": settings.SLOW_QUERY_LOG_SIZE,
+        "shared": slow_query_log.shared_path() is not None,
+    }
+    return TemplateResponse(request, "admin/students/slow_query_log.html", context)
@@ -0,0 +1,145 @@
+"""
+학년도 단위 기록 보관
+
+끝난 학년도의 출석/시험 기록을 ArchivedAttendance / ArchivedExam 으로 옮겨
+일상적인 조회와 집계가 진행 중인 학년도의 기록만 읽도록 한다.
+복사는 INSERT ... SELECT 한 번씩으로 DB 안에서 처리하고, 원래 id 를 유지하므로 복원할 수 있다.
+"""
+
+import datetime
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .caching import bump_records_version
+from .deletion import _raw_delete
+from .sync import forget_deletions, record_deletions
+from .models import ArchivedAttendance, ArchivedExam, Attendance, Exam
+
+
+def school_year_of(date):
+    """날짜가 속한 학년도 (SCHOOL_YEAR_START_MONTH 부터 다음 해 그 전 달까지)"""
+    if date.month >= settings.SCHOOL_YEAR_START_MONTH:
+        return date.year
+    return date.year - 1
+
+
+def school_year_range(year):
+    """학년도의 (첫날, 마지막날)"""
+    start_month = settings.SCHOOL_YEAR_START_MONTH
+    first = datetime.date(year, start_month, 1)
+    last = datetime.date(year + 1, start_month, 1) - datetime.timedelta(days=1)
+    return first, last
+
+
+def _columns(model):
+    return [field.column for field in model._meta.concrete_fields]
+
+
+def _copy(source, target, columns, where, params, join=None, extra_columns=(), extra_params=()):
+    """source 테이블의 columns 를 target 테이블로 INSERT ... SELECT"""
+    qn = connection.ops.quote_name
+    source_table = qn(source._meta.db_table)
+    insert_columns = [qn(column) for column in columns] + [qn(c) for c in extra_columns]
+    select_columns = [f"src.{qn(column)}" for column in columns] + ["%s"] * len(extra_columns)
+    sql = (
+        f"INSERT INTO {qn(target._meta.db_table)} ({', '.join(insert_columns)}) "
+        f"SELECT {', '.join(select_columns)} FROM {source_table} src "
+        f"{join or ''} WHERE {where}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*extra_params, *params])
+        return cursor.rowcount
+
+
+def archive_school_year(year, dry_run=False):
+    """
+    학년도의 출석/시험 기록을 보관 테이블로 옮기고 옮긴 행 수를 반환
+
+    진행 중인 학년도와 그 이후는 보관할 수 없다.
+    """
+    if year >= school_year_of(timezone.localdate()):
+        raise ValueError(f"{year}학년도는 아직 끝나지 않아 보관할 수 없습니다.")
+
+    first, last = school_year_range(year)
+    attendances = Attendance.objects.filter(date__range=(first, last))
+    exams = Exam.objects.filter(attendance__date__range=(first, last))
+    if dry_run:
+        return {"attendances": attendances.count(), "exams": exams.count()}
+
+    qn = connection.ops.quote_name
+    date_params = [
+        connection.ops.adapt_datefield_value(first),
+        connection.ops.adapt_datefield_value(last),
+    ]
+    extra_params = [year, connection.ops.adapt_datetimefield_value(timezone.now())]
+
+    with transaction.atomic():
+        attendance_count = _copy(
+            Attendance,
+            ArchivedAttendance,
+            _columns(Attendance),
+            f"src.{qn('date')} BETWEEN %s AND %s",
+            date_params,
+            extra_columns=("school_year", "archived_at"),
+            extra_params=extra_params,
+        )
+        exam_count = _copy(
+            Exam,
+            ArchivedExam,
+            _columns(Exam),
+            f"att.{qn('date')} BETWEEN %s AND %s",
+            date_params,
+            join=(
+                f"INNER JOIN {qn(Attendance._meta.db_table)} att "
+                f"ON att.{qn('id')} = src.{qn('attendance_id')}"
+            ),
+            extra_columns=("school_year", "archived_at"),
+            extra_params=extra_params,
+        )
+        # 복사한 행은 시그널 없이 집합 단위로 지우고 삭제 기록과 집계 캐시 무효화는 직접 처리
+        record_deletions(exams)
+        record_deletions(attendances)
+        _raw_delete(exams)
+        _raw_delete(attendances)
+        bump_records_version()
+
+    return {"attendances": attendance_count, "exams": exam_count}
+
+
+def restore_school_year(year, dry_run=False):
+    """보관된 학년도의 기록을 원래 테이블로 되돌리고 되돌린 행 수를 반환"""
+    attendances = ArchivedAttendance.objects.filter(school_year=year)
+    exams = ArchivedExam.objects.filter(school_year=year)
+    if dry_run:
+        return {"attendances": attendances.count(), "exams": exams.count()}
+
+    qn = connection.ops.quote_name
+    # 시험이 출석을 참조하므로 출석부터 되돌리고, 보관 테이블은 시험부터 지운다
+    with transaction.atomic():
+        attendance_count = _copy(
+            ArchivedAttendance,
+            Attendance,
+            _columns(Attendance),
+            f"src.{qn('school_year')} = %s",
+            [year],
+        )
+        exam_count = _copy(
+            ArchivedExam,
+            Exam,
+            _columns(Exam),
+            f"src.{qn('school_year')} = %s",
+            [year],
+        )
+        # 복원된 행이 증분 동기화에 잡히도록 수정일을 갱신하고 삭제 기록을 지움
+        now = timezone.now()
+        Attendance.objects.filter(pk__in=attendances.values("pk")).update(updated_at=now)
+        Exam.objects.filter(pk__in=exams.values("pk")).update(updated_at=now)
+        forget_deletions(Attendance, attendances)
+        forget_deletions(Exam, exams)
+        exams.delete()
+        attendances.delete()
+        bump_records_version()
+
+    return {"attendances": attendance_count, "exams": exam_count}
@@ -0,0 +1,97 @@
+"""
+캐시된 인증 주체(principal)
+
+SessionAuthentication 은 요청마다 세션 행과 User 행을 읽고, 접근 검사마다 user.subjects 를
+다시 조회한다. 여기서는 User 객체와 권한 과목 id 목록을 (세션 키, 사용자 버전) 단위로 캐시한다.
+사용자 버전은 User 저장/삭제나 권한 과목 변경 시 signals 에서 커밋 후에 올린다.
+
+비활성화, 비밀번호/역할 변경이 모든 워커에 바로 반영되어야 하므로 principal 은 워커 간
+공유 캐시에만 둔다. 기본 캐시가 워커별 메모리 캐시이면 요청마다 세션의 사용자를 다시 읽는다.
+"""
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY, get_user
+from django.core.cache import cache
+from rest_framework.authentication import SessionAuthentication
+
+from .caching import bump_version_on_commit, get_version, shared_cache
+from .models import User
+
+
+def _version_key(user_id):
+    return f"principal:version:{user_id}"
+
+
+def get_user_version(user_id):
+    return get_version(_version_key(user_id))
+
+
+def bump_user_version(user_id):
+    bump_version_on_commit(_version_key(user_id))
+
+
+def _principal_key(session_key, user_id):
+    return f"principal:{session_key}:{user_id}:{get_user_version(user_id)}"
+
+
+def _load_user(request):
+    """Django 의 get_user 로 검증한 사용자와 권한 과목 id 목록 (없으면 None)"""
+    # 백엔드, 세션 인증 해시(비밀번호 변경 여부) 검증은 Django 가 수행
+    user = get_user(request)
+    if not user.is_authenticated:
+        return None
+    # 버전을 올린 직후에도 정확하도록 참조 데이터 캐시가 아닌 기본 DB 에서 읽음
+    subject_ids = list(
+        User.subjects.through.objects.using("default")
+        .filter(user_id=user.pk)
+        .values_list("subject_id", flat=True)
+    )
+    return {"user": user, "role": user.role, "subject_ids": subject_ids}
+
+
+def load_principal(request):
+    """
+    세션에 로그인된 사용자를 공유 캐시에서 가져오거나, 없으면 Django 의 get_user 로 검증 후 캐시
+    (워커별 메모리 캐시이면 캐시하지 않고 매번 검증)
+    """
+    session = request.session
+    user_id = session.get(SESSION_KEY)
+    if user_id is None or not session.session_key:
+        return None
+
+    if shared_cache():
+        key = _principal_key(session.session_key, user_id)
+        principal = cache.get(key)
+        if principal is None:
+            principal = _load_user(request)
+            if principal is not None:
+                cache.set(key, principal, settings.PRINCIPAL_CACHE_TIMEOUT)
+    else:
+        principal = _load_user(request)
+    if principal is None:
+        return None
+
+    user = principal["user"]
+    user._subject_ids = list(principal["subject_ids"])
+    return user
+
+
+class CachedSessionAuthentication(SessionAuthentication):
+    """
+    캐시된 principal 을 사용하는 SessionAuthentication
+    """
+
+    def authenticate(self, request):
+        django_request = request._request
+        user = getattr(django_request, "_cached_principal", None)
+        if user is None:
+            user = load_principal(django_request)
+        if not user or not user.is_active:
+            return None
+
+        # AuthenticationMiddleware 의 지연 로딩 user 를 대체하여 중복 조회를 막음
+        django_request._cached_principal = user
+        django_request.user = user
+
+        self.enforce_csrf(request)
+        return (user, None)
@@ -0,0 +1,219 @@
+"""
+참조 데이터 캐시
+
+과목, 반(이름/과목/요일/시간), 사용자별 권한 과목은 학기 중에 거의 바뀌지 않지만
+목록 조회, 접근 검사, 반 중복 검사마다 다시 조회된다. 여기서는 이 데이터를 프로세스 메모리에
+보관하고, 모든 워커가 함께 보는 버전 번호로 유효성을 확인한다.
+Subject/Class 저장·삭제와 권한 과목 변경 시 signals 에서 버전을 올리면 모든 워커가 다음 확인 때
+다시 읽는다. 평상시 조회는 DB 를 거치지 않는다.
+
+같은 방식의 기록(records) 버전은 출석/시험/학생/반 배정이 바뀔 때 올라가며,
+reports 모듈의 집계 캐시 키에 들어간다. 반 배정(roster) 버전은 반 배정이 바뀔 때만 올라가므로
+출석 체크가 잦은 시간에도 반별 학생 수만 담은 캐시(/api/bootstrap/)는 유지된다.
+
+버전 번호는 기본 캐시가 워커 간 공유 캐시(Redis 등)이면 캐시에, 워커별 메모리 캐시
+(LocMemCache, DummyCache)이면 CacheVersion 테이블에 둔다. 워커별 캐시에 두면
+다른 워커의 변경이 보이지 않기 때문이다.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import CacheVersion, Class, Subject, User
+
+REFERENCE_VERSION_KEY = "reference:version"
+RECORDS_VERSION_KEY = "records:version"
+ROSTER_VERSION_KEY = "roster:version"
+
+
+def shared_cache():
+    """기본 캐시를 모든 워커가 함께 쓰는지 (워커별 메모리 캐시가 아닌지)"""
+    return not isinstance(caches["default"], (LocMemCache, DummyCache))
+
+
+def _get_db_version(key):
+    return (
+        CacheVersion.objects.using("default")
+        .filter(name=key)
+        .values_list("version", flat=True)
+        .first()
+        or 0
+    )
+
+
+def _incr_db_version(key):
+    versions = CacheVersion.objects.using("default")
+    if versions.filter(name=key).update(version=F("version") + 1):
+        return
+    try:
+        with transaction.atomic(using="default"):
+            versions.create(name=key, version=1)
+    except IntegrityError:
+        # 다른 워커가 먼저 만들었으면 그 행을 올림
+        versions.filter(name=key).update(version=F("version") + 1)
+
+
+def get_version(key):
+    if not shared_cache():
+        return _get_db_version(key)
+    version = cache.get(key)
+    if version is None:
+        # 캐시에서 밀려난 뒤 1부터 다시 세면 예전 버전과 겹칠 수 있으므로 시각을 초기값으로 사용
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def incr_version(key):
+    if not shared_cache():
+        _incr_db_version(key)
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def bump_version_on_commit(key, callback=None):
+    """
+    트랜잭션 커밋 후 버전을 올림
+
+    커밋 전에 올리면 다른 워커가 이전 데이터를 새 버전으로 읽어 캐시할 수 있다.
+    """
+
+    def bump():
+        incr_version(key)
+        if callback is not None:
+            callback()
+
+    transaction.on_commit(bump)
+
+
+def get_reference_version():
+    return get_version(REFERENCE_VERSION_KEY)
+
+
+def bump_reference_version():
+    """참조 데이터 버전을 커밋 후에 올리고, 이 프로세스의 참조 데이터는 바로 버림"""
+    bump_version_on_commit(REFERENCE_VERSION_KEY, lambda: reference.expire())
+
+
+def get_records_version():
+    """출석/시험/학생/반 배정 기록 버전 (대시보드, 시험 통계 캐시 키에 사용)"""
+    return get_version(RECORDS_VERSION_KEY)
+
+
+def bump_records_version():
+    """기록이 바뀌면 커밋 후 기록 버전을 올려 캐시된 집계를 모두 무효화"""
+    bump_version_on_commit(RECORDS_VERSION_KEY)
+
+
+def get_roster_version():
+    """반 배정 버전 (반별 학생 수를 담는 캐시 키에 사용)"""
+    return get_version(ROSTER_VERSION_KEY)
+
+
+def bump_roster_version():
+    """반에 학생이 추가/제외되거나 학생이 삭제되면 커밋 후 반 배정 버전을 올림"""
+    bump_version_on_commit(ROSTER_VERSION_KEY)
+
+
+class ReferenceCache:
+    """
+    프로세스 내 참조 데이터
+
+    버전이 바뀌거나 REFERENCE_CACHE_TTL 이 지나면 통째로 다시 읽는다.
+    TTL 은 버전 확인이 실패하는 경우(버전 캐시 장애, DB 밖에서 고친 데이터 등)에도
+    오래된 데이터가 계속 쓰이지 않도록 하는 상한이다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = None
+        self._version = None
+        self._checked_at = 0.0
+        self._loaded_at = 0.0
+
+    def expire(self):
+        """이 프로세스의 데이터를 버려 다음 조회 때 다시 읽도록 함"""
+        with self._lock:
+            self._data = None
+            self._checked_at = 0.0
+
+    def _get(self, force_check=False):
+        now = time.monotonic()
+        interval = getattr(settings, "REFERENCE_CACHE_CHECK_SECONDS", 1.0)
+        ttl = getattr(settings, "REFERENCE_CACHE_TTL", 60.0)
+        data = self._data
+        if (
+            data is not None
+            and not force_check
+            and now - self._checked_at < interval
+            and now - self._loaded_at < ttl
+        ):
+            return data
+
+        version = get_reference_version()
+        with self._lock:
+            if self._data is None or self._version != version or now - self._loaded_at >= ttl:
+                self._data = self._load()
+                self._version = version
+                self._loaded_at = now
+            self._checked_at = now
+            return self._data
+
+    def _load(self):
+        # 복제 DB 라우팅 중이어도 지연 없는 기본 DB 에서 읽음
+        subjects = list(Subject.objects.using("default").order_by("id").values("id", "name"))
+        classes = {
+            row["id"]: row
+            for row in Class.objects.using("default").values(
+                "id", "name", "subject_id", "day_of_week", "start_time"
+            )
+        }
+        user_subjects = {}
+        for user_id, subject_id in (
+            User.subjects.through.objects.using("default").values_list("user_id", "subject_id")
+        ):
+            user_subjects.setdefault(user_id, []).append(subject_id)
+        return {"subjects": subjects, "classes": classes, "user_subjects": user_subjects}
+
+    def version(self):
+        self._get()
+        return self._version
+
+    def subjects(self):
+        """SubjectSerializer 와 같은 모양의 과목 목록"""
+        return [dict(row) for row in self._get()["subjects"]]
+
+    def classes(self):
+        """{반 id: {"id", "name", "subject_id", "day_of_week", "start_time"}}"""
+        return self._get()["classes"]
+
+    def get_class(self, class_id):
+        """
+        반 정보. 없으면 버전을 바로 다시 확인한다
+
+        다른 워커에서 방금 만든 반이 확인 간격 동안 없는 반으로 처리되지 않도록 한다.
+        """
+        try:
+            class_id = int(class_id)
+        except (TypeError, ValueError):
+            return None
+        row = self.classes().get(class_id)
+        if row is None:
+            row = self._get(force_check=True)["classes"].get(class_id)
+        return row
+
+    def user_subject_ids(self, user_id):
+        return list(self._get()["user_subjects"].get(user_id, []))
+
+
+reference = ReferenceCache()
@@ -0,0 +1,73 @@
+"""
+집합 단위 삭제
+
+Django 의 기본 CASCADE 는 삭제할 행을 모두 메모리로 읽어 온 뒤 지우므로
+출석/시험 기록이 많은 학생을 지우면 행 수만큼 느려진다.
+여기서는 관계 테이블마다 DELETE 한 번씩을 한 트랜잭션 안에서 실행하고,
+삭제 건수는 DELETE 결과의 rowcount 를 그대로 사용한다.
+(_raw_delete 는 시그널과 Python 측 CASCADE 를 거치지 않으므로 관계 테이블을 모두 직접 지우고,
+집계 캐시의 기록 버전과 증분 동기화용 삭제 기록도 직접 남긴다)
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import events
+from .caching import bump_records_version, bump_roster_version
+from .sync import record_deletions
+from .models import (
+    ArchivedAttendance,
+    ArchivedExam,
+    Attendance,
+    Class,
+    Enrollment,
+    Exam,
+    Student,
+)
+
+
+def _raw_delete(queryset):
+    return queryset._raw_delete(queryset.db)
+
+
+def delete_student(student):
+    """학생과 출석/시험(보관분 포함), 반 배정, 등록 기간을 삭제하고 삭제 건수를 반환"""
+    pk = student.pk
+    with transaction.atomic():
+        # 반 배정이 사라지므로 조건부 GET 검증값이 바뀌도록 반의 updated_at 을 갱신
+        Class.objects.filter(students=pk).update(updated_at=timezone.now())
+
+        exams = Exam.objects.filter(attendance__student_id=pk)
+        attendances = Attendance.objects.filter(student_id=pk)
+        record_deletions(exams)
+        record_deletions(attendances)
+        record_deletions(Student.objects.filter(pk=pk))
+        counts = {
+            "exams": _raw_delete(exams),
+            "attendances": _raw_delete(attendances),
+            "archived_exams": _raw_delete(
+                ArchivedExam.objects.filter(attendance__student_id=pk)
+            ),
+            "archived_attendances": _raw_delete(
+                ArchivedAttendance.objects.filter(student_id=pk)
+            ),
+        }
+        _raw_delete(Enrollment.objects.filter(student_id=pk))
+        _raw_delete(Class.students.through.objects.filter(student_id=pk))
+        _raw_delete(Student.objects.filter(pk=pk))
+        bump_records_version()
+        bump_roster_version()
+    return counts
+
+
+def delete_attendance(attendance):
+    """출석 기록과 그 시험 기록을 삭제하고 삭제한 시험 수를 반환"""
+    with transaction.atomic():
+        exams = Exam.objects.filter(attendance_id=attendance.pk)
+        record_deletions(exams)
+        record_deletions(Attendance.objects.filter(pk=attendance.pk))
+        exam_count = _raw_delete(exams)
+        _raw_delete(Attendance.objects.filter(pk=attendance.pk))
+        bump_records_version()
+        events.attendance_deleted(attendance)
+    return exam_count
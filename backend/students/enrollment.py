@@ -0,0 +1,108 @@
+"""
+반 등록 기간 관리
+
+(반 id, 학생 id) 쌍의 목록을 받아 등록 기간을 한 번에 열고 닫는다.
+Class.students 의 add/remove/clear 는 signals 에서 이 함수들을 호출하므로
+반 배정은 기존처럼 m2m 관계로 바꾸면 된다.
+
+여러 학생/반의 배정을 한 번에 바꿀 때는 apply_changes() 로 through 테이블에 직접
+INSERT/DELETE 하고, m2m_changed 시그널이 하던 updated_at 갱신과 등록 기간 처리를 함께 한다.
+"""
+
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .caching import bump_records_version, bump_roster_version
+from .models import Class, Enrollment, Student
+
+
+def _pairs_filter(pairs, class_field="class_info_id"):
+    """반별로 묶은 (반, 학생) 쌍 조건"""
+    by_class = defaultdict(set)
+    for class_id, student_id in pairs:
+        by_class[class_id].add(student_id)
+    return reduce(
+        or_,
+        (Q(**{class_field: class_id, "student_id__in": ids}) for class_id, ids in by_class.items()),
+    )
+
+
+def open_periods(pairs, start_date=None):
+    """열린 기간이 없는 (반, 학생) 쌍에 새 등록 기간을 만든다"""
+    pairs = set(pairs)
+    if not pairs:
+        return 0
+    start_date = start_date or timezone.localdate()
+
+    existing = set(
+        Enrollment.objects.filter(_pairs_filter(pairs), end_date__isnull=True).values_list(
+            "class_info_id", "student_id"
+        )
+    )
+    created = Enrollment.objects.bulk_create(
+        [
+            Enrollment(class_info_id=class_id, student_id=student_id, start_date=start_date)
+            for class_id, student_id in pairs - existing
+        ],
+        batch_size=500,
+    )
+    return len(created)
+
+
+def close_periods(pairs, end_date=None):
+    """(반, 학생) 쌍의 열린 등록 기간을 end_date 로 닫는다"""
+    pairs = set(pairs)
+    if not pairs:
+        return 0
+    end_date = end_date or timezone.localdate()
+    return Enrollment.objects.filter(_pairs_filter(pairs), end_date__isnull=True).update(
+        end_date=end_date
+    )
+
+
+def apply_changes(add=(), remove=()):
+    """
+    (반 id, 학생 id) 쌍 단위로 반 배정을 추가/해제하고 실제로 바뀐 건수를 반환
+
+    이미 배정된 쌍의 추가와 배정되지 않은 쌍의 해제는 건너뛴다.
+    같은 쌍이 add 와 remove 에 모두 있으면 해제 후 다시 추가한 것으로 보아 배정을 유지한다.
+    """
+    add, remove = set(add), set(remove)
+    through = Class.students.through
+    if not add and not remove:
+        return {"added": 0, "removed": 0}
+
+    with transaction.atomic():
+        existing = set(
+            through.objects.filter(
+                _pairs_filter(add | remove, class_field="class_id")
+            ).values_list("class_id", "student_id")
+        )
+        to_remove = (remove - add) & existing
+        to_add = add - existing
+
+        if to_remove:
+            through.objects.filter(_pairs_filter(to_remove, class_field="class_id")).delete()
+            close_periods(to_remove)
+        if to_add:
+            through.objects.bulk_create(
+                [through(class_id=class_id, student_id=student_id) for class_id, student_id in to_add],
+                batch_size=500,
+            )
+            open_periods(to_add)
+
+        changed = to_add | to_remove
+        if changed:
+            # 조건부 GET 검증값(MAX(updated_at))에 반영
+            now = timezone.now()
+            Class.objects.filter(pk__in={c for c, _ in changed}).update(updated_at=now)
+            Student.objects.filter(pk__in={s for _, s in changed}).update(updated_at=now)
+            bump_records_version()
+            bump_roster_version()
+
+    return {"added": len(to_add), "removed": len(to_remove)}
@@ -0,0 +1,256 @@
+"""
+출석/시험 실시간 이벤트
+
+(반 id, 날짜) 단위로 구독하며, 출석 체크 화면이 목록을 반복 조회하지 않고 변경분만 받도록 한다.
+
+- 같은 프로세스에서 커밋된 저장/삭제는 on_commit 에서 바로 구독자에게 전달한다.
+- 다른 워커의 변경은 구독 중인 (반, 날짜)마다 워커당 하나의 폴링 작업이 EVENTS_POLL_SECONDS 간격으로
+  updated_at 과 Tombstone 을 조회하여 전달한다. 같은 반/날짜를 여러 기기가 보고 있어도 조회는 한 번이다.
+- 같은 행의 같은 수정은 (종류, id, updated_at) 으로 한 번만 보낸다.
+- 이벤트 id 는 전달 시점의 폴링 기준 시각이다 (sync.watermark 참고). 재연결 시 이 시각부터 다시
+  조회하므로 큐에 남아 전달되지 못한 이벤트도 놓치지 않는다.
+- 구독자 큐가 넘치면 큐를 비우고 reset 이벤트를 보내 클라이언트가 목록을 다시 불러오게 한다.
+
+구독과 폴링은 ASGI 서버의 이벤트 루프에서 동작한다 (config/asgi.py 참고).
+"""
+
+import asyncio
+import datetime
+import logging
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Attendance, Exam, Tombstone
+from .readers import attendance_rows, exam_rows
+from .sync import watermark
+
+logger = logging.getLogger("students.events")
+
+QUEUE_SIZE = 256
+RESET = {"type": "reset", "action": "reset", "id": None, "data": None, "updated_at": None}
+
+
+def saved_event(kind, row):
+    return {
+        "type": kind,
+        "action": "saved",
+        "id": row["id"],
+        "data": row,
+        "updated_at": row["updated_at"],
+    }
+
+
+def deleted_event(kind, pk):
+    return {"type": kind, "action": "deleted", "id": pk, "data": None, "updated_at": None}
+
+
+def topic_key(class_id, date):
+    return (int(class_id), date.isoformat() if hasattr(date, "isoformat") else str(date))
+
+
+class Subscription:
+    """구독자 하나의 (이벤트 id, 이벤트) 큐 (구독한 이벤트 루프에서만 접근)"""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def offer(self, since, events):
+        for event in events:
+            try:
+                self.queue.put_nowait((since, event))
+            except asyncio.QueueFull:
+                while not self.queue.empty():
+                    self.queue.get_nowait()
+                self.queue.put_nowait((since, RESET))
+                return
+
+
+class EventBroker:
+    """프로세스 내 pub/sub. publish 는 어느 스레드에서 호출해도 된다"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._topics = {}
+
+    @property
+    def active(self):
+        return bool(self._topics)
+
+    def has_subscribers(self, key):
+        return key in self._topics
+
+    def subscribe(self, key):
+        """이벤트 루프 안에서 호출. 첫 구독자면 이 (반, 날짜)의 폴링 작업을 시작"""
+        loop = asyncio.get_running_loop()
+        subscription = Subscription(loop)
+        with self._lock:
+            topic = self._topics.get(key)
+            if topic is None:
+                topic = self._topics[key] = {
+                    "subscribers": set(),
+                    "seen": {},
+                    "poller": None,
+                    # 첫 폴링의 기준 시각. 이후에는 폴링마다 sync.watermark 로 옮긴다
+                    "watermark": timezone.now()
+                    - datetime.timedelta(seconds=settings.SYNC_OVERLAP_SECONDS),
+                }
+                topic["poller"] = loop.create_task(self._poll(key))
+            topic["subscribers"].add(subscription)
+        return subscription
+
+    def unsubscribe(self, key, subscription):
+        with self._lock:
+            topic = self._topics.get(key)
+            if topic is None:
+                return
+            topic["subscribers"].discard(subscription)
+            if topic["subscribers"]:
+                return
+            del self._topics[key]
+        topic["poller"].cancel()
+
+    def _set_watermark(self, key, value):
+        with self._lock:
+            topic = self._topics.get(key)
+            if topic is not None:
+                topic["watermark"] = value
+
+    def publish(self, key, events):
+        with self._lock:
+            topic = self._topics.get(key)
+            if topic is None:
+                return
+            fresh = []
+            for event in events:
+                marker = (event["type"], event["id"])
+                stamp = event["updated_at"] or event["action"]
+                if topic["seen"].get(marker) == stamp:
+                    continue
+                topic["seen"][marker] = stamp
+                fresh.append(event)
+            subscribers = list(topic["subscribers"])
+            since = topic["watermark"]
+        if not fresh:
+            return
+        for subscription in subscribers:
+            subscription.loop.call_soon_threadsafe(subscription.offer, since, fresh)
+
+    async def _poll(self, key):
+        with self._lock:
+            since = self._topics[key]["watermark"]
+        interval = settings.EVENTS_POLL_SECONDS
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                events, since = await sync_to_async(changes_for)(key, since)
+            except Exception:
+                # DB 오류가 나도 구독은 유지하고 다음 주기에 같은 시점부터 다시 조회
+                logger.exception("event poll failed for %s", key)
+                continue
+            # 이번에 찾은 이벤트는 이전 기준 시각을 id 로 보낸 뒤 기준 시각을 옮김
+            if events:
+                self.publish(key, events)
+            self._set_watermark(key, since)
+
+
+broker = EventBroker()
+
+
+def changes_for(key, since):
+    """(반, 날짜)의 since 이후 변경 이벤트와 다음 조회 시점"""
+    close_old_connections()
+    class_id, date = key
+    now = timezone.now()
+    attendances = Attendance.objects.filter(
+        class_info_id=class_id, date=date, updated_at__gte=since
+    ).order_by("updated_at", "pk")
+    exams = Exam.objects.filter(
+        attendance__class_info_id=class_id, attendance__date=date, updated_at__gte=since
+    ).order_by("updated_at", "pk")
+    events = [saved_event("attendance", row) for row in attendance_rows(attendances)]
+    events += [saved_event("exam", row) for row in exam_rows(exams)]
+    for model_name, object_id in (
+        Tombstone.objects.filter(
+            class_id=class_id,
+            date=date,
+            deleted_at__gte=since,
+            model_name__in=[Tombstone.ModelName.ATTENDANCE, Tombstone.ModelName.EXAM],
+        )
+        .order_by("deleted_at", "pk")
+        .values_list("model_name", "object_id")
+    ):
+        events.append(deleted_event(model_name, object_id))
+    return events, watermark(now)
+
+
+def _after_commit(callback):
+    # 구독자가 없는 프로세스에서는 커밋 후 조회도 하지 않음
+    if broker.active:
+        transaction.on_commit(callback)
+
+
+def attendance_saved(attendance):
+    key = topic_key(attendance.class_info_id, attendance.date) if attendance.class_info_id else None
+    pk = attendance.pk
+
+    def publish():
+        if key is not None and broker.has_subscribers(key):
+            rows = attendance_rows(Attendance.objects.filter(pk=pk))
+            broker.publish(key, [saved_event("attendance", row) for row in rows])
+
+    _after_commit(publish)
+
+
+def attendance_deleted(attendance):
+    """출석 삭제 (시험은 클라이언트가 출석과 함께 지움)"""
+    if not attendance.class_info_id:
+        return
+    key = topic_key(attendance.class_info_id, attendance.date)
+    event = deleted_event("attendance", attendance.pk)
+    _after_commit(lambda: broker.publish(key, [event]))
+
+
+def exam_saved(exam):
+    pk = exam.pk
+
+    def publish():
+        for row in exam_rows(Exam.objects.filter(pk=pk)):
+            if row["class_info"] is not None:
+                key = topic_key(row["class_info"], row["exam_date"])
+                broker.publish(key, [saved_event("exam", row)])
+
+    _after_commit(publish)
+
+
+def exam_deleted(exam):
+    pk = exam.pk
+    attendance = exam.attendance if Exam.attendance.is_cached(exam) else None
+    if attendance is None or not attendance.class_info_id:
+        # 반/날짜를 모르면 폴링의 삭제 기록으로 전달
+        return
+    key = topic_key(attendance.class_info_id, attendance.date)
+    event = deleted_event("exam", pk)
+    _after_commit(lambda: broker.publish(key, [event]))
+
+
+async def catch_up(key, since):
+    """재연결(Last-Event-ID) 시 놓친 변경"""
+    events, _ = await sync_to_async(changes_for)(key, since)
+    return events
+
+
+def parse_event_id(value):
+    if not value:
+        return None
+    try:
+        since = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
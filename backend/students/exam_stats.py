@@ -0,0 +1,223 @@
+"""
+시험 통계
+
+시험(이름, 종류)별 원점수 통계와 함께 만점 대비 백분율로 정규화한 평균, 표준편차, 중앙값,
+등급형 시험(서술/구술)의 등급 분포를 계산한다. 그룹 수와 관계없이 쿼리 3번으로 끝난다.
+시험별 석차/백분위는 DB 의 윈도 함수로 계산하고, 지원하지 않는 DB 에서는 파이썬으로 계산한다.
+"""
+
+import bisect
+import math
+
+from django.db import connection
+from django.db.models import Avg, Case, Count, F, FloatField, Max, Min, When, Window
+from django.db.models.functions import Floor, PercentRank, Rank, RowNumber
+
+from .models import Exam
+
+GROUP_FIELDS = ("name", "category")
+GRADE_ORDER = [value for value, _ in Exam.Grade.choices]
+CATEGORY_DISPLAY = dict(Exam.Category.choices)
+
+
+def score_percent():
+    """만점 대비 점수 백분율 (점수나 만점이 없으면 NULL)"""
+    return Case(
+        When(max_score__gt=0, then=F("score") * 100.0 / F("max_score")),
+        default=None,
+        output_field=FloatField(),
+    )
+
+
+def exam_statistics(queryset):
+    """
+    (시험 이름, 종류)별 통계 목록
+
+    name, average_score, max_score, min_score, count 는 기존 응답과 같은 의미(원점수 기준)를 유지한다.
+    """
+    queryset = queryset.order_by()
+
+    groups = (
+        queryset.values(*GROUP_FIELDS)
+        .annotate(
+            average_score=Avg("score"),
+            # 모델의 max_score(만점) 필드와 이름이 겹치지 않도록 별칭으로 집계한 뒤 바꿔 넣음
+            highest_score=Max("score"),
+            lowest_score=Min("score"),
+            count=Count("id"),
+            score_count=Count("score"),
+            average_percent=Avg(score_percent()),
+            # STDDEV 는 SQLite 에 없으므로 E[x²] - E[x]² 로 계산
+            mean_square_percent=Avg(score_percent() * score_percent()),
+            percent_count=Count(score_percent()),
+        )
+        .order_by(*GROUP_FIELDS)
+    )
+
+    grade_counts = {}
+    for row in (
+        queryset.filter(grade__isnull=False)
+        .values(*GROUP_FIELDS, "grade")
+        .annotate(n=Count("id"))
+    ):
+        key = (row["name"], row["category"])
+        grade_counts.setdefault(key, {})[row["grade"]] = row["n"]
+
+    medians = _median_percents(queryset)
+
+    results = []
+    for row in groups:
+        key = (row["name"], row["category"])
+        mean = row.pop("average_percent")
+        mean_square = row.pop("mean_square_percent")
+        if not row.pop("percent_count"):
+            mean = None
+
+        stddev = None
+        if mean is not None and mean_square is not None:
+            # 부동소수 오차로 음수가 되는 경우 방지
+            stddev = math.sqrt(max(mean_square - mean * mean, 0.0))
+
+        counts = grade_counts.get(key, {})
+        row.update(
+            {
+                "max_score": row.pop("highest_score"),
+                "min_score": row.pop("lowest_score"),
+                "category_display": CATEGORY_DISPLAY.get(row["category"], row["category"]),
+                "average_percent": _round(mean),
+                "stddev_percent": _round(stddev),
+                "median_percent": _round(medians.get(key)),
+                "grade_distribution": {
+                    grade: counts[grade] for grade in GRADE_ORDER if grade in counts
+                },
+            }
+        )
+        results.append(row)
+    return results
+
+
+def _median_percents(queryset):
+    """(시험 이름, 종류)별 백분율 중앙값"""
+    queryset = queryset.annotate(percent=score_percent()).filter(percent__isnull=False)
+
+    if not connection.features.supports_over_clause:
+        # 윈도 함수가 없으면 정렬된 값을 모두 읽어 파이썬에서 계산
+        values = {}
+        for name, category, percent in queryset.order_by(
+            *GROUP_FIELDS, "percent"
+        ).values_list(*GROUP_FIELDS, "percent"):
+            values.setdefault((name, category), []).append(percent)
+        return {key: _middle(sorted_values) for key, sorted_values in values.items()}
+
+    # 그룹별 순번과 개수를 구해 가운데 한두 행만 가져옴
+    partition = [F(field) for field in GROUP_FIELDS]
+    middle_rows = (
+        queryset.annotate(
+            position=Window(RowNumber(), partition_by=partition, order_by=F("percent").asc()),
+            total=Window(Count("id"), partition_by=partition),
+        )
+        .filter(
+            position__gte=Floor((F("total") + 1) / 2.0),
+            position__lte=Floor(F("total") / 2.0) + 1,
+        )
+        .values_list(*GROUP_FIELDS, "percent")
+    )
+    values = {}
+    for name, category, percent in middle_rows:
+        values.setdefault((name, category), []).append(percent)
+    return {key: sum(pair) / len(pair) for key, pair in values.items()}
+
+
+def _middle(sorted_values):
+    n = len(sorted_values)
+    mid = n // 2
+    if n % 2:
+        return sorted_values[mid]
+    return (sorted_values[mid - 1] + sorted_values[mid]) / 2
+
+
+def _round(value):
+    return None if value is None else round(value, 2)
+
+
+def exam_rankings(queryset):
+    """
+    시험 점수(만점 대비 백분율) 기준 석차, 백분위, 표준점수(z)
+
+    queryset 전체를 하나의 비교 집단으로 보므로 반 또는 과목으로 미리 좁혀서 넘긴다.
+    같은 점수는 같은 석차를 받고(RANK), 백분위는 자신보다 낮은 점수의 비율(PERCENT_RANK)이다.
+    """
+    queryset = (
+        queryset.annotate(percent=score_percent())
+        .filter(percent__isnull=False)
+        .order_by()
+    )
+    fields = (
+        "id",
+        "attendance__student_id",
+        "attendance__student__name",
+        "attendance__class_info_id",
+        "attendance__class_info__name",
+        "attendance__date",
+        "score",
+        "max_score",
+        "percent",
+    )
+
+    if connection.features.supports_over_clause:
+        rows = list(
+            queryset.annotate(
+                rank=Window(Rank(), order_by=F("percent").desc()),
+                percent_rank=Window(PercentRank(), order_by=F("percent").asc()),
+            )
+            .order_by("rank", "attendance__student__name")
+            .values(*fields, "rank", "percent_rank")
+        )
+    else:
+        rows = list(queryset.values(*fields))
+        _rank_in_python(rows)
+        rows.sort(key=lambda row: (row["rank"], row["attendance__student__name"]))
+
+    percents = [row["percent"] for row in rows]
+    mean = sum(percents) / len(percents) if percents else None
+    stddev = (
+        math.sqrt(sum((p - mean) ** 2 for p in percents) / len(percents))
+        if percents
+        else None
+    )
+
+    results = [
+        {
+            "exam_id": row["id"],
+            "student_id": row["attendance__student_id"],
+            "student_name": row["attendance__student__name"],
+            "class_id": row["attendance__class_info_id"],
+            "class_name": row["attendance__class_info__name"],
+            "date": row["attendance__date"],
+            "score": row["score"],
+            "max_score": row["max_score"],
+            "percent": _round(row["percent"]),
+            "rank": row["rank"],
+            "percentile": _round(row["percent_rank"] * 100),
+            # 모두 같은 점수면 표준편차가 0 이므로 0 으로 둠
+            "z_score": _round((row["percent"] - mean) / stddev) if stddev else 0.0,
+        }
+        for row in rows
+    ]
+    summary = {
+        "count": len(results),
+        "average_percent": _round(mean),
+        "stddev_percent": _round(stddev),
+    }
+    return summary, results
+
+
+def _rank_in_python(rows):
+    """윈도 함수가 없는 DB 에서 RANK, PERCENT_RANK 와 같은 값을 계산"""
+    percents = sorted(row["percent"] for row in rows)
+    n = len(percents)
+    for row in rows:
+        lower = bisect.bisect_left(percents, row["percent"])
+        higher = n - bisect.bisect_right(percents, row["percent"])
+        row["rank"] = higher + 1
+        row["percent_rank"] = lower / (n - 1) if n > 1 else 0.0
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from students.archive import archive_school_year, restore_school_year, school_year_range
+
+
+class Command(BaseCommand):
+    help = "Moves attendance and exam records of a closed school year into the archive tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("year", type=int, help="School year to archive (e.g. 2024).")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many records would be moved.",
+        )
+        parser.add_argument(
+            "--restore",
+            action="store_true",
+            help="Move the archived records of the year back into the active tables.",
+        )
+
+    def handle(self, *args, **options):
+        year = options["year"]
+        dry_run = options["dry_run"]
+        first, last = school_year_range(year)
+
+        if options["restore"]:
+            counts = restore_school_year(year, dry_run=dry_run)
+            verb = "restore" if dry_run else "Restored"
+        else:
+            try:
+                counts = archive_school_year(year, dry_run=dry_run)
+            except ValueError as e:
+                raise CommandError(str(e))
+            verb = "archive" if dry_run else "Archived"
+
+        summary = (
+            f"{counts['attendances']} attendances and {counts['exams']} exams "
+            f"for school year {year} ({first} ~ {last})"
+        )
+        if dry_run:
+            self.stdout.write(f"Would {verb} {summary}.")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{verb} {summary}."))
@@ -0,0 +1,89 @@
+import gzip
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from students.models import User, Student
+from students.renderers import FastJSONRenderer
+from students.views import AttendanceViewSet, ExamViewSet, StudentViewSet
+
+
+class Command(BaseCommand):
+    help = "Compares JSON render time and gzip size for the largest API responses."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations", type=int, default=20, help="Render iterations per endpoint."
+        )
+        parser.add_argument(
+            "--username", help="User to render as (defaults to the first superuser)."
+        )
+
+    def handle(self, *args, **options):
+        user = self._get_user(options["username"])
+        iterations = options["iterations"]
+
+        self.stdout.write(
+            f"{'endpoint':<32}{'drf ms':>10}{'fast ms':>10}{'speedup':>9}"
+            f"{'bytes':>11}{'gzip':>10}{'ratio':>8}"
+        )
+        for label, data in self._collect_payloads(user):
+            drf_ms, body = self._time_render(JSONRenderer(), data, iterations)
+            fast_ms, fast_body = self._time_render(FastJSONRenderer(), data, iterations)
+            compressed = len(gzip.compress(fast_body))
+            self.stdout.write(
+                f"{label:<32}{drf_ms:>10.2f}{fast_ms:>10.2f}"
+                f"{drf_ms / fast_ms if fast_ms else 0:>8.1f}x"
+                f"{len(body):>11}{compressed:>10}"
+                f"{compressed / len(body) if body else 0:>8.2f}"
+            )
+
+    def _get_user(self, username):
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f"User '{username}' does not exist.")
+        user = User.objects.filter(is_superuser=True).first()
+        if not user:
+            raise CommandError("No superuser found; pass --username.")
+        return user
+
+    def _collect_payloads(self, user):
+        """Fetches response data through the real views so payloads match production."""
+        factory = APIRequestFactory()
+
+        def call(viewset, actions, path, **kwargs):
+            request = factory.get(path)
+            force_authenticate(request, user=user)
+            return viewset.as_view(actions)(request, **kwargs).data
+
+        largest = (
+            Student.objects.annotate(n=Count("attendance"))
+            .order_by("-n")
+            .values_list("pk", flat=True)
+            .first()
+        )
+        payloads = []
+        if largest:
+            payloads.append(
+                (
+                    f"students/{largest}/",
+                    call(StudentViewSet, {"get": "retrieve"}, "/", pk=largest),
+                )
+            )
+        payloads.append(("students/", call(StudentViewSet, {"get": "list"}, "/")))
+        payloads.append(("attendances/", call(AttendanceViewSet, {"get": "list"}, "/")))
+        payloads.append(("exams/", call(ExamViewSet, {"get": "list"}, "/")))
+        return payloads
+
+    def _time_render(self, renderer, data, iterations):
+        body = renderer.render(data)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            renderer.render(data)
+        elapsed_ms = (time.perf_counter() - start) * 1000 / iterations
+        return elapsed_ms, body
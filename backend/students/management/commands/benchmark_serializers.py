@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from students.models import Attendance, Exam
+from students.readers import attendance_rows, exam_rows
+from students.serializers import AttendanceSerializer, ExamSerializer
+
+
+class Command(BaseCommand):
+    help = "Compares rows/sec and query counts of the list serializers and the values() read path."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations", type=int, default=5, help="Runs per implementation."
+        )
+        parser.add_argument(
+            "--limit", type=int, default=2000, help="Rows per run (0 for all rows)."
+        )
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        limit = options["limit"]
+
+        attendances = Attendance.objects.order_by("-date")
+        exams = Exam.objects.order_by("-attendance__date")
+        if limit:
+            attendances = attendances[:limit]
+            exams = exams[:limit]
+
+        cases = [
+            (
+                "attendances",
+                lambda: AttendanceSerializer(attendances.all(), many=True).data,
+                lambda: attendance_rows(attendances.all()),
+            ),
+            (
+                "exams",
+                lambda: ExamSerializer(exams.all(), many=True).data,
+                lambda: exam_rows(exams.all()),
+            ),
+        ]
+
+        self.stdout.write(
+            f"{'list':<14}{'impl':<12}{'rows':>7}{'queries':>9}{'ms':>10}{'rows/s':>12}"
+        )
+        for label, slow, fast in cases:
+            slow_data = None
+            for impl, func in (("serializer", slow), ("values", fast)):
+                rows, queries, elapsed = self._measure(func, iterations)
+                data = func()
+                if slow_data is None:
+                    slow_data = data
+                elif list(data) != list(slow_data):
+                    self.stdout.write(self.style.ERROR(f"  {label}: output differs!"))
+                self.stdout.write(
+                    f"{label:<14}{impl:<12}{rows:>7}{queries:>9}{elapsed * 1000:>10.1f}"
+                    f"{rows / elapsed if elapsed else 0:>12.0f}"
+                )
+
+    def _measure(self, func, iterations):
+        with CaptureQueriesContext(connection) as ctx:
+            rows = len(func())
+        queries = len(ctx.captured_queries)
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = (time.perf_counter() - start) / iterations
+        return rows, queries, elapsed
@@ -0,0 +1,18 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from students.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = "Deletes sync tombstones older than SYNC_TOMBSTONE_DAYS."
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} tombstones older than {cutoff:%Y-%m-%d %H:%M}.")
+        )
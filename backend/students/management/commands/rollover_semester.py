@@ -0,0 +1,51 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from students.rollover import apply_rollover
+
+
+class Command(BaseCommand):
+    help = (
+        "Clones classes for a new term from a JSON plan and moves enrollments in bulk. "
+        "See students/rollover.py for the plan format."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("plan", help="Path to the JSON plan file.")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the classes and enrollment changes that would be made.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["plan"], encoding="utf-8") as f:
+                plan = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read plan: {e}")
+
+        try:
+            summary = apply_rollover(plan, dry_run=options["dry_run"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for spec in summary["classes"]:
+            target = f"#{spec['id']} " if "id" in spec else ""
+            self.stdout.write(
+                f"  - {spec['source_name']} (#{spec['source']}) -> {target}{spec['name']} "
+                f"{spec['day_of_week']} {spec['start_time']}: "
+                f"{spec['student_count']} students"
+            )
+        self.stdout.write(f"  - Non-returning students moved to withdrawn: {summary['withdrawn_count']}")
+
+        if options["dry_run"]:
+            self.stdout.write("Dry run: no changes were made.")
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Created {len(summary['classes'])} classes "
+                    f"({summary['added']} enrollments added, {summary['removed']} removed)."
+                )
+            )
@@ -0,0 +1,159 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from students.caching import reference, shared_cache
+from students.models import User
+from students.reports import (
+    dashboard_cache_key,
+    dashboard_payload,
+    exam_averages_cache_key,
+    exam_averages_payload,
+    month_bounds,
+    store_report,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Precomputes dashboard and exam average payloads for recent months "
+        "and every subject scope in use, so the first requests after a deploy hit the cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=2,
+            help="Number of months to warm, counting back from the current month (default 2).",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=4, help="Maximum concurrent computations (default 4)."
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Recompute payloads even if they are already cached.",
+        )
+
+    def handle(self, *args, **options):
+        if options["months"] < 1 or options["workers"] < 1:
+            raise CommandError("--months and --workers must be at least 1.")
+        if not shared_cache():
+            # 워커별 메모리 캐시는 이 명령의 프로세스에만 채워지고 웹 워커는 읽을 수 없음
+            raise CommandError(
+                "The default cache is local to each process, so web workers would never "
+                "read the warmed payloads. Set REDIS_URL to use a shared cache."
+            )
+
+        tasks = self._build_tasks(self._scopes(), self._months(options["months"]))
+        started = time.perf_counter()
+        timings = {}
+        skipped = 0
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            futures = [
+                executor.submit(self._warm, kind, key, build, options["force"])
+                for kind, key, build in tasks
+            ]
+            for future in as_completed(futures):
+                kind, elapsed = future.result()
+                if elapsed is None:
+                    skipped += 1
+                else:
+                    timings.setdefault(kind, []).append(elapsed)
+
+        total = time.perf_counter() - started
+        for kind, values in sorted(timings.items()):
+            self.stdout.write(
+                f"{kind:<16}{len(values):>5} computed  "
+                f"total {sum(values):.2f}s  avg {sum(values) / len(values) * 1000:.1f}ms  "
+                f"max {max(values) * 1000:.1f}ms"
+            )
+        computed = sum(len(values) for values in timings.values())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Warmed {computed} payloads ({skipped} already cached) "
+                f"in {total:.2f}s with {options['workers']} workers."
+            )
+        )
+
+    def _warm(self, kind, key, build, force):
+        """작업 스레드에서 실행. 스레드별 DB 연결은 작업마다 닫아 남기지 않는다"""
+        try:
+            if not force and cache.get(key) is not None:
+                return kind, None
+            started = time.perf_counter()
+            store_report(key, build())
+            return kind, time.perf_counter() - started
+        finally:
+            connection.close()
+
+    def _scopes(self):
+        """관리자 전체 범위와 활성 선생님/조교의 서로 다른 권한 과목 조합"""
+        scopes = {None}
+        user_ids = User.objects.filter(
+            is_active=True, role__in=[User.Role.TEACHER, User.Role.ASSISTANT]
+        ).values_list("pk", flat=True)
+        for user_id in user_ids:
+            scopes.add(tuple(sorted(reference.user_subject_ids(user_id))))
+        return scopes
+
+    def _months(self, count):
+        month = date.today().replace(day=1)
+        months = []
+        for _ in range(count):
+            months.append(month)
+            month = (month - timedelta(days=1)).replace(day=1)
+        return months
+
+    def _build_tasks(self, scopes, months):
+        """(종류, 캐시 키, 계산 함수) 목록. 키는 뷰에서 같은 조건으로 조회할 때와 같다"""
+        classes = reference.classes().values()
+        tasks = []
+        for scope in scopes:
+            class_ids = sorted(
+                row["id"]
+                for row in classes
+                if scope is None or row["name"] == "퇴원" or row["subject_id"] in scope
+            )
+            for month in months:
+                tasks.append(
+                    (
+                        "dashboard",
+                        dashboard_cache_key(scope, month),
+                        lambda s=scope, m=month: dashboard_payload(s, m),
+                    )
+                )
+                for class_id in class_ids:
+                    tasks.append(
+                        (
+                            "dashboard",
+                            dashboard_cache_key(scope, month, class_id),
+                            lambda s=scope, m=month, c=class_id: dashboard_payload(s, m, c),
+                        )
+                    )
+                    first, last = month_bounds(month)
+                    tasks.append(
+                        (
+                            "exam_averages",
+                            exam_averages_cache_key(scope, class_id, None, first, last),
+                            lambda s=scope, c=class_id, f=first, l=last: exam_averages_payload(
+                                s, c, None, f, l
+                            ),
+                        )
+                    )
+            # 학생 상세 화면은 기간 없이 반별 통계를 조회한다
+            for class_id in class_ids:
+                tasks.append(
+                    (
+                        "exam_averages",
+                        exam_averages_cache_key(scope, class_id),
+                        lambda s=scope, c=class_id: exam_averages_payload(s, c),
+                    )
+                )
+        return tasks
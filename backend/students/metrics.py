@@ -0,0 +1,322 @@
+"""
+프로세스 내 메트릭 레지스트리
+
+요청 지연시간 히스토그램, 상태코드별 요청 수, DB 쿼리 수, 알림톡 발송 결과를
+뷰/액션 단위로 집계하고 Prometheus 텍스트 포맷으로 출력한다.
+METRICS_DIR 이 설정되어 있으면 각 워커가 자신의 스냅샷을 공유 디렉터리에
+파일로 기록하고, 수집 시 모든 워커의 파일을 합산한다.
+
+워커 파일 이름에는 pid 와 프로세스마다 새로 만드는 id 가 들어가므로 재시작 후 같은 pid 를 받아도
+이전 파일을 덮어쓰지 않는다. 수집 시 종료된 워커의 파일은 metrics_retired.json 에 합산한 뒤 지워서
+카운터가 줄어들지 않게 한다. pid 로 생존 여부를 확인하므로 METRICS_DIR 은 한 서버의 워커끼리만 공유한다.
+"""
+
+import glob
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경
+    fcntl = None
+
+from django.conf import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LABELS = ("view", "action", "method")
+STATUS_LABELS = ("view", "action", "method", "status")
+QUERY_LABELS = ("view", "action")
+ALIMTALK_LABELS = ("view", "action", "mode", "outcome")
+
+RETIRED_FILE = "metrics_retired.json"
+WORKER_FILE = re.compile(r"metrics_(\d+)(?:_(\w+))?\.json$")
+
+
+def view_label(request, view_func):
+    """URL 에 매칭된 뷰 함수에서 (뷰 이름, 액션) 을 추출"""
+    view_class = getattr(view_func, "cls", None)
+    name = view_class.__name__ if view_class else view_func.__name__
+    method = request.method.lower()
+
+    # ViewSet 은 as_view() 에 {http method: action} 매핑을 넘긴다
+    actions = getattr(view_func, "actions", None)
+    if actions:
+        return name, actions.get(method, method)
+    return name, method
+
+
+class MetricsRegistry:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        self._boot_id = None
+        self._boot_pid = None
+        # 히스토그램 값: [버킷별 누적 전 카운트..., 합계, 개수]
+        self._latency = {}
+        self._status = {}
+        self._queries = {}
+        self._alimtalk = {}
+
+    def observe_request(self, view, action, method, status, duration, queries):
+        with self._lock:
+            key = (view, action, method)
+            hist = self._latency.get(key)
+            if hist is None:
+                hist = self._latency[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    hist[i] += 1
+                    break
+            hist[-2] += duration
+            hist[-1] += 1
+
+            status_key = (view, action, method, str(status))
+            self._status[status_key] = self._status.get(status_key, 0) + 1
+
+            query_key = (view, action)
+            self._queries[query_key] = self._queries.get(query_key, 0) + queries
+
+        self.flush()
+
+    def record_alimtalk(self, view, action, mode, outcome, count=1):
+        if count <= 0:
+            return
+        with self._lock:
+            key = (view, action, mode, outcome)
+            self._alimtalk[key] = self._alimtalk.get(key, 0) + count
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "buckets": list(self.buckets),
+                "latency": [[list(k), list(v)] for k, v in self._latency.items()],
+                "status": [[list(k), v] for k, v in self._status.items()],
+                "queries": [[list(k), v] for k, v in self._queries.items()],
+                "alimtalk": [[list(k), v] for k, v in self._alimtalk.items()],
+            }
+
+    # ------------------------------------------------------------------
+    # 워커 간 공유 (파일 기반)
+    # ------------------------------------------------------------------
+
+    def _worker_path(self, directory):
+        # fork 된 워커는 부모와 다른 id 를 쓰도록 pid 가 바뀌면 새로 만든다
+        pid = os.getpid()
+        if self._boot_pid != pid:
+            self._boot_pid = pid
+            self._boot_id = uuid.uuid4().hex[:12]
+        return os.path.join(directory, f"metrics_{pid}_{self._boot_id}.json")
+
+    def flush(self, force=False):
+        """공유 디렉터리에 현재 워커의 스냅샷을 기록 (METRICS_FLUSH_INTERVAL 간격)"""
+        directory = getattr(settings, "METRICS_DIR", "")
+        if not directory:
+            return
+
+        now = time.monotonic()
+        interval = getattr(settings, "METRICS_FLUSH_INTERVAL", 5)
+        if not force and now - self._last_flush < interval:
+            return
+        self._last_flush = now
+
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.snapshot(), f)
+            # rename 은 원자적이므로 수집 중 부분적으로 쓰인 파일을 읽지 않는다
+            os.replace(tmp_path, self._worker_path(directory))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def collect(self):
+        """모든 워커의 스냅샷을 합산"""
+        snapshots = [self.snapshot()]
+        directory = getattr(settings, "METRICS_DIR", "")
+        if directory:
+            own_path = self._worker_path(directory)
+            self._retire_dead_workers(directory, own_path)
+            for path in glob.glob(os.path.join(directory, "metrics_*.json")):
+                if path == own_path:
+                    continue
+                try:
+                    with open(path) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        return self._merge(snapshots)
+
+    def _retire_dead_workers(self, directory, own_path):
+        """종료된 워커(재시작 전의 같은 pid 포함)의 파일을 은퇴 합계에 더하고 지움"""
+        if fcntl is None:
+            return
+        own_pid = os.getpid()
+        dead = []
+        for path in glob.glob(os.path.join(directory, "metrics_*.json")):
+            match = WORKER_FILE.search(os.path.basename(path))
+            if match is None or path == own_path:
+                continue
+            pid = int(match.group(1))
+            if pid == own_pid or not _pid_alive(pid):
+                dead.append(path)
+        if not dead:
+            return
+
+        # 여러 워커가 동시에 수집해도 같은 파일을 두 번 더하지 않도록 잠금 안에서 처리
+        with open(os.path.join(directory, "metrics.lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            retired_path = os.path.join(directory, RETIRED_FILE)
+            snapshots = []
+            existing = []
+            for path in [retired_path, *dead]:
+                try:
+                    with open(path) as f:
+                        snapshots.append(json.load(f))
+                except FileNotFoundError:
+                    continue
+                except (OSError, ValueError):
+                    pass
+                existing.append(path)
+            if not any(path != retired_path for path in existing):
+                # 다른 워커가 먼저 정리함
+                return
+
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(self._to_snapshot(self._merge(snapshots)), f)
+                os.replace(tmp_path, retired_path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return
+            for path in existing:
+                if path != retired_path:
+                    os.remove(path)
+
+    def _to_snapshot(self, merged):
+        return {
+            "buckets": list(self.buckets),
+            **{
+                name: [[list(k), v] for k, v in merged[name].items()]
+                for name in ("latency", "status", "queries", "alimtalk")
+            },
+        }
+
+    def _merge(self, snapshots):
+        merged = {"latency": {}, "status": {}, "queries": {}, "alimtalk": {}}
+        for snap in snapshots:
+            if list(snap.get("buckets", [])) != list(self.buckets):
+                # 버킷 구성이 다른 (이전 배포) 파일은 히스토그램을 합산할 수 없음
+                continue
+            for key, values in snap["latency"]:
+                hist = merged["latency"].setdefault(
+                    tuple(key), [0] * (len(self.buckets) + 2)
+                )
+                for i, v in enumerate(values):
+                    hist[i] += v
+            for name in ("status", "queries", "alimtalk"):
+                for key, value in snap[name]:
+                    merged[name][tuple(key)] = merged[name].get(tuple(key), 0) + value
+        return merged
+
+    # ------------------------------------------------------------------
+    # Prometheus 텍스트 포맷
+    # ------------------------------------------------------------------
+
+    def render(self):
+        data = self.collect()
+        lines = []
+
+        lines.append(
+            "# HELP comet_http_request_duration_seconds 요청 처리 시간 (초)"
+        )
+        lines.append("# TYPE comet_http_request_duration_seconds histogram")
+        for key, hist in sorted(data["latency"].items()):
+            labels = dict(zip(REQUEST_LABELS, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, hist):
+                cumulative += count
+                lines.append(
+                    "comet_http_request_duration_seconds_bucket"
+                    f"{_format_labels(labels, le=_format_float(bound))} {cumulative}"
+                )
+            lines.append(
+                "comet_http_request_duration_seconds_bucket"
+                f"{_format_labels(labels, le='+Inf')} {hist[-1]}"
+            )
+            lines.append(
+                f"comet_http_request_duration_seconds_sum{_format_labels(labels)} "
+                f"{_format_float(hist[-2])}"
+            )
+            lines.append(
+                f"comet_http_request_duration_seconds_count{_format_labels(labels)} "
+                f"{hist[-1]}"
+            )
+
+        self._render_counter(
+            lines,
+            "comet_http_requests_total",
+            "상태코드별 요청 수",
+            STATUS_LABELS,
+            data["status"],
+        )
+        self._render_counter(
+            lines,
+            "comet_db_queries_total",
+            "요청 처리 중 실행된 DB 쿼리 수",
+            QUERY_LABELS,
+            data["queries"],
+        )
+        self._render_counter(
+            lines,
+            "comet_alimtalk_messages_total",
+            "알림톡 발송 결과",
+            ALIMTALK_LABELS,
+            data["alimtalk"],
+        )
+        return "\n".join(lines) + "\n"
+
+    def _render_counter(self, lines, name, help_text, label_names, values):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for key, value in sorted(values.items()):
+            labels = dict(zip(label_names, key))
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # 권한이 없으면 다른 사용자의 살아 있는 프로세스
+        return True
+    return True
+
+
+def _format_float(value):
+    return repr(float(value))
+
+
+def _format_labels(labels, **extra):
+    items = {**labels, **extra}
+    if not items:
+        return ""
+    parts = []
+    for k, v in items.items():
+        v = str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,146 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.db import connections
+from django.middleware.gzip import GZipMiddleware
+
+from .metrics import registry, view_label
+from .routers import (
+    activate_replica,
+    deactivate_replica,
+    has_recent_write,
+    mark_recent_write,
+    replica_configured,
+    replica_eligible,
+)
+from .slow_queries import SlowQueryRecorder
+
+
+class QueryCounter:
+    """connection.execute_wrapper 로 등록되어 실행된 쿼리 수를 센다"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """
+    요청별 지연시간, 상태코드, DB 쿼리 수를 메트릭 레지스트리에 기록
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, "METRICS_ENABLED", True):
+            return self.get_response(request)
+
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(counter))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        view, action = getattr(request, "_metrics_view", ("unmatched", ""))
+        registry.observe_request(
+            view, action, request.method, response.status_code, duration, counter.count
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metrics_view = view_label(request, view_func)
+
+
+class SlowQueryMiddleware:
+    """
+    SLOW_QUERY_THRESHOLD_MS 를 넘는 쿼리를 EXPLAIN 결과와 함께 느린 쿼리 로그에 기록
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        threshold = getattr(settings, "SLOW_QUERY_THRESHOLD_MS", None)
+        if not threshold:
+            return self.get_response(request)
+
+        recorder = SlowQueryRecorder(threshold)
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        if recorder.pending:
+            view, action = getattr(request, "_slow_query_view", ("unmatched", ""))
+            recorder.explain_all(view, action, request.path)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._slow_query_view = view_label(request, view_func)
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    gzip 을 허용한(Accept-Encoding) 요청에 대해 GZIP_MIN_LENGTH 바이트 이상의 응답만 압축
+    (Server-Sent Events 는 압축하면 이벤트가 버퍼에 묶이므로 제외)
+    """
+
+    def process_response(self, request, response):
+        if response.get("Content-Type", "").startswith("text/event-stream"):
+            return response
+        min_length = getattr(settings, "GZIP_MIN_LENGTH", 1024)
+        if not response.streaming and len(response.content) < min_length:
+            return response
+        return super().process_response(request, response)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    복제 DB 로 보낼 수 있는 조회 요청을 표시하고, 쓰기 요청 뒤에는 사용자를 기본 DB 에 고정
+    (AuthenticationMiddleware 다음에 위치해야 함)
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_configured():
+            return self.get_response(request)
+
+        request._replica_token = None
+        try:
+            response = self.get_response(request)
+        finally:
+            if request._replica_token is not None:
+                deactivate_replica(request._replica_token)
+
+        user_id = request.session.get(SESSION_KEY)
+        if (
+            user_id
+            and request.method not in ("GET", "HEAD", "OPTIONS")
+            and response.status_code < 400
+            and not getattr(request, "_read_only_view", False)
+        ):
+            mark_recent_write(response, user_id)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not replica_configured():
+            return None
+        # POST 이지만 데이터를 바꾸지 않는 뷰(read_only = True, 예: 묶음 조회)는 쓰기로 보지 않음
+        request._read_only_view = getattr(getattr(view_func, "cls", None), "read_only", False)
+        if not replica_eligible(request, view_func):
+            return None
+        user_id = request.session.get(SESSION_KEY)
+        if user_id and has_recent_write(request, user_id):
+            return None
+        request._replica_token = activate_replica()
+        return None
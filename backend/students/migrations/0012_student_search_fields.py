@@ -0,0 +1,60 @@
+# Generated by Django 5.2.1 on 2026-10-19 01:33
+
+from django.db import migrations, models
+
+
+# 이 마이그레이션 시점의 정규화 규칙 (students.normalization 이 바뀌어도 결과가 달라지지 않도록 복사)
+def normalize_search_text(value):
+    return "".join((value or "").split()).lower()
+
+
+def phone_last4(value):
+    return "".join(filter(str.isdigit, value or ""))[-4:]
+
+
+def backfill_search_fields(apps, schema_editor):
+    Student = apps.get_model("students", "Student")
+    students = list(
+        Student.objects.only("id", "name", "school", "parent_phone", "student_phone")
+    )
+    for student in students:
+        student.search_name = normalize_search_text(student.name)
+        student.search_school = normalize_search_text(student.school)
+        student.parent_phone_last4 = phone_last4(student.parent_phone)
+        student.student_phone_last4 = phone_last4(student.student_phone)
+    Student.objects.bulk_update(
+        students,
+        ["search_name", "search_school", "parent_phone_last4", "student_phone_last4"],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0011_alter_class_subject_alter_exam_max_score_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='parent_phone_last4',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=4),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='search_name',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='search_school',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='student_phone_last4',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=4),
+        ),
+        migrations.RunPython(backfill_search_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.1 on 2026-10-19 01:34
+
+from django.db import migrations, models
+
+
+# 이 마이그레이션 시점의 정규화 규칙 (students.normalization 이 바뀌어도 결과가 달라지지 않도록 복사)
+def phone_digits(value):
+    return "".join(filter(str.isdigit, value or ""))
+
+
+def phone_e164(value, country_code="82"):
+    digits = phone_digits(value)
+    if not digits:
+        return ""
+    if digits.startswith("0"):
+        return f"+{country_code}{digits[1:]}"
+    if digits.startswith(country_code):
+        return f"+{digits}"
+    return f"+{country_code}{digits}"
+
+
+def backfill_phone_digits(apps, schema_editor):
+    Student = apps.get_model("students", "Student")
+    students = list(Student.objects.only("id", "parent_phone", "student_phone"))
+    for student in students:
+        student.parent_phone_digits = phone_digits(student.parent_phone)
+        student.student_phone_digits = phone_digits(student.student_phone)
+        student.parent_phone_e164 = phone_e164(student.parent_phone)
+    Student.objects.bulk_update(
+        students,
+        ["parent_phone_digits", "student_phone_digits", "parent_phone_e164"],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0012_student_search_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='parent_phone_digits',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=15),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='parent_phone_e164',
+            field=models.CharField(default='', editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='student_phone_digits',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=15),
+        ),
+        migrations.RunPython(backfill_phone_digits, migrations.RunPython.noop),
+    ]
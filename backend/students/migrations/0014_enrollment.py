@@ -0,0 +1,82 @@
+# Generated by Django 5.2.1 on 2026-10-19 01:39
+
+import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Max, Min
+
+
+def backfill_enrollments(apps, schema_editor):
+    """
+    현재 반 배정은 열린 기간으로, 반에서 빠진 학생은 마지막 출석일까지의 기간으로 만든다.
+    등록일 기록이 없으므로 반과 학생이 모두 생성된 날로 추정하되,
+    그보다 앞선 출석 기록이 있으면 첫 출석일을 쓴다.
+    """
+    Class = apps.get_model("students", "Class")
+    Student = apps.get_model("students", "Student")
+    Attendance = apps.get_model("students", "Attendance")
+    Enrollment = apps.get_model("students", "Enrollment")
+
+    attended = {
+        (row["class_info_id"], row["student_id"]): (row["first"], row["last"])
+        for row in Attendance.objects.filter(class_info__isnull=False)
+        .values("class_info_id", "student_id")
+        .annotate(first=Min("date"), last=Max("date"))
+    }
+    class_created = dict(Class.objects.values_list("pk", "created_at"))
+    student_created = dict(Student.objects.values_list("pk", "created_at"))
+    current = set(Class.students.through.objects.values_list("class_id", "student_id"))
+
+    def start_date(class_id, student_id):
+        created = max(class_created[class_id], student_created[student_id]).date()
+        if (class_id, student_id) in attended:
+            return min(created, attended[(class_id, student_id)][0])
+        return created
+
+    enrollments = [
+        Enrollment(
+            class_info_id=class_id,
+            student_id=student_id,
+            start_date=start_date(class_id, student_id),
+        )
+        for class_id, student_id in current
+    ]
+    enrollments.extend(
+        Enrollment(
+            class_info_id=class_id,
+            student_id=student_id,
+            start_date=start_date(class_id, student_id),
+            end_date=last + datetime.timedelta(days=1),
+        )
+        for (class_id, student_id), (first, last) in attended.items()
+        if (class_id, student_id) not in current
+    )
+    Enrollment.objects.bulk_create(enrollments, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0013_student_phone_digits'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Enrollment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField(verbose_name='등록일')),
+                ('end_date', models.DateField(blank=True, null=True, verbose_name='퇴반일')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일')),
+                ('class_info', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to='students.class', verbose_name='반')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to='students.student', verbose_name='학생')),
+            ],
+            options={
+                'verbose_name': '반 등록 기간',
+                'verbose_name_plural': '반 등록 기간',
+                'indexes': [models.Index(fields=['class_info', 'start_date'], name='students_en_class_i_d90b8b_idx'), models.Index(fields=['student', 'end_date'], name='students_en_student_0ef47d_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_enrollments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.1 on 2026-10-19 01:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0014_enrollment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAttendance',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('date', models.DateField(verbose_name='출석일')),
+                ('class_type', models.CharField(choices=[('REGULAR', '정규'), ('MAKEUP', '대체'), ('EXTRA', '보강'), ('ADDITIONAL', '추가')], max_length=10, verbose_name='수업종류')),
+                ('content', models.TextField(verbose_name='수업내용')),
+                ('is_late', models.BooleanField(default=False, verbose_name='지각여부')),
+                ('homework_completion', models.PositiveIntegerField(verbose_name='숙제이행도')),
+                ('homework_accuracy', models.PositiveIntegerField(verbose_name='숙제정답률')),
+                ('created_at', models.DateTimeField(verbose_name='생성일')),
+                ('updated_at', models.DateTimeField(verbose_name='수정일')),
+                ('school_year', models.PositiveSmallIntegerField(db_index=True, verbose_name='학년도')),
+                ('archived_at', models.DateTimeField(verbose_name='보관일')),
+                ('class_info', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_attendances', to='students.class', verbose_name='반')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attendances', to='students.student', verbose_name='학생')),
+            ],
+            options={
+                'verbose_name': '보관된 출석',
+                'verbose_name_plural': '보관된 출석',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedExam',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100, verbose_name='시험이름')),
+                ('category', models.CharField(choices=[('REVIEW', '복습테스트'), ('ESSAY', '서술테스트'), ('ORAL', '구술테스트'), ('MOCK', '모의고사'), ('SCHOOL', '학교기출')], max_length=10, verbose_name='시험종류')),
+                ('score', models.FloatField(blank=True, null=True, verbose_name='점수')),
+                ('max_score', models.FloatField(blank=True, null=True, verbose_name='만점')),
+                ('grade', models.CharField(blank=True, choices=[('A+', 'A+'), ('A', 'A'), ('A-', 'A-'), ('B+', 'B+'), ('B', 'B'), ('B-', 'B-'), ('C+', 'C+'), ('C', 'C'), ('C-', 'C-'), ('D', 'D'), ('F', 'F')], max_length=2, null=True, verbose_name='등급')),
+                ('created_at', models.DateTimeField(verbose_name='생성일')),
+                ('updated_at', models.DateTimeField(verbose_name='수정일')),
+                ('school_year', models.PositiveSmallIntegerField(db_index=True, verbose_name='학년도')),
+                ('archived_at', models.DateTimeField(verbose_name='보관일')),
+                ('attendance', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='students.archivedattendance', verbose_name='출석')),
+            ],
+            options={
+                'verbose_name': '보관된 시험',
+                'verbose_name_plural': '보관된 시험',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedattendance',
+            index=models.Index(fields=['student', 'date'], name='students_ar_student_4999bc_idx'),
+        ),
+    ]
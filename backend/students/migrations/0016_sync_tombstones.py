@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-19 01:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0015_archived_records'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='attendance',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='수정일'),
+        ),
+        migrations.AlterField(
+            model_name='exam',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='수정일'),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='수정일'),
+        ),
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(choices=[('student', '학생'), ('attendance', '출석'), ('exam', '시험')], max_length=20, verbose_name='모델')),
+                ('object_id', models.BigIntegerField(verbose_name='삭제된 id')),
+                ('deleted_at', models.DateTimeField(db_index=True, verbose_name='삭제일')),
+            ],
+            options={
+                'verbose_name': '삭제 기록',
+                'verbose_name_plural': '삭제 기록',
+                'indexes': [models.Index(fields=['model_name', 'object_id'], name='students_to_model_n_e55cf9_idx')],
+            },
+        ),
+    ]
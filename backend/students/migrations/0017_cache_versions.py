@@ -0,0 +1,24 @@
+# Generated by Django 5.2.1 on 2026-10-19 02:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0016_sync_tombstones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='이름')),
+                ('version', models.BigIntegerField(default=0, verbose_name='버전')),
+            ],
+            options={
+                'verbose_name': '캐시 버전',
+                'verbose_name_plural': '캐시 버전',
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-19 02:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0017_cache_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tombstone',
+            name='class_id',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='반 id'),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='date',
+            field=models.DateField(blank=True, null=True, verbose_name='출석일'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['class_id', 'date', 'deleted_at'], name='students_to_class_i_a15a4c_idx'),
+        ),
+    ]
@@ -2,6 +2,8 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.utils.translation import gettext_lazy as _
 
+from .normalization import normalize_search_text, phone_digits, phone_e164, phone_last4
+
 
 class Subject(models.Model):
     name = models.CharField(max_length=50, unique=True, verbose_name="과목명")
@@ -33,6 +35,20 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
 
+    def get_subject_ids(self):
+        """권한 과목 id 목록 (인증 캐시에서 미리 채워지며, 없으면 참조 데이터 캐시에서 가져옴)"""
+        if getattr(self, "_subject_ids", None) is None:
+            from .caching import reference
+
+            self._subject_ids = reference.user_subject_ids(self.pk)
+        return self._subject_ids
+
+    def has_subject(self, subject_id):
+        try:
+            return int(subject_id) in self.get_subject_ids()
+        except (TypeError, ValueError):
+            return False
+
 
 class Class(models.Model):
     class DayOfWeek(models.TextChoices):
@@ -84,8 +100,40 @@ class Student(models.Model):
     school = models.CharField(
         max_length=100, null=True, blank=True, verbose_name="학교"
     )
+    # 검색용 정규화 컬럼 (save 시 자동 갱신)
+    search_name = models.CharField(
+        max_length=100, default="", editable=False, db_index=True
+    )
+    search_school = models.CharField(
+        max_length=100, default="", editable=False, db_index=True
+    )
+    parent_phone_last4 = models.CharField(
+        max_length=4, default="", editable=False, db_index=True
+    )
+    student_phone_last4 = models.CharField(
+        max_length=4, default="", editable=False, db_index=True
+    )
+    # 중복 확인/알림 발송용 정규화 전화번호 (save 시 자동 갱신)
+    parent_phone_digits = models.CharField(
+        max_length=15, default="", editable=False, db_index=True
+    )
+    student_phone_digits = models.CharField(
+        max_length=15, default="", editable=False, db_index=True
+    )
+    parent_phone_e164 = models.CharField(max_length=16, default="", editable=False)
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="생성일")
-    updated_at = models.DateTimeField(auto_now=True, verbose_name="수정일")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="수정일")
+
+    NORMALIZED_SOURCE_FIELDS = {"name", "school", "parent_phone", "student_phone"}
+    NORMALIZED_FIELDS = [
+        "search_name",
+        "search_school",
+        "parent_phone_last4",
+        "student_phone_last4",
+        "parent_phone_digits",
+        "student_phone_digits",
+        "parent_phone_e164",
+    ]
 
     class Meta:
         verbose_name = "학생"
@@ -99,6 +147,55 @@ class Student(models.Model):
     def __str__(self):
         return self.name
 
+    def refresh_normalized_fields(self):
+        self.search_name = normalize_search_text(self.name)
+        self.search_school = normalize_search_text(self.school)
+        self.parent_phone_last4 = phone_last4(self.parent_phone)
+        self.student_phone_last4 = phone_last4(self.student_phone)
+        self.parent_phone_digits = phone_digits(self.parent_phone)
+        self.student_phone_digits = phone_digits(self.student_phone)
+        self.parent_phone_e164 = phone_e164(self.parent_phone)
+
+    def save(self, *args, **kwargs):
+        self.refresh_normalized_fields()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and self.NORMALIZED_SOURCE_FIELDS & set(
+            update_fields
+        ):
+            kwargs["update_fields"] = set(update_fields) | set(self.NORMALIZED_FIELDS)
+        super().save(*args, **kwargs)
+
+
+class Enrollment(models.Model):
+    """
+    반 등록 기간 (start_date 부터 end_date 전날까지 등록)
+
+    Class.students 관계가 바뀔 때 signals 에서 기간을 열고 닫는다.
+    지난 달의 결석 계산처럼 특정 날짜의 반 명단이 필요할 때 사용한다.
+    """
+
+    class_info = models.ForeignKey(
+        Class, on_delete=models.CASCADE, related_name="enrollments", verbose_name="반"
+    )
+    student = models.ForeignKey(
+        Student, on_delete=models.CASCADE, related_name="enrollments", verbose_name="학생"
+    )
+    start_date = models.DateField(verbose_name="등록일")
+    end_date = models.DateField(null=True, blank=True, verbose_name="퇴반일")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="생성일")
+
+    class Meta:
+        verbose_name = "반 등록 기간"
+        verbose_name_plural = "반 등록 기간"
+        indexes = [
+            models.Index(fields=["class_info", "start_date"]),
+            models.Index(fields=["student", "end_date"]),
+        ]
+
+    def __str__(self):
+        end = self.end_date or ""
+        return f"{self.student} - {self.class_info} ({self.start_date} ~ {end})"
+
 
 class Attendance(models.Model):
     class ClassType(models.TextChoices):
@@ -120,7 +217,7 @@ class Attendance(models.Model):
     homework_completion = models.PositiveIntegerField(verbose_name="숙제이행도")
     homework_accuracy = models.PositiveIntegerField(verbose_name="숙제정답률")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="생성일")
-    updated_at = models.DateTimeField(auto_now=True, verbose_name="수정일")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="수정일")
 
     class Meta:
         verbose_name = "출석"
@@ -167,7 +264,7 @@ class Exam(models.Model):
         max_length=2, choices=Grade.choices, null=True, blank=True, verbose_name="등급"
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="생성일")
-    updated_at = models.DateTimeField(auto_now=True, verbose_name="수정일")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="수정일")
 
     class Meta:
         verbose_name = "시험"
@@ -198,3 +295,130 @@ class Exam(models.Model):
     def save(self, *args, **kwargs):
         self.clean()
         super().save(*args, **kwargs)
+
+
+class ArchivedAttendance(models.Model):
+    """
+    지난 학년도 출석 기록
+
+    archive_school_year 명령으로 Attendance 에서 옮겨지며, 복원할 수 있도록 원래 id 를 유지한다.
+    필드 이름이 Attendance 와 같아서 readers.attendance_rows 로 그대로 직렬화할 수 있다.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        related_name="archived_attendances",
+        verbose_name="학생",
+    )
+    class_info = models.ForeignKey(
+        Class,
+        on_delete=models.CASCADE,
+        related_name="archived_attendances",
+        verbose_name="반",
+        null=True,
+    )
+    date = models.DateField(verbose_name="출석일")
+    class_type = models.CharField(
+        max_length=10, choices=Attendance.ClassType.choices, verbose_name="수업종류"
+    )
+    content = models.TextField(verbose_name="수업내용")
+    is_late = models.BooleanField(default=False, verbose_name="지각여부")
+    homework_completion = models.PositiveIntegerField(verbose_name="숙제이행도")
+    homework_accuracy = models.PositiveIntegerField(verbose_name="숙제정답률")
+    created_at = models.DateTimeField(verbose_name="생성일")
+    updated_at = models.DateTimeField(verbose_name="수정일")
+    school_year = models.PositiveSmallIntegerField(db_index=True, verbose_name="학년도")
+    archived_at = models.DateTimeField(verbose_name="보관일")
+
+    class Meta:
+        verbose_name = "보관된 출석"
+        verbose_name_plural = "보관된 출석"
+        indexes = [models.Index(fields=["student", "date"])]
+
+    def __str__(self):
+        return f"{self.student.name} - {self.date} ({self.school_year}학년도)"
+
+
+class ArchivedExam(models.Model):
+    """지난 학년도 시험 기록 (ArchivedAttendance 와 함께 보관/복원)"""
+
+    id = models.BigIntegerField(primary_key=True)
+    attendance = models.ForeignKey(
+        ArchivedAttendance, on_delete=models.CASCADE, verbose_name="출석"
+    )
+    name = models.CharField(max_length=100, verbose_name="시험이름")
+    category = models.CharField(
+        max_length=10, choices=Exam.Category.choices, verbose_name="시험종류"
+    )
+    score = models.FloatField(null=True, blank=True, verbose_name="점수")
+    max_score = models.FloatField(null=True, blank=True, verbose_name="만점")
+    grade = models.CharField(
+        max_length=2, choices=Exam.Grade.choices, null=True, blank=True, verbose_name="등급"
+    )
+    created_at = models.DateTimeField(verbose_name="생성일")
+    updated_at = models.DateTimeField(verbose_name="수정일")
+    school_year = models.PositiveSmallIntegerField(db_index=True, verbose_name="학년도")
+    archived_at = models.DateTimeField(verbose_name="보관일")
+
+    class Meta:
+        verbose_name = "보관된 시험"
+        verbose_name_plural = "보관된 시험"
+
+    def __str__(self):
+        return f"{self.name} ({self.school_year}학년도)"
+
+
+class Tombstone(models.Model):
+    """
+    삭제 기록
+
+    /api/sync/ 가 클라이언트 캐시에서 지울 행을 알려줄 수 있도록 학생/출석/시험이 삭제되거나
+    보관 테이블로 옮겨질 때 남긴다. SYNC_TOMBSTONE_DAYS 가 지난 기록은 prune_tombstones 명령으로 지운다.
+    출석/시험은 실시간 이벤트가 구독 중인 (반, 날짜)로 거를 수 있도록 반 id 와 출석일도 남긴다.
+    """
+
+    class ModelName(models.TextChoices):
+        STUDENT = "student", _("학생")
+        ATTENDANCE = "attendance", _("출석")
+        EXAM = "exam", _("시험")
+
+    model_name = models.CharField(
+        max_length=20, choices=ModelName.choices, verbose_name="모델"
+    )
+    object_id = models.BigIntegerField(verbose_name="삭제된 id")
+    # 반이 지워져도 기록은 남아야 하므로 외래 키가 아닌 id 로 보관
+    class_id = models.BigIntegerField(null=True, blank=True, verbose_name="반 id")
+    date = models.DateField(null=True, blank=True, verbose_name="출석일")
+    deleted_at = models.DateTimeField(db_index=True, verbose_name="삭제일")
+
+    class Meta:
+        verbose_name = "삭제 기록"
+        verbose_name_plural = "삭제 기록"
+        indexes = [
+            models.Index(fields=["model_name", "object_id"]),
+            models.Index(fields=["class_id", "date", "deleted_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.model_name} #{self.object_id} ({self.deleted_at})"
+
+
+class CacheVersion(models.Model):
+    """
+    캐시 무효화 버전 번호
+
+    기본 캐시가 워커별 메모리(LocMemCache)라서 워커끼리 버전을 공유할 수 없을 때
+    students.caching 이 Django 캐시 대신 이 테이블에 버전을 둔다.
+    """
+
+    name = models.CharField(max_length=100, primary_key=True, verbose_name="이름")
+    version = models.BigIntegerField(default=0, verbose_name="버전")
+
+    class Meta:
+        verbose_name = "캐시 버전"
+        verbose_name_plural = "캐시 버전"
+
+    def __str__(self):
+        return f"{self.name} ({self.version})"
@@ -0,0 +1,29 @@
+"""
+검색/중복 확인용 정규화 함수
+"""
+
+
+def normalize_search_text(value):
+    """공백 제거 + 소문자 (이름, 학교 접두어 검색용)"""
+    return "".join((value or "").split()).lower()
+
+
+def phone_digits(value):
+    """전화번호에서 숫자만 추출"""
+    return "".join(filter(str.isdigit, value or ""))
+
+
+def phone_last4(value):
+    return phone_digits(value)[-4:]
+
+
+def phone_e164(value, country_code="82"):
+    """국내 번호를 E.164 형식으로 변환 (예: 010-1234-5678 -> +821012345678)"""
+    digits = phone_digits(value)
+    if not digits:
+        return ""
+    if digits.startswith("0"):
+        return f"+{country_code}{digits[1:]}"
+    if digits.startswith(country_code):
+        return f"+{digits}"
+    return f"+{country_code}{digits}"
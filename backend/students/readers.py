@@ -0,0 +1,186 @@
+"""
+목록 조회용 경량 read path
+
+AttendanceSerializer / ExamSerializer 와 같은 모양의 dict 를 values() 쿼리 한 번으로 만든다.
+학생 이름, 반 이름 등 연관 필드는 JOIN 으로 함께 가져오므로 행마다 추가 쿼리가 없다.
+쓰기(생성/수정)와 단건 조회는 기존 serializer 를 그대로 사용한다.
+"""
+
+import calendar
+import datetime
+
+from rest_framework import serializers
+
+from .absence import enrollment_periods, is_enrolled
+from .models import Attendance, Exam
+
+CLASS_TYPE_DISPLAY = {
+    "REGULAR": "정규",
+    "MAKEUP": "대체",
+    "EXTRA": "보강",
+    "ADDITIONAL": "추가",
+}
+
+_datetime_field = serializers.DateTimeField()
+
+
+def _date(value):
+    return value.isoformat() if value is not None else None
+
+
+def _datetime(value):
+    return _datetime_field.to_representation(value) if value is not None else None
+
+
+def _float(value):
+    return float(value) if value is not None else None
+
+
+ATTENDANCE_VALUES = (
+    "id",
+    "student_id",
+    "student__name",
+    "class_info_id",
+    "class_info__name",
+    "date",
+    "class_type",
+    "content",
+    "is_late",
+    "homework_completion",
+    "homework_accuracy",
+    "created_at",
+    "updated_at",
+)
+
+
+def attendance_rows(queryset):
+    """AttendanceSerializer(many=True).data 와 같은 목록"""
+    return [
+        {
+            "id": row["id"],
+            "student": row["student_id"],
+            "student_name": row["student__name"],
+            "class_info": row["class_info_id"],
+            "class_info_name": row["class_info__name"],
+            "date": _date(row["date"]),
+            "class_type": row["class_type"],
+            "class_type_display": CLASS_TYPE_DISPLAY.get(
+                row["class_type"], row["class_type"]
+            ),
+            "content": row["content"],
+            "is_late": row["is_late"],
+            "homework_completion": row["homework_completion"],
+            "homework_accuracy": row["homework_accuracy"],
+            "created_at": _datetime(row["created_at"]),
+            "updated_at": _datetime(row["updated_at"]),
+        }
+        for row in queryset.values(*ATTENDANCE_VALUES)
+    ]
+
+
+EXAM_VALUES = (
+    "id",
+    "attendance_id",
+    "attendance__student__name",
+    "attendance__date",
+    "name",
+    "category",
+    "score",
+    "max_score",
+    "grade",
+    "attendance__class_info_id",
+    "created_at",
+    "updated_at",
+)
+
+
+def exam_rows(queryset):
+    """ExamSerializer(many=True).data 와 같은 목록"""
+    category_display = {value: str(label) for value, label in Exam.Category.choices}
+    return [
+        {
+            "id": row["id"],
+            "attendance": row["attendance_id"],
+            "student_name": row["attendance__student__name"],
+            "exam_date": _date(row["attendance__date"]),
+            "name": row["name"],
+            "category": row["category"],
+            "category_display": category_display.get(row["category"], row["category"]),
+            "score": _float(row["score"]),
+            "max_score": _float(row["max_score"]),
+            "grade": row["grade"],
+            "class_info": row["attendance__class_info_id"],
+            "created_at": _datetime(row["created_at"]),
+            "updated_at": _datetime(row["updated_at"]),
+        }
+        for row in queryset.values(*EXAM_VALUES)
+    ]
+
+
+# 출석 매트릭스 상태 코드 (STATUS_CODES 의 인덱스)
+ABSENT, PRESENT, LATE, MAKEUP, NOT_ENROLLED = range(5)
+STATUS_CODES = ["absent", "present", "late", "makeup", "not_enrolled"]
+
+
+def month_range(value):
+    """'YYYY-MM' 을 (첫날, 마지막날) 로 변환. 형식이 틀리면 None"""
+    try:
+        year, month = (int(part) for part in value.split("-"))
+        first = datetime.date(year, month, 1)
+    except (AttributeError, TypeError, ValueError):
+        return None
+    last = datetime.date(year, month, calendar.monthrange(year, month)[1])
+    return first, last
+
+
+def attendance_matrix(class_info, first, last):
+    """
+    반의 기간 내 출석을 학생 × 수업일 매트릭스로 반환
+
+    명단과 수업일은 한 번씩만 보내고, 각 학생 행은 수업일 순서의 상태 코드 배열이다.
+    명단은 기간 중 반에 등록되어 있던 학생과 출석 기록이 있는 학생을 합친 것이며,
+    기록이 없는 날은 그날 등록되어 있었으면 결석, 아니면 미등록으로 표시한다.
+    """
+    records = (
+        Attendance.objects.filter(class_info=class_info, date__range=(first, last))
+        .order_by()
+        .values_list("student_id", "student__name", "date", "class_type", "is_late")
+    )
+
+    periods = enrollment_periods(class_info, first, last)
+    roster = {pk: name for pk, (name, _) in periods.items()}
+    statuses = {}
+    dates = set()
+    for student_id, student_name, date, class_type, is_late in records:
+        roster.setdefault(student_id, student_name)
+        dates.add(date)
+        if class_type == Attendance.ClassType.MAKEUP:
+            code = MAKEUP
+        elif is_late:
+            code = LATE
+        else:
+            code = PRESENT
+        statuses[(student_id, date)] = code
+
+    dates = sorted(dates)
+    student_ids = sorted(roster, key=lambda pk: (roster[pk], pk))
+    return {
+        "class_id": class_info.pk,
+        "month": first.strftime("%Y-%m"),
+        "status_codes": STATUS_CODES,
+        "dates": [date.isoformat() for date in dates],
+        "student_ids": student_ids,
+        "student_names": [roster[pk] for pk in student_ids],
+        "matrix": [
+            [_matrix_status(statuses, periods, pk, date) for date in dates]
+            for pk in student_ids
+        ],
+    }
+
+
+def _matrix_status(statuses, periods, student_id, date):
+    code = statuses.get((student_id, date))
+    if code is not None:
+        return code
+    spans = periods[student_id][1] if student_id in periods else []
+    return ABSENT if is_enrolled(spans, date) else NOT_ENROLLED
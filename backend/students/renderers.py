@@ -0,0 +1,40 @@
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+_encoder = encoders.JSONEncoder()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    orjson 기반 JSON 렌더러
+
+    출력은 DRF 기본 JSONRenderer 와 동일하다 (UTF-8, 공백 없는 구분자, datetime 의 'Z' 표기).
+    orjson 이 없거나 들여쓰기를 요청한 경우(브라우저블 API 등)에는 기본 렌더러로 처리한다.
+    """
+
+    orjson_options = orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_encoder.default, option=self.orjson_options)
+        except (orjson.JSONEncodeError, TypeError):
+            # 64비트를 넘는 정수 등 orjson 이 처리하지 못하는 값
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # 기본 렌더러와 마찬가지로 U+2028, U+2029 를 이스케이프 (JavaScript 호환)
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
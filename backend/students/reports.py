@@ -0,0 +1,170 @@
+"""
+대시보드/시험 통계 집계와 캐시
+
+DashboardView 와 ExamViewSet.exam_averages 의 응답은 사용자 자체가 아니라
+권한 과목 범위(scope)와 조회 조건에만 의존하므로, (기록 버전, 참조 데이터 버전, 범위, 조건)을
+키로 캐시한다. 기록이나 과목/반이 바뀌면 버전이 올라가 이전 항목은 더 이상 조회되지 않는다.
+배포 직후에는 warm_report_cache 명령으로 이번 달과 지난 달 집계를 미리 채울 수 있다.
+"""
+
+import calendar
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .absence import class_absences
+from .caching import get_records_version, get_reference_version
+from .exam_stats import exam_statistics
+from .models import Class, Exam, User
+from .routers import primary_reads
+
+
+def subject_scope(user):
+    """역할 범위: 관리자는 None(전체), 선생님/조교는 권한 과목 id 튜플"""
+    if user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
+        return tuple(sorted(user.get_subject_ids()))
+    return None
+
+
+def month_bounds(target_month):
+    first_day = target_month.replace(day=1)
+    last_day = target_month.replace(
+        day=calendar.monthrange(target_month.year, target_month.month)[1]
+    )
+    return first_day, last_day
+
+
+def accessible_classes(scope):
+    classes = Class.objects.all()
+    if scope is not None:
+        classes = classes.filter(Q(subject__in=scope) | Q(name="퇴원"))
+    return classes
+
+
+def class_list_stats(classes):
+    rows = (
+        classes.order_by()
+        .annotate(student_count=Count("students"))
+        .values("id", "name", "subject__name", "student_count")
+    )
+    return [
+        {
+            "id": row["id"],
+            "name": row["name"],
+            "subject": row["subject__name"] or "과목없음",
+            "student_count": row["student_count"],
+        }
+        for row in rows
+    ]
+
+
+def grade_stats(selected_class, first_day, last_day):
+    scores = (
+        Exam.objects.filter(
+            attendance__class_info=selected_class,
+            attendance__date__range=(first_day, last_day),
+        )
+        .exclude(score__isnull=True)
+        .values_list("name", "score")
+    )
+
+    exam_groups = {}
+    for name, score in scores:
+        exam_groups.setdefault(name, []).append(score)
+
+    return [
+        {
+            "exam_name": name,
+            "average": sum(scores) // len(scores) if scores else 0,
+            "highest": max(scores) if scores else 0,
+            "lowest": min(scores) if scores else 0,
+            "count": len(scores),
+        }
+        for name, scores in exam_groups.items()
+    ]
+
+
+def dashboard_payload(scope, target_month, class_id=None):
+    classes = accessible_classes(scope)
+    payload = {
+        "class_stats": class_list_stats(classes),
+        "attendance_stats": [],
+        "absent_students": [],
+        "grade_stats": [],
+    }
+
+    if class_id:
+        selected_class = classes.filter(id=class_id).first()
+        if selected_class:
+            first_day, last_day = month_bounds(target_month)
+            absences = class_absences(selected_class, first_day, last_day)
+            payload["attendance_stats"] = absences["dates"]
+            payload["absent_students"] = absences["students"]
+            payload["grade_stats"] = grade_stats(selected_class, first_day, last_day)
+
+    return payload
+
+
+def exam_averages_payload(scope, class_id=None, subject_id=None, date_from=None, date_to=None):
+    queryset = Exam.objects.all()
+    if scope is not None:
+        queryset = queryset.filter(
+            Q(attendance__class_info__subject__in=scope) | Q(attendance__class_info__name="퇴원")
+        )
+    if class_id:
+        queryset = queryset.filter(attendance__class_info_id=class_id)
+    if subject_id:
+        queryset = queryset.filter(attendance__class_info__subject_id=subject_id)
+    if date_from:
+        queryset = queryset.filter(attendance__date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(attendance__date__lte=date_to)
+    return exam_statistics(queryset)
+
+
+def report_cache_key(kind, scope, *params):
+    parts = [
+        "all" if scope is None else ",".join(str(pk) for pk in scope),
+        *("" if value is None else str(value) for value in params),
+    ]
+    digest = hashlib.md5("|".join(parts).encode(), usedforsecurity=False)
+    return (
+        f"report:{kind}:{get_records_version()}:{get_reference_version()}:{digest.hexdigest()}"
+    )
+
+
+def dashboard_cache_key(scope, target_month, class_id=None):
+    return report_cache_key("dashboard", scope, target_month.isoformat(), class_id)
+
+
+def exam_averages_cache_key(scope, class_id=None, subject_id=None, date_from=None, date_to=None):
+    return report_cache_key("exam_averages", scope, class_id, subject_id, date_from, date_to)
+
+
+def store_report(key, payload):
+    cache.set(key, payload, settings.REPORT_CACHE_TIMEOUT)
+
+
+def _cached(key, build):
+    payload = cache.get(key)
+    if payload is None:
+        # 키의 기록 버전은 기본 DB 에서 읽으므로, 지연된 복제 DB 의 집계가
+        # 새 버전의 키로 저장되어 모든 사용자에게 제공되지 않도록 집계도 기본 DB 에서 계산
+        with primary_reads():
+            payload = build()
+        store_report(key, payload)
+    return payload
+
+
+def cached_dashboard(scope, target_month, class_id=None):
+    key = dashboard_cache_key(scope, target_month, class_id)
+    return _cached(key, lambda: dashboard_payload(scope, target_month, class_id))
+
+
+def cached_exam_averages(scope, class_id=None, subject_id=None, date_from=None, date_to=None):
+    key = exam_averages_cache_key(scope, class_id, subject_id, date_from, date_to)
+    return _cached(
+        key, lambda: exam_averages_payload(scope, class_id, subject_id, date_from, date_to)
+    )
@@ -0,0 +1,235 @@
+"""
+학기 전환
+
+이전 학기 반을 새 요일/시간으로 복제하고 학생 배정을 옮긴다. 계획(plan)은 다음 형태의 dict 이다.
+
+    {
+        "classes": [
+            {
+                "source": 2,                  # 복제할 반 id
+                "name": "화학A (겨울)",        # 생략하면 원래 이름
+                "subject": 1,                 # 생략하면 원래 과목
+                "day_of_week": "SATURDAY",    # 생략하면 원래 요일
+                "start_time": "14:00",        # 생략하면 원래 시간
+                "students": [1, 2, 3],        # 생략하면 원래 반 학생 전체
+                "exclude": [4]                # 복사하지 않을 학생
+            }
+        ],
+        "keep_source": false,                 # true 면 원래 반 배정을 유지
+        "withdraw_non_returning": true        # 새 반에 배정되지 않은 원래 반 학생을 "퇴원" 반으로 이동
+    }
+
+새 반은 반 생성 API(ClassSerializer)와 같은 규칙으로 검증한다. 같은 과목, 같은 요일, 같은 시간의 반이
+이미 있거나 계획 안에서 겹치면 아무것도 만들지 않고 ValueError 를 낸다.
+
+반 배정 변경은 enrollment.apply_changes() 로 through 테이블에 나눠서 bulk INSERT/DELETE 하고,
+전체 작업은 한 트랜잭션에서 실행된다.
+"""
+
+import datetime
+
+from django.db import transaction
+
+from .enrollment import apply_changes
+from .models import Class, Student, Subject
+
+WITHDRAWN_CLASS_NAME = "퇴원"
+
+PLAN_KEYS = {"classes", "keep_source", "withdraw_non_returning"}
+SPEC_KEYS = {"source", "name", "subject", "day_of_week", "start_time", "students", "exclude"}
+
+
+def _parse_time(value):
+    if value is None or isinstance(value, datetime.time):
+        return value
+    try:
+        return datetime.time.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"start_time 형식이 올바르지 않습니다: {value}")
+
+
+def _id_list(spec, key):
+    values = spec.get(key)
+    if values is None:
+        return None
+    if not isinstance(values, list) or not all(
+        isinstance(pk, int) and not isinstance(pk, bool) for pk in values
+    ):
+        raise ValueError(f"{key} 는 학생 id 목록이어야 합니다.")
+    return values
+
+
+def _unknown_keys(values, allowed, where):
+    unknown = sorted(str(key) for key in values if key not in allowed)
+    if unknown:
+        raise ValueError(f"{where}에 알 수 없는 항목이 있습니다: {', '.join(unknown)}")
+
+
+def _check_name(name):
+    if not isinstance(name, str) or not 2 <= len(name.strip()) <= 100:
+        raise ValueError(f"반 이름은 2자 이상 100자 이하여야 합니다: {name}")
+    return name.strip()
+
+
+def _check_slots(classes):
+    """같은 과목, 같은 요일, 같은 시간의 반이 이미 있거나 계획 안에서 겹치는지 확인"""
+    taken = set(
+        Class.objects.exclude(name=WITHDRAWN_CLASS_NAME)
+        .filter(subject_id__in={spec["subject_id"] for spec in classes})
+        .values_list("subject_id", "day_of_week", "start_time")
+    )
+    for spec in classes:
+        slot = (spec["subject_id"], spec["day_of_week"], spec["start_time"])
+        if slot in taken:
+            raise ValueError(
+                f"같은 과목, 같은 요일, 같은 시간에 이미 반이 존재합니다: "
+                f"{spec['name']} ({spec['day_of_week']} {spec['start_time'].strftime('%H:%M')})"
+            )
+        taken.add(slot)
+
+
+def build_rollover(plan):
+    """
+    계획을 검증하고 실행할 변경 내용을 계산 (DB 에 쓰지 않음)
+
+    반환값의 classes 는 새로 만들 반의 속성과 배정할 학생 id 목록이다.
+    """
+    if not isinstance(plan, dict):
+        raise ValueError("계획은 JSON 객체여야 합니다.")
+    _unknown_keys(plan, PLAN_KEYS, "계획")
+
+    specs = plan.get("classes") or []
+    if not specs or not isinstance(specs, list):
+        raise ValueError("classes 에 복제할 반을 하나 이상 지정해주세요.")
+
+    if not all(isinstance(spec, dict) and isinstance(spec.get("source"), int) for spec in specs):
+        raise ValueError("classes 의 각 항목에는 복제할 반 id(source)가 필요합니다.")
+    for spec in specs:
+        _unknown_keys(spec, SPEC_KEYS, f"반 #{spec['source']}")
+
+    source_ids = {spec["source"] for spec in specs}
+    sources = Class.objects.in_bulk(source_ids)
+    missing = sorted(str(pk) for pk in source_ids if pk not in sources)
+    if missing:
+        raise ValueError(f"존재하지 않는 반입니다: {', '.join(missing)}")
+    if any(source.name == WITHDRAWN_CLASS_NAME for source in sources.values()):
+        raise ValueError("퇴원 반은 복제할 수 없습니다.")
+
+    subject_ids = {spec["subject"] for spec in specs if "subject" in spec}
+    if not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in subject_ids):
+        raise ValueError("subject 는 과목 id 여야 합니다.")
+    unknown_subjects = subject_ids - set(
+        Subject.objects.filter(pk__in=subject_ids).values_list("pk", flat=True)
+    )
+    if unknown_subjects:
+        raise ValueError(
+            f"존재하지 않는 과목입니다: {', '.join(str(pk) for pk in sorted(unknown_subjects))}"
+        )
+
+    members = {}
+    for class_id, student_id in Class.students.through.objects.filter(
+        class_id__in=source_ids
+    ).values_list("class_id", "student_id"):
+        members.setdefault(class_id, set()).add(student_id)
+
+    day_choices = set(Class.DayOfWeek.values)
+    classes = []
+    for spec in specs:
+        source = sources[spec["source"]]
+        day_of_week = spec.get("day_of_week", source.day_of_week)
+        if day_of_week not in day_choices:
+            raise ValueError(f"요일이 올바르지 않습니다: {day_of_week}")
+        start_time = _parse_time(spec.get("start_time", source.start_time))
+        if start_time is None:
+            raise ValueError(f"반 #{source.pk} 의 시작 시간을 지정해주세요.")
+        subject_id = spec.get("subject", source.subject_id)
+        if subject_id is None:
+            raise ValueError(f"반 #{source.pk} 의 과목을 지정해주세요.")
+
+        students = _id_list(spec, "students")
+        students = set(students) if students is not None else set(members.get(source.pk, ()))
+        students -= set(_id_list(spec, "exclude") or ())
+
+        classes.append(
+            {
+                "source": source.pk,
+                "source_name": source.name,
+                "name": _check_name(spec.get("name") or source.name),
+                "subject_id": subject_id,
+                "day_of_week": day_of_week,
+                "start_time": start_time,
+                "students": sorted(students),
+            }
+        )
+    _check_slots(classes)
+
+    returning = {pk for spec in classes for pk in spec["students"]}
+    unknown = returning - set(Student.objects.filter(pk__in=returning).values_list("pk", flat=True))
+    if unknown:
+        raise ValueError(
+            f"존재하지 않는 학생입니다: {', '.join(str(pk) for pk in sorted(unknown))}"
+        )
+    source_members = set().union(*members.values()) if members else set()
+    withdrawn = []
+    if plan.get("withdraw_non_returning", True):
+        withdrawn = sorted(source_members - returning)
+
+    return {
+        "classes": classes,
+        "withdrawn": withdrawn,
+        "keep_source": bool(plan.get("keep_source", False)),
+        "source_pairs": {
+            (class_id, student_id)
+            for class_id, student_ids in members.items()
+            for student_id in student_ids
+        },
+    }
+
+
+def apply_rollover(plan, dry_run=False):
+    """
+    계획을 실행하고 요약을 반환. dry_run 이면 계산만 하고 요약을 반환한다.
+    """
+    rollover = build_rollover(plan)
+    summary = {
+        "classes": [
+            {
+                "source": spec["source"],
+                "source_name": spec["source_name"],
+                "name": spec["name"],
+                "day_of_week": spec["day_of_week"],
+                "start_time": spec["start_time"].isoformat(),
+                "student_count": len(spec["students"]),
+            }
+            for spec in rollover["classes"]
+        ],
+        "withdrawn_count": len(rollover["withdrawn"]),
+        "added": 0,
+        "removed": 0,
+    }
+    if dry_run:
+        return summary
+
+    with transaction.atomic():
+        add = set()
+        for spec, result in zip(rollover["classes"], summary["classes"]):
+            new_class = Class.objects.create(
+                name=spec["name"],
+                subject_id=spec["subject_id"],
+                day_of_week=spec["day_of_week"],
+                start_time=spec["start_time"],
+            )
+            result["id"] = new_class.pk
+            add.update((new_class.pk, student_id) for student_id in spec["students"])
+
+        if rollover["withdrawn"]:
+            withdrawn_class = Class.objects.filter(name=WITHDRAWN_CLASS_NAME).first()
+            if withdrawn_class is None:
+                withdrawn_class = Class.objects.create(name=WITHDRAWN_CLASS_NAME)
+            add.update((withdrawn_class.pk, student_id) for student_id in rollover["withdrawn"])
+
+        remove = set() if rollover["keep_source"] else rollover["source_pairs"]
+        changes = apply_changes(add=add, remove=remove)
+
+    summary.update(changes)
+    return summary
@@ -0,0 +1,104 @@
+"""
+읽기 전용 복제 DB 라우팅
+
+REPLICA_DATABASE_URL 이 설정되면 DATABASES["replica"] 가 추가되고 ReplicaRouter 가 등록된다.
+ReplicaRoutingMiddleware 가 안전한 조회 요청 중 replica_actions 에 등록된 뷰/액션
+(목록, 대시보드, 통계 등)에 대해서만 복제 DB 사용을 표시하고, 라우터는 그 동안의 읽기를 복제 DB 로 보낸다.
+쓰기를 한 사용자는 REPLICA_STICKY_SECONDS 동안 모든 읽기가 기본 DB 로 가므로
+복제 지연 때문에 방금 저장한 내용이 보이지 않는 일이 없다.
+이 표시는 서명된 쿠키에 두어 다음 요청을 어느 워커가 받아도 같은 판단을 한다.
+POST 로 받지만 데이터를 바꾸지 않는 뷰는 read_only = True 로 표시하여 사용자를 고정하지 않는다.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from .metrics import view_label
+
+REPLICA_DB_ALIAS = "replica"
+
+# 현재 요청(스레드/태스크)의 읽기를 복제 DB 로 보낼지 여부
+_use_replica = ContextVar("use_replica", default=False)
+
+# 인증, 세션 등 로그인 직후 바로 읽어야 하는 모델은 항상 기본 DB 에서 읽음
+PRIMARY_ONLY_MODELS = {"students.user"}
+
+
+def replica_configured():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+STICKY_COOKIE_NAME = "replica_sticky"
+STICKY_COOKIE_SALT = "students.routers.sticky"
+
+
+def mark_recent_write(response, user_id):
+    """사용자의 쓰기 이후 REPLICA_STICKY_SECONDS 동안 기본 DB 에서만 읽도록 응답에 쿠키를 설정"""
+    response.set_signed_cookie(
+        STICKY_COOKIE_NAME,
+        str(user_id),
+        salt=STICKY_COOKIE_SALT,
+        max_age=settings.REPLICA_STICKY_SECONDS,
+        domain=settings.SESSION_COOKIE_DOMAIN,
+        secure=settings.SESSION_COOKIE_SECURE,
+        httponly=True,
+        samesite=settings.SESSION_COOKIE_SAMESITE,
+    )
+
+
+def has_recent_write(request, user_id):
+    """같은 사용자가 REPLICA_STICKY_SECONDS 안에 쓰기를 했는지 (서명 시각으로 만료 확인)"""
+    value = request.get_signed_cookie(
+        STICKY_COOKIE_NAME,
+        default=None,
+        salt=STICKY_COOKIE_SALT,
+        max_age=settings.REPLICA_STICKY_SECONDS,
+    )
+    return value == str(user_id)
+
+
+def replica_eligible(request, view_func):
+    """안전한 메서드이고 뷰의 replica_actions 에 현재 액션이 포함되어 있는지"""
+    if request.method not in ("GET", "HEAD"):
+        return False
+    view_class = getattr(view_func, "cls", None)
+    if view_class is None:
+        return False
+    _, action = view_label(request, view_func)
+    return action in getattr(view_class, "replica_actions", ())
+
+
+def activate_replica():
+    return _use_replica.set(True)
+
+
+def deactivate_replica(token):
+    _use_replica.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """복제 DB 를 쓰는 요청 안에서도 이 블록의 읽기는 기본 DB 로 보냄"""
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _use_replica.get():
+            return None
+        if model._meta.app_label != "students" or model._meta.label_lower in PRIMARY_ONLY_MODELS:
+            return None
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 복제 DB 는 기본 DB 와 같은 데이터이므로 DB 간 관계를 허용
+        return True
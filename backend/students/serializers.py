@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from .caching import reference
 from .models import User, Class, Student, Attendance, Exam, Subject
+from .normalization import phone_digits
+from .readers import CLASS_TYPE_DISPLAY, attendance_rows, exam_rows
 
 
 class SubjectSerializer(serializers.ModelSerializer):
@@ -143,6 +146,13 @@ class LoginSerializer(serializers.Serializer):
         return attrs
 
 
+def include_students(request):
+    """반 조회 응답에 학생 id 목록을 포함할지 (?include_students=false 로 제외)"""
+    if request is None:
+        return True
+    return request.query_params.get("include_students", "").lower() not in ("false", "0")
+
+
 class ClassSerializer(serializers.ModelSerializer):
     student_count = serializers.SerializerMethodField()
     students = serializers.PrimaryKeyRelatedField(
@@ -171,7 +181,19 @@ class ClassSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "created_at", "updated_at"]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if self.context.get("include_students") is False or (
+            request is not None and request.method == "GET" and not include_students(request)
+        ):
+            self.fields.pop("students", None)
+
     def get_student_count(self, obj):
+        # 목록 조회에서는 queryset 에서 annotate 한 값을 사용
+        count = getattr(obj, "annotated_student_count", None)
+        if count is not None:
+            return count
         return obj.students.count()
 
     def validate_name(self, value):
@@ -243,14 +265,16 @@ class ClassSerializer(serializers.ModelSerializer):
         if all([name, subject, day_of_week, start_time]):
             # 수정 시에는 자기 자신을 제외하고 중복 확인
             instance = getattr(self, "instance", None)
-            queryset = Class.objects.filter(
-                subject=subject, day_of_week=day_of_week, start_time=start_time
+            exclude_id = instance.id if instance else None
+            duplicate = any(
+                row["subject_id"] == subject.pk
+                and row["day_of_week"] == day_of_week
+                and row["start_time"] == start_time
+                and row["id"] != exclude_id
+                for row in reference.classes().values()
             )
 
-            if instance:
-                queryset = queryset.exclude(id=instance.id)
-
-            if queryset.exists():
+            if duplicate:
                 raise serializers.ValidationError(
                     "같은 과목, 같은 요일, 같은 시간에 이미 반이 존재합니다."
                 )
@@ -287,7 +311,7 @@ class StudentSerializer(serializers.ModelSerializer):
 
         attendances = obj.attendance_set.all()
         if user and user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
-            attendances = attendances.filter(class_info__subject__in=user.subjects.all())
+            attendances = attendances.filter(class_info__subject__in=user.get_subject_ids())
 
         total_classes = attendances.count()
         attended_classes = attendances.filter(is_late=False).count()
@@ -305,7 +329,7 @@ class StudentSerializer(serializers.ModelSerializer):
 
         exams = Exam.objects.filter(attendance__student=obj)
         if user and user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
-            exams = exams.filter(attendance__class_info__subject__in=user.subjects.all())
+            exams = exams.filter(attendance__class_info__subject__in=user.get_subject_ids())
 
         if not exams.exists():
             return {"average_score": 0, "highest_score": 0, "lowest_score": 0}
@@ -337,13 +361,14 @@ class StudentSerializer(serializers.ModelSerializer):
             # 선생님이나 조교인 경우 접근 가능한 반만 필터링
             if user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
                 class_ids = ret.get("classes", [])
-                from django.db.models import Q
-                filtered_class_ids = list(
-                    Class.objects.filter(
-                        Q(id__in=class_ids) & (Q(subject__in=user.subjects.all()) | Q(name="퇴원"))
-                    ).values_list("id", flat=True)
-                )
-                ret["classes"] = filtered_class_ids
+                user_subjects = user.get_subject_ids()
+                classes = reference.classes()
+                ret["classes"] = [
+                    pk
+                    for pk in class_ids
+                    if pk in classes
+                    and (classes[pk]["name"] == "퇴원" or classes[pk]["subject_id"] in user_subjects)
+                ]
         return ret
 
     def validate_name(self, value):
@@ -401,7 +426,9 @@ class StudentSerializer(serializers.ModelSerializer):
         if name and parent_phone:
             # 수정 시에는 자기 자신을 제외하고 중복 확인
             instance = getattr(self, "instance", None)
-            queryset = Student.objects.filter(name=name, parent_phone=parent_phone)
+            queryset = Student.objects.filter(
+                name=name, parent_phone_digits=phone_digits(parent_phone)
+            )
 
             if instance:
                 queryset = queryset.exclude(id=instance.id)
@@ -442,13 +469,7 @@ class AttendanceSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "updated_at"]
 
     def get_class_type_display(self, obj):
-        class_types = {
-            "REGULAR": "정규",
-            "MAKEUP": "대체",
-            "EXTRA": "보강",
-            "ADDITIONAL": "추가",
-        }
-        return class_types.get(obj.class_type, obj.class_type)
+        return CLASS_TYPE_DISPLAY.get(obj.class_type, obj.class_type)
 
 
 class ExamSerializer(serializers.ModelSerializer):
@@ -547,9 +568,9 @@ class StudentDetailSerializer(StudentSerializer):
 
         attendances = obj.attendance_set.all().order_by("-date")
         if user and user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
-            attendances = attendances.filter(class_info__subject__in=user.subjects.all())
+            attendances = attendances.filter(class_info__subject__in=user.get_subject_ids())
 
-        return AttendanceSerializer(attendances, many=True, context=self.context).data
+        return attendance_rows(attendances)
 
     def get_exam_records(self, obj):
         request = self.context.get("request")
@@ -559,9 +580,9 @@ class StudentDetailSerializer(StudentSerializer):
             "-attendance__date"
         )
         if user and user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
-            exams = exams.filter(attendance__class_info__subject__in=user.subjects.all())
+            exams = exams.filter(attendance__class_info__subject__in=user.get_subject_ids())
 
-        return ExamSerializer(exams, many=True, context=self.context).data
+        return exam_rows(exams)
 
     def to_representation(self, instance):
         # Call the grandparent's to_representation to avoid parent's logic
@@ -582,7 +603,7 @@ class StudentDetailSerializer(StudentSerializer):
             # 선생님이나 조교인 경우 접근 가능한 반만 필터링
             if user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
                 from django.db.models import Q
-                classes_queryset = instance.classes.filter(Q(subject__in=user.subjects.all()) | Q(name="퇴원"))
+                classes_queryset = instance.classes.filter(Q(subject__in=user.get_subject_ids()) | Q(name="퇴원"))
             else:
                 classes_queryset = instance.classes.all()
         else:
@@ -594,3 +615,55 @@ class StudentDetailSerializer(StudentSerializer):
         ).data
 
         return ret
+
+
+class EnrollmentPairSerializer(serializers.Serializer):
+    student = serializers.IntegerField()
+    class_info = serializers.IntegerField()
+
+
+class EnrollmentMoveSerializer(serializers.Serializer):
+    student = serializers.IntegerField()
+    from_class = serializers.IntegerField()
+    to_class = serializers.IntegerField()
+
+
+class EnrollmentChangeSerializer(serializers.Serializer):
+    """반 배정 일괄 변경 요청 (add / remove / move 중 하나 이상)"""
+
+    MAX_ITEMS = 1000
+
+    add = EnrollmentPairSerializer(many=True, required=False)
+    remove = EnrollmentPairSerializer(many=True, required=False)
+    move = EnrollmentMoveSerializer(many=True, required=False)
+
+    def validate(self, attrs):
+        total = sum(len(attrs.get(key, [])) for key in ("add", "remove", "move"))
+        if not total:
+            raise serializers.ValidationError("add, remove, move 중 하나 이상을 입력해주세요.")
+        if total > self.MAX_ITEMS:
+            raise serializers.ValidationError(
+                f"한 번에 최대 {self.MAX_ITEMS}건까지 변경할 수 있습니다."
+            )
+        return attrs
+
+
+class BatchItemSerializer(serializers.Serializer):
+    id = serializers.CharField(max_length=100, required=False)
+    path = serializers.CharField(max_length=2000)
+    if_none_match = serializers.CharField(max_length=200, required=False)
+
+
+class BatchSerializer(serializers.Serializer):
+    """읽기 전용 하위 요청 묶음"""
+
+    MAX_ITEMS = 20
+
+    requests = BatchItemSerializer(many=True, allow_empty=False)
+
+    def validate_requests(self, value):
+        if len(value) > self.MAX_ITEMS:
+            raise serializers.ValidationError(
+                f"한 번에 최대 {self.MAX_ITEMS}개의 요청만 실행할 수 있습니다."
+            )
+        return value
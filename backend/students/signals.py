@@ -1,5 +1,13 @@
-from django.db.models.signals import post_migrate
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save, pre_delete
 from django.dispatch import receiver
+from django.utils import timezone
+
+from .authentication import bump_user_version
+from . import events
+from .caching import bump_records_version, bump_reference_version, bump_roster_version
+from .enrollment import close_periods, open_periods
+from .models import Attendance, Class, Enrollment, Exam, Student, Subject, Tombstone, User
+
 
 @receiver(post_migrate)
 def create_default_classes(sender, **kwargs):
@@ -12,3 +20,153 @@ def create_default_classes(sender, **kwargs):
                 day_of_week=None,
                 start_time=None
             )
+
+
+@receiver(m2m_changed, sender=Class.students.through)
+def touch_class_enrollment(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """
+    반-학생 관계가 바뀌면 양쪽의 updated_at 을 갱신하여
+    조건부 GET 검증값(MAX(updated_at))에 반영되도록 하고, 반 등록 기간을 열고 닫음
+    """
+    if action == "pre_clear":
+        instance._cleared_pks = set(
+            getattr(instance, "students" if not reverse else "classes").values_list(
+                "pk", flat=True
+            )
+        )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if action == "post_clear":
+        pk_set = getattr(instance, "_cleared_pks", set())
+    if not pk_set:
+        return
+
+    now = timezone.now()
+    type(instance).objects.filter(pk=instance.pk).update(updated_at=now)
+    model.objects.filter(pk__in=pk_set).update(updated_at=now)
+
+    if reverse:
+        pairs = [(class_pk, instance.pk) for class_pk in pk_set]
+    else:
+        pairs = [(instance.pk, student_pk) for student_pk in pk_set]
+    if action == "post_add":
+        open_periods(pairs)
+    else:
+        close_periods(pairs)
+    bump_records_version()
+    bump_roster_version()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_principal(sender, instance, **kwargs):
+    """역할, 비밀번호, 활성 여부 등이 바뀌면 캐시된 인증 주체를 무효화"""
+    bump_user_version(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.subjects.through)
+def invalidate_principal_subjects(sender, instance, action, reverse, pk_set, **kwargs):
+    """권한 과목이 바뀌면 캐시된 인증 주체를 무효화"""
+    if action == "pre_clear" and reverse:
+        # 과목 쪽에서 clear() 하면 post_clear 에는 대상 사용자 목록이 없음
+        instance._cleared_user_pks = set(instance.users.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    bump_reference_version()
+    if not reverse:
+        instance._subject_ids = None
+        bump_user_version(instance.pk)
+        return
+
+    if action == "post_clear":
+        pk_set = getattr(instance, "_cleared_user_pks", set())
+    for user_pk in pk_set or ():
+        bump_user_version(user_pk)
+
+
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+@receiver(post_save, sender=Class)
+@receiver(post_delete, sender=Class)
+def invalidate_reference(sender, instance, **kwargs):
+    """과목/반이 추가, 수정, 삭제되면 참조 데이터 캐시 버전을 올림"""
+    bump_reference_version()
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+@receiver(post_save, sender=Exam)
+@receiver(post_delete, sender=Exam)
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def invalidate_reports(sender, instance, **kwargs):
+    """기록이 바뀌면 캐시된 대시보드/시험 통계를 무효화"""
+    bump_records_version()
+
+
+@receiver(pre_delete, sender=Student)
+def touch_student_classes(sender, instance, **kwargs):
+    """
+    학생이 지워지면 반 배정 행이 m2m_changed 없이 함께 지워지므로,
+    배정된 반의 updated_at 을 미리 갱신하여 반 목록의 조건부 GET 검증값에 반영
+    """
+    Class.objects.filter(students=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Student)
+def invalidate_roster(sender, instance, **kwargs):
+    """학생 삭제로 반 배정이 함께 지워지면 (m2m_changed 는 발생하지 않음) 반 배정 버전을 올림"""
+    bump_roster_version()
+
+
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Attendance)
+@receiver(post_delete, sender=Exam)
+def record_tombstone(sender, instance, **kwargs):
+    """증분 동기화(/api/sync/)와 실시간 이벤트에서 클라이언트가 지울 수 있도록 삭제 기록을 남김"""
+    class_id = day = None
+    if sender is Attendance:
+        class_id, day = instance.class_info_id, instance.date
+    elif sender is Exam:
+        if Exam.attendance.is_cached(instance):
+            class_id, day = instance.attendance.class_info_id, instance.attendance.date
+        else:
+            # 출석과 함께 지워질 때는 시험이 먼저 지워지므로 출석 행이 아직 남아 있음
+            class_id, day = (
+                Attendance.objects.filter(pk=instance.attendance_id)
+                .values_list("class_info_id", "date")
+                .first()
+            ) or (None, None)
+    Tombstone.objects.create(
+        model_name=sender._meta.model_name,
+        object_id=instance.pk,
+        class_id=class_id,
+        date=day,
+        deleted_at=timezone.now(),
+    )
+
+
+@receiver(post_save, sender=Attendance)
+def publish_attendance_saved(sender, instance, **kwargs):
+    events.attendance_saved(instance)
+
+
+@receiver(post_delete, sender=Attendance)
+def publish_attendance_deleted(sender, instance, **kwargs):
+    events.attendance_deleted(instance)
+
+
+@receiver(post_save, sender=Exam)
+def publish_exam_saved(sender, instance, **kwargs):
+    events.exam_saved(instance)
+
+
+@receiver(post_delete, sender=Exam)
+def publish_exam_deleted(sender, instance, **kwargs):
+    events.exam_deleted(instance)
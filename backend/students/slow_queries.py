@@ -0,0 +1,199 @@
+"""
+느린 쿼리 로그
+
+임계값(SLOW_QUERY_THRESHOLD_MS)을 넘는 쿼리를 파라미터, 요청한 뷰, EXPLAIN 결과와 함께
+링 버퍼에 보관한다. 관리자 화면(/admin/slow-queries/)에서 조회할 수 있다.
+METRICS_DIR 이 설정되어 있으면 모든 워커가 그 디렉터리의 slow_queries.json 하나에 기록하므로
+관리자 화면을 어느 워커가 응답해도 같은 목록을 보여준다. 설정되지 않았으면 프로세스 내에 보관한다.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경
+    fcntl = None
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger("students.slow_query")
+
+SHARED_FILE = "slow_queries.json"
+
+
+class SlowQueryLog:
+    """최근 느린 쿼리를 보관하는 스레드/프로세스 안전 링 버퍼"""
+
+    def __init__(self, maxlen=100):
+        self.maxlen = maxlen
+        self._lock = threading.Lock()
+        self._entries = deque(maxlen=maxlen)
+
+    def shared_path(self):
+        """워커 간 공유 파일 경로 (공유하지 않으면 None)"""
+        directory = getattr(settings, "METRICS_DIR", "")
+        if not directory or fcntl is None:
+            return None
+        return os.path.join(directory, SHARED_FILE)
+
+    def add(self, entry):
+        self.extend([entry])
+
+    def extend(self, entries):
+        path = self.shared_path()
+        if path is None:
+            with self._lock:
+                self._entries.extend(entries)
+            return
+
+        try:
+            with self._file_lock(path):
+                stored = _read(path)
+                stored.extend(entries)
+                _write(path, stored[-self.maxlen:])
+        except OSError:
+            logger.exception("Failed to write slow query log %s", path)
+
+    def entries(self):
+        """최신 항목부터 반환"""
+        path = self.shared_path()
+        if path is None:
+            with self._lock:
+                return list(reversed(self._entries))
+
+        entries = []
+        for entry in reversed(_read(path)):
+            if entry.get("recorded_at"):
+                entry["recorded_at"] = parse_datetime(entry["recorded_at"])
+            entries.append(entry)
+        return entries
+
+    def clear(self):
+        path = self.shared_path()
+        if path is None:
+            with self._lock:
+                self._entries.clear()
+            return
+
+        with self._file_lock(path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    @contextmanager
+    def _file_lock(self, path):
+        # 읽고-추가하고-다시 쓰는 동안 다른 워커의 기록이 사라지지 않도록 잠금
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock, open(f"{path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def _write(path, entries):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(entries, f, cls=DjangoJSONEncoder)
+        # rename 은 원자적이므로 조회 중 부분적으로 쓰인 파일을 읽지 않는다
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+slow_query_log = SlowQueryLog(getattr(settings, "SLOW_QUERY_LOG_SIZE", 100))
+
+
+class SlowQueryRecorder:
+    """
+    connection.execute_wrapper 로 등록되어 임계값을 넘는 쿼리를 모은다.
+    EXPLAIN 은 원래 쿼리의 커서와 섞이지 않도록 요청이 끝난 뒤 explain_all() 에서 실행한다.
+    """
+
+    def __init__(self, threshold_ms, limit=None):
+        self.threshold_ms = threshold_ms
+        # 한 요청에서 버퍼 크기 이상 모아도 앞의 항목은 밀려나므로 EXPLAIN 비용만 든다
+        self.limit = limit or getattr(settings, "SLOW_QUERY_LOG_SIZE", 100)
+        self.pending = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        if duration_ms >= self.threshold_ms and len(self.pending) < self.limit:
+            self.pending.append(
+                {
+                    "alias": context["connection"].alias,
+                    "sql": sql,
+                    "params": params,
+                    "many": many,
+                    "duration_ms": round(duration_ms, 2),
+                }
+            )
+        return result
+
+    def explain_all(self, view, action, path):
+        entries = []
+        for query in self.pending:
+            entry = {
+                "recorded_at": timezone.now(),
+                "duration_ms": query["duration_ms"],
+                "sql": query["sql"],
+                "params": repr(query["params"]),
+                "view": view,
+                "action": action,
+                "path": path,
+                "explain": _explain(query),
+            }
+            entries.append(entry)
+            logger.warning(
+                "slow query %.1fms [%s.%s] %s params=%s",
+                entry["duration_ms"],
+                view,
+                action,
+                entry["sql"],
+                entry["params"],
+            )
+        if entries:
+            slow_query_log.extend(entries)
+        self.pending = []
+
+
+def _explain(query):
+    if not getattr(settings, "SLOW_QUERY_EXPLAIN", True):
+        return ""
+    # executemany 나 SELECT 가 아닌 쿼리는 EXPLAIN 하지 않음 (부작용 방지)
+    if query["many"] or not query["sql"].lstrip().upper().startswith("SELECT"):
+        return ""
+
+    connection = connections[query["alias"]]
+    prefix = connection.ops.explain_query_prefix()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"{prefix} {query['sql']}", query["params"])
+            rows = cursor.fetchall()
+    except Exception as e:
+        return f"EXPLAIN 실패: {e}"
+    return "\n".join("\t".join(str(col) for col in row) for row in rows)
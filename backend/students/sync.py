@@ -0,0 +1,196 @@
+"""
+증분 동기화
+
+클라이언트가 보관한 시점(watermark) 이후에 생성/수정된 학생/출석/시험 행과 삭제된 id 만 돌려준다.
+변경 행은 updated_at 인덱스 범위 조회로, 삭제는 Tombstone 으로 찾는다.
+
+- 응답의 watermark 를 다음 요청의 since 로 사용한다. updated_at 은 커밋이 아니라 저장 시각이므로,
+  조회 뒤에 커밋되는 행을 놓치지 않도록 watermark 는 요청 시각보다 SYNC_OVERLAP_SECONDS 만큼,
+  그리고 열려 있는 가장 오래된 쓰기 트랜잭션(보관, 학기 전환, 일괄 배정 등)의 시작 시각보다 이르다.
+  그만큼 같은 행이 다시 올 수 있다.
+- 클라이언트는 deleted 의 id 를 먼저 지우고 변경 행을 덮어쓴다.
+- 변경이 MAX_ROWS 를 넘거나 since 가 삭제 기록 보존 기간보다 오래되면 reset 을 반환하며,
+  이때는 목록 전체를 다시 불러온다.
+- 삭제 기록은 id 만 담으므로 역할 범위를 적용하지 않는다.
+- 선생님/조교의 범위를 벗어난(다른 과목 반으로 옮긴) 학생은 deleted.students 로 보낸다.
+"""
+
+import datetime
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Attendance, Exam, Student, Tombstone, User
+from .readers import attendance_rows, exam_rows
+from .serializers import StudentSerializer
+
+MAX_ROWS = 1000
+
+# 삭제 기록에 함께 남기는 (반 id, 출석일) 의 경로
+TOPIC_FIELDS = {
+    "attendance": ("class_info_id", "date"),
+    "exam": ("attendance__class_info_id", "attendance__date"),
+}
+
+
+def open_transaction_age():
+    """
+    열려 있는 쓰기 트랜잭션 중 가장 오래된 것의 경과 시간 (MySQL 만, 그 외에는 None)
+
+    information_schema.innodb_trx 를 읽을 권한이 없으면 None 을 반환하고 설정된 겹침 시간만 쓴다.
+    """
+    if connection.vendor != "mysql":
+        return None
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT TIMESTAMPDIFF(MICROSECOND, MIN(trx_started), NOW(6)) "
+                "FROM information_schema.innodb_trx WHERE trx_rows_modified > 0"
+            )
+            (age,) = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if age is None:
+        return None
+    return datetime.timedelta(microseconds=max(int(age), 0))
+
+
+def watermark(now):
+    """now 까지 조회한 결과에 대해 다음 조회를 시작할 시점"""
+    overlap = datetime.timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)
+    age = open_transaction_age()
+    if age is not None and age > overlap:
+        overlap = age
+    return now - overlap
+
+
+def record_deletions(queryset):
+    """
+    queryset 의 행에 대한 삭제 기록을 INSERT ... SELECT 한 번으로 남김
+
+    시그널 없이 지우는 경로(_raw_delete, 보관)에서 삭제 전에 호출한다.
+    """
+    model_name = queryset.model._meta.model_name
+    columns = {"deleted_id": F("pk")}
+    if model_name in TOPIC_FIELDS:
+        class_field, date_field = TOPIC_FIELDS[model_name]
+        columns.update(deleted_class_id=F(class_field), deleted_date=F(date_field))
+    sql, params = queryset.order_by().values(**columns).query.sql_with_params()
+    qn = connection.ops.quote_name
+    table = qn(Tombstone._meta.db_table)
+    names = [qn("model_name"), qn("object_id"), qn("deleted_at")]
+    values = [f"sub.{qn('deleted_id')}", "%s"]
+    if model_name in TOPIC_FIELDS:
+        names += [qn("class_id"), qn("date")]
+        values += [f"sub.{qn('deleted_class_id')}", f"sub.{qn('deleted_date')}"]
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(names)}) "
+            f"SELECT %s, {', '.join(values)} FROM ({sql}) sub",
+            [model_name, now, *params],
+        )
+        return cursor.rowcount
+
+
+def forget_deletions(model, queryset):
+    """보관 기록 복원처럼 같은 id 의 행이 되살아날 때 model 의 해당 id 삭제 기록을 지움"""
+    Tombstone.objects.filter(
+        model_name=model._meta.model_name, object_id__in=queryset.order_by().values("pk")
+    ).delete()
+
+
+def _student_scope(user_subjects):
+    return (
+        Q(classes__subject__in=user_subjects)
+        | Q(classes__name="퇴원")
+        | Q(classes__isnull=True)
+    )
+
+
+def _scoped(user, students, attendances, exams):
+    if user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
+        user_subjects = user.get_subject_ids()
+        students = students.filter(_student_scope(user_subjects)).distinct()
+        attendances = attendances.filter(
+            Q(class_info__subject__in=user_subjects) | Q(class_info__name="퇴원")
+        )
+        exams = exams.filter(
+            Q(attendance__class_info__subject__in=user_subjects)
+            | Q(attendance__class_info__name="퇴원")
+        )
+    return students, attendances, exams
+
+
+def changes_since(user, since, serializer_context):
+    """
+    since 이후의 변경 내용
+
+    반환값: {"watermark", "reset", "students", "attendances", "exams", "deleted"}
+    """
+    now = timezone.now()
+    result = {
+        "watermark": watermark(now).isoformat(),
+        "reset": False,
+        "students": [],
+        "attendances": [],
+        "exams": [],
+        "deleted": {"students": [], "attendances": [], "exams": []},
+    }
+    retention = datetime.timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+    if since is None or since < now - retention:
+        result["reset"] = True
+        return result
+
+    changed_attendances = Attendance.objects.filter(updated_at__gte=since)
+    changed_exams = Exam.objects.filter(updated_at__gte=since)
+    # 목록의 출석/시험 통계가 바뀐 학생도 다시 보냄
+    changed_students = Student.objects.filter(
+        Q(updated_at__gte=since)
+        | Q(pk__in=changed_attendances.values("student_id"))
+        | Q(pk__in=changed_exams.values("attendance__student_id"))
+    )
+    students, attendances, exams = _scoped(
+        user, changed_students, changed_attendances, changed_exams
+    )
+
+    attendances = attendances.order_by("updated_at", "pk")
+    exams = exams.order_by("updated_at", "pk")
+    students = students.prefetch_related("classes").order_by("updated_at", "pk")
+
+    attendance_list = attendance_rows(attendances[: MAX_ROWS + 1])
+    exam_list = exam_rows(exams[: MAX_ROWS + 1])
+    student_list = list(students[: MAX_ROWS + 1])
+    tombstones = list(
+        Tombstone.objects.filter(deleted_at__gte=since)
+        .order_by("deleted_at", "pk")
+        .values_list("model_name", "object_id")[: MAX_ROWS + 1]
+    )
+    # 범위를 벗어난 학생은 반 배정이 바뀔 때 updated_at 이 갱신되므로 같은 구간에서 찾을 수 있다
+    left_scope = []
+    if user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
+        in_scope = Student.objects.filter(_student_scope(user.get_subject_ids()))
+        left_scope = list(
+            Student.objects.filter(updated_at__gte=since)
+            .exclude(pk__in=in_scope.values("pk"))
+            .order_by("updated_at", "pk")
+            .values_list("pk", flat=True)[: MAX_ROWS + 1]
+        )
+    removed = len(tombstones) + len(left_scope)
+    if max(len(attendance_list), len(exam_list), len(student_list), removed) > MAX_ROWS:
+        result["reset"] = True
+        return result
+
+    result["attendances"] = attendance_list
+    result["exams"] = exam_list
+    result["students"] = StudentSerializer(
+        student_list, many=True, context=serializer_context
+    ).data
+
+    keys = {"student": "students", "attendance": "attendances", "exam": "exams"}
+    for model_name, object_id in tombstones:
+        result["deleted"][keys[model_name]].append(object_id)
+    result["deleted"]["students"].extend(left_scope)
+    return result
@@ -1,3 +1,1957 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import json
+import os
+import runpy
+import shutil
+import tempfile
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import parse_http_date
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from .absence import class_absences
+from .archive import archive_school_year
+from .caching import (
+    REFERENCE_VERSION_KEY,
+    ReferenceCache,
+    get_reference_version,
+    reference,
+    shared_cache,
+)
+from .exam_stats import exam_rankings, exam_statistics
+from .deletion import delete_attendance, delete_student
+from .events import EventBroker, changes_for, deleted_event, saved_event, topic_key
+from .management.commands.warm_report_cache import Command as WarmReportCacheCommand
+from .metrics import RETIRED_FILE, MetricsRegistry, registry
+from .middleware import CompressionMiddleware, ReplicaRoutingMiddleware
+from .models import (
+    ArchivedAttendance,
+    ArchivedExam,
+    Attendance,
+    CacheVersion,
+    Class,
+    Enrollment,
+    Exam,
+    Student,
+    Subject,
+    Tombstone,
+    User,
+)
+from .normalization import phone_e164
+from .parsers import FastJSONParser
+from .renderers import FastJSONRenderer
+from .reports import cached_exam_averages, store_report
+from .routers import (
+    REPLICA_DB_ALIAS,
+    STICKY_COOKIE_NAME,
+    ReplicaRouter,
+    activate_replica,
+    deactivate_replica,
+)
+from .serializers import AttendanceSerializer, BatchSerializer, ExamSerializer
+from .slow_queries import SlowQueryLog, SlowQueryRecorder, slow_query_log
+from .sync import open_transaction_age, watermark
+from .views import BatchView, StudentViewSet
+
+
+class FixtureMixin:
+    """
+    과목 2개(화학, 생명), 관리자/화학 선생님/화학 조교, 반 2개와 학생 4명
+
+    김철수, 이영희: 화학A / 박민수: 생명A / 최지우: 반 없음
+    """
+
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.chem = Subject.objects.create(name="화학")
+        cls.bio = Subject.objects.create(name="생명")
+
+        cls.admin = User.objects.create_user(
+            username="admin", password="password", name="관리자", role=User.Role.ADMIN
+        )
+        cls.teacher = User.objects.create_user(
+            username="teacher", password="password", name="선생님", role=User.Role.TEACHER
+        )
+        cls.teacher.subjects.add(cls.chem)
+        cls.assistant = User.objects.create_user(
+            username="assistant", password="password", name="조교", role=User.Role.ASSISTANT
+        )
+        cls.assistant.subjects.add(cls.chem)
+
+        cls.withdrawn = Class.objects.get(name="퇴원")
+        cls.chem_class = Class.objects.create(
+            name="화학A", subject=cls.chem, day_of_week="MONDAY", start_time=time(18)
+        )
+        cls.bio_class = Class.objects.create(
+            name="생명A", subject=cls.bio, day_of_week="TUESDAY", start_time=time(18)
+        )
+
+        cls.kim = Student.objects.create(
+            name="김철수",
+            parent_phone="010-1234-5678",
+            student_phone="010-9999-0001",
+            school="한국고",
+        )
+        cls.lee = Student.objects.create(
+            name="이영희", parent_phone="010-2222-3333", school="서울고"
+        )
+        cls.park = Student.objects.create(
+            name="박민수", parent_phone="010-4444-5555", school="한국고"
+        )
+        cls.choi = Student.objects.create(
+            name="최지우", parent_phone="010-6666-7777", school="서울고"
+        )
+        cls.chem_class.students.add(cls.kim, cls.lee)
+        cls.bio_class.students.add(cls.park)
+
+    def setUp(self):
+        super().setUp()
+        # 테스트마다 DB 가 되돌려지므로 캐시와 프로세스 내 참조 데이터도 비움
+        cache.clear()
+        reference.expire()
+
+    def login(self, user):
+        self.client.force_login(user)
+
+    def use_shared_cache(self):
+        """워커 간 공유 캐시(Redis 등) 대신 파일 캐시를 사용 (테스트 동안)"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        settings = override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": directory,
+                }
+            }
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        reference.expire()
+
+    def attend(self, student, class_info, day, **fields):
+        values = {
+            "class_type": Attendance.ClassType.REGULAR,
+            "content": "수업",
+            "homework_completion": 100,
+            "homework_accuracy": 100,
+        }
+        values.update(fields)
+        return Attendance.objects.create(
+            student=student, class_info=class_info, date=day, **values
+        )
+
+    def exam(self, attendance, name="복습1", score=20, max_score=25, **fields):
+        return Exam.objects.create(
+            attendance=attendance, name=name, score=score, max_score=max_score, **fields
+        )
+
+
+class EnrollmentTargetTests(FixtureMixin, TestCase):
+    def test_teacher_cannot_enroll_student_outside_scope(self):
+        self.login(self.teacher)
+        response = self.client.post(
+            "/api/enrollments/",
+            {"add": [{"student": self.park.pk, "class_info": self.chem_class.pk}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json()["forbidden_students"], [self.park.pk])
+        self.assertFalse(self.chem_class.students.filter(pk=self.park.pk).exists())
+
+    def test_teacher_cannot_add_student_outside_scope_with_delta_action(self):
+        self.login(self.teacher)
+        response = self.client.post(
+            f"/api/classes/{self.chem_class.pk}/add_students/",
+            {"students": [self.choi.pk, self.park.pk]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(self.chem_class.students.filter(pk=self.choi.pk).exists())
+
+    def test_teacher_can_enroll_unassigned_and_withdrawn_students(self):
+        self.withdrawn.students.add(self.park)
+        self.bio_class.students.remove(self.park)
+        self.login(self.teacher)
+        response = self.client.post(
+            f"/api/classes/{self.chem_class.pk}/add_students/",
+            {"students": [self.choi.pk, self.park.pk]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"added": 2, "removed": 0})
+
+    def test_admin_can_enroll_any_student(self):
+        self.login(self.admin)
+        response = self.client.post(
+            "/api/enrollments/",
+            {"add": [{"student": self.park.pk, "class_info": self.chem_class.pk}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.chem_class.students.filter(pk=self.park.pk).exists())
+
+
+class ReferenceCacheTests(FixtureMixin, TestCase):
+    def test_version_is_kept_in_database_without_shared_cache(self):
+        self.assertFalse(shared_cache())
+        before = get_reference_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            Subject.objects.create(name="물리")
+        self.assertEqual(CacheVersion.objects.get(name=REFERENCE_VERSION_KEY).version, before + 1)
+
+    def test_version_is_kept_in_shared_cache(self):
+        stored = list(CacheVersion.objects.values_list("name", "version"))
+        self.use_shared_cache()
+        self.assertTrue(shared_cache())
+        before = get_reference_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            Subject.objects.create(name="물리")
+        self.assertEqual(get_reference_version(), before + 1)
+        self.assertEqual(list(CacheVersion.objects.values_list("name", "version")), stored)
+
+    def test_version_is_bumped_after_commit(self):
+        before = get_reference_version()
+        with self.captureOnCommitCallbacks() as callbacks:
+            Subject.objects.create(name="물리")
+            self.assertEqual(get_reference_version(), before)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(get_reference_version(), before + 1)
+
+    def test_other_worker_sees_change_on_next_check(self):
+        # 다른 워커의 프로세스 내 데이터
+        other = ReferenceCache()
+        self.assertEqual(other.subjects()[0]["name"], "화학")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.chem.name = "화학I"
+            self.chem.save()
+        with override_settings(REFERENCE_CACHE_CHECK_SECONDS=0):
+            self.assertEqual(other.subjects()[0]["name"], "화학I")
+
+    def test_missing_class_rechecks_version(self):
+        other = ReferenceCache()
+        other.classes()
+        with self.captureOnCommitCallbacks(execute=True):
+            new_class = Class.objects.create(name="화학B", subject=self.chem)
+        # 확인 간격이 지나지 않았어도 없는 반은 버전을 다시 확인
+        self.assertEqual(other.get_class(new_class.pk)["name"], "화학B")
+        self.assertIsNone(other.get_class(new_class.pk + 100))
+        self.assertIsNone(other.get_class("abc"))
+
+    def test_snapshot_is_reloaded_after_ttl(self):
+        other = ReferenceCache()
+        other.subjects()
+        # 시그널 없이 바뀐 데이터는 버전이 그대로이므로 TTL 이 지나야 반영된다
+        Subject.objects.filter(pk=self.chem.pk).update(name="화학I")
+        self.assertEqual(other.subjects()[0]["name"], "화학")
+        with override_settings(REFERENCE_CACHE_CHECK_SECONDS=0, REFERENCE_CACHE_TTL=0):
+            self.assertEqual(other.subjects()[0]["name"], "화학I")
+
+    def test_subject_list_uses_cached_reference_data(self):
+        self.use_shared_cache()
+        self.login(self.admin)
+        self.client.get("/api/subjects/")
+        with self.assertNumQueries(1):  # 세션
+            response = self.client.get("/api/subjects/")
+        self.assertEqual(
+            response.json(),
+            [{"id": self.chem.pk, "name": "화학"}, {"id": self.bio.pk, "name": "생명"}],
+        )
+
+
+class PrincipalCacheTests(FixtureMixin, TestCase):
+    def deactivate(self, user):
+        with self.captureOnCommitCallbacks(execute=True):
+            user.is_active = False
+            user.save()
+
+    def test_principal_is_cached_in_shared_cache(self):
+        self.use_shared_cache()
+        self.login(self.teacher)
+        self.client.get("/api/subjects/")
+        with self.assertNumQueries(1):  # 세션
+            self.assertEqual(self.client.get("/api/subjects/").status_code, 200)
+
+    def test_principal_is_loaded_per_request_without_shared_cache(self):
+        self.login(self.teacher)
+        self.client.get("/api/subjects/")
+        with self.assertNumQueries(3):  # 세션, 사용자, 권한 과목
+            self.assertEqual(self.client.get("/api/subjects/").status_code, 200)
+
+    def test_deactivation_takes_effect_immediately_with_shared_cache(self):
+        self.use_shared_cache()
+        self.login(self.teacher)
+        self.assertEqual(self.client.get("/api/users/profile/").status_code, 200)
+        self.deactivate(self.teacher)
+        self.assertIn(self.client.get("/api/users/profile/").status_code, (401, 403))
+
+    def test_deactivation_takes_effect_immediately_without_shared_cache(self):
+        self.login(self.teacher)
+        self.assertEqual(self.client.get("/api/users/profile/").status_code, 200)
+        self.deactivate(self.teacher)
+        self.assertIn(self.client.get("/api/users/profile/").status_code, (401, 403))
+
+    def test_password_change_ends_cached_sessions(self):
+        self.use_shared_cache()
+        self.login(self.teacher)
+        self.assertEqual(self.client.get("/api/users/profile/").status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.teacher.set_password("another-password")
+            self.teacher.save()
+        self.assertIn(self.client.get("/api/users/profile/").status_code, (401, 403))
+
+    def test_subject_revocation_takes_effect_immediately(self):
+        self.use_shared_cache()
+        self.login(self.teacher)
+        names = {row["name"] for row in self.client.get("/api/classes/").json()}
+        self.assertIn("화학A", names)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.teacher.subjects.remove(self.chem)
+        names = {row["name"] for row in self.client.get("/api/classes/").json()}
+        self.assertEqual(names, {"퇴원"})
+
+
+class ReportCacheTests(FixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.kim_attendance = self.attend(self.kim, self.chem_class, date(2026, 9, 7))
+        self.exam(self.kim_attendance, score=20)
+        self.login(self.teacher)
+
+    def exam_averages(self):
+        return self.client.get(f"/api/exams/exam_averages/?class_id={self.chem_class.pk}").json()
+
+    def test_exam_averages_are_cached_until_records_change(self):
+        self.assertEqual(self.exam_averages()[0]["count"], 1)
+        # 세션, 사용자, 권한 과목, 기록/참조 데이터 버전 (집계 쿼리 없음)
+        with self.assertNumQueries(5):
+            self.exam_averages()
+
+        lee_attendance = self.attend(self.lee, self.chem_class, date(2026, 9, 7))
+        # 커밋 전에는 이전 집계
+        self.exam(lee_attendance, score=10)
+        self.assertEqual(self.exam_averages()[0]["count"], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.exam(lee_attendance, name="복습2", score=10)
+        rows = {row["name"]: row for row in self.exam_averages()}
+        self.assertEqual(rows["복습1"]["count"], 2)
+        self.assertEqual(rows["복습1"]["average_score"], 15)
+
+    def test_cached_reports_are_built_on_primary(self):
+        router = ReplicaRouter()
+        used = []
+
+        def build(*args):
+            used.append(router.db_for_read(Exam))
+            return []
+
+        token = activate_replica()
+        try:
+            with mock.patch("students.reports.exam_averages_payload", side_effect=build):
+                cached_exam_averages(None, class_id=self.chem_class.pk)
+            self.assertEqual(router.db_for_read(Exam), REPLICA_DB_ALIAS)
+        finally:
+            deactivate_replica(token)
+        self.assertEqual(used, [None])
+
+    def test_dashboard_reflects_enrollment_changes(self):
+        url = f"/api/dashboard/?month=2026-09&class_id={self.chem_class.pk}"
+        stats = {row["name"]: row["student_count"] for row in self.client.get(url).json()["class_stats"]}
+        self.assertEqual(stats["화학A"], 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.chem_class.students.add(self.choi)
+        stats = {row["name"]: row["student_count"] for row in self.client.get(url).json()["class_stats"]}
+        self.assertEqual(stats["화학A"], 3)
+
+    def test_report_cache_is_scoped_by_subjects(self):
+        self.attend(self.park, self.bio_class, date(2026, 9, 8))
+        teacher_names = {
+            row["name"] for row in self.client.get("/api/dashboard/").json()["class_stats"]
+        }
+        self.login(self.admin)
+        admin_names = {
+            row["name"] for row in self.client.get("/api/dashboard/").json()["class_stats"]
+        }
+        self.assertEqual(teacher_names, {"퇴원", "화학A"})
+        self.assertEqual(admin_names, {"퇴원", "화학A", "생명A"})
+
+    def test_warm_command_requires_shared_cache(self):
+        with self.assertRaisesMessage(CommandError, "local to each process"):
+            call_command("warm_report_cache", stdout=StringIO())
+
+    def test_warm_command_fills_view_cache_keys(self):
+        self.use_shared_cache()
+        # 테스트 DB 는 스레드 간에 공유되지 않으므로 작업을 이 스레드에서 실행
+        command = WarmReportCacheCommand()
+        for _, key, build in command._build_tasks(command._scopes(), command._months(1)):
+            store_report(key, build())
+        self.client.get("/api/subjects/")
+        with self.assertNumQueries(1):  # 세션 (집계 쿼리 없음)
+            self.client.get(f"/api/dashboard/?class_id={self.chem_class.pk}")
+
+
+class ReadOnlyView:
+    replica_actions = {"get"}
+
+
+class ReadOnlyPostView:
+    read_only = True
+
+
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch("students.middleware.replica_configured", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.factory = RequestFactory()
+        self.used_replica = []
+
+    def call(self, method, user_id="1", cookies=None, status=200, view_class=ReadOnlyView):
+        """미들웨어를 거쳐 view_class 뷰를 호출하고, 뷰 안에서 읽기가 복제 DB 로 가는지 기록"""
+        router = ReplicaRouter()
+
+        def view(request):
+            self.used_replica.append(router.db_for_read(Student) == REPLICA_DB_ALIAS)
+            return HttpResponse(status=status)
+
+        view.cls = view_class
+        request = getattr(self.factory, method)("/api/dashboard/")
+        request.session = {SESSION_KEY: user_id}
+        request.COOKIES.update(cookies or {})
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            return view(request)
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        return middleware(request)
+
+    def sticky_cookie(self, response):
+        return {STICKY_COOKIE_NAME: response.cookies[STICKY_COOKIE_NAME].value}
+
+    def test_router_sends_reads_to_replica_only_while_active(self):
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Student))
+        token = activate_replica()
+        try:
+            self.assertEqual(router.db_for_read(Student), REPLICA_DB_ALIAS)
+            # 로그인/인증에 쓰는 사용자는 항상 기본 DB
+            self.assertIsNone(router.db_for_read(User))
+            self.assertEqual(router.db_for_write(Student), "default")
+        finally:
+            deactivate_replica(token)
+        self.assertIsNone(router.db_for_read(Student))
+
+    def test_safe_request_reads_from_replica(self):
+        self.call("get")
+        self.assertEqual(self.used_replica, [True])
+
+    def test_view_without_replica_action_reads_from_primary(self):
+        self.call("get", view_class=object)
+        self.assertEqual(self.used_replica, [False])
+
+    def test_write_pins_same_user_to_primary_on_any_worker(self):
+        response = self.call("post")
+        self.assertEqual(self.used_replica, [False])
+        # 쿠키만 있으면 되므로 다른 워커(새 미들웨어 인스턴스)에서도 기본 DB 를 사용
+        self.call("get", cookies=self.sticky_cookie(response))
+        self.call("get", user_id="2", cookies=self.sticky_cookie(response))
+        self.assertEqual(self.used_replica, [False, False, True])
+
+    def test_read_only_post_does_not_pin_user(self):
+        response = self.call("post", view_class=ReadOnlyPostView)
+        self.assertNotIn(STICKY_COOKIE_NAME, response.cookies)
+        self.assertTrue(BatchView.read_only)
+
+    def test_failed_write_does_not_pin_user(self):
+        response = self.call("post", status=400)
+        self.assertNotIn(STICKY_COOKIE_NAME, response.cookies)
+
+    def test_tampered_or_expired_sticky_cookie_is_ignored(self):
+        self.call("get", cookies={STICKY_COOKIE_NAME: "1"})
+        response = self.call("post")
+        with override_settings(REPLICA_STICKY_SECONDS=-1):
+            self.call("get", cookies=self.sticky_cookie(response))
+        self.assertEqual(self.used_replica, [True, False, True])
+
+    def test_sqlite_replica_url_has_no_ssl_option(self):
+        environ = {
+            "SECRET_KEY": "x",
+            "REPLICA_DATABASE_URL": "sqlite:////tmp/replica.sqlite3",
+            "DB_SSL_REQUIRE": "True",
+        }
+        settings_path = os.path.join(settings.BASE_DIR, "config", "settings.py")
+        with mock.patch.dict(os.environ, environ):
+            values = runpy.run_path(settings_path)
+        self.assertNotIn("sslmode", values["DATABASES"]["replica"].get("OPTIONS", {}))
+        self.assertEqual(values["DATABASE_ROUTERS"], ["students.routers.ReplicaRouter"])
+
+
+class BatchTests(FixtureMixin, TestCase):
+    def batch(self, *items):
+        return self.client.post("/api/batch/", {"requests": list(items)}, format="json")
+
+    def test_bodies_match_direct_responses_and_keep_role_scope(self):
+        self.login(self.teacher)
+        direct = self.client.get("/api/students/").json()
+        response = self.batch(
+            {"id": "students", "path": "/api/students/"},
+            {"id": "other", "path": f"/api/students/{self.park.pk}/"},
+        )
+        self.assertEqual(response.status_code, 200)
+        students, other = response.json()["responses"]
+        self.assertEqual(students["status"], 200)
+        self.assertEqual(students["body"], direct)
+        self.assertNotIn(self.park.pk, {row["id"] for row in students["body"]})
+        # 다른 과목 학생은 하위 요청에서도 보이지 않음
+        self.assertEqual(other["status"], 404)
+
+    def test_item_if_none_match_returns_304(self):
+        self.login(self.teacher)
+        etag = self.client.get("/api/students/")["ETag"]
+        response = self.batch(
+            {"id": "students", "path": "/api/students/", "if_none_match": etag},
+            {"id": "classes", "path": "/api/classes/"},
+        )
+        students, classes = response.json()["responses"]
+        self.assertEqual(students["status"], 304)
+        self.assertIsNone(students["body"])
+        self.assertEqual(classes["status"], 200)
+
+    def test_parent_conditional_headers_are_not_applied_to_items(self):
+        self.login(self.teacher)
+        etag = self.client.get("/api/students/")["ETag"]
+        response = self.client.post(
+            "/api/batch/",
+            {"requests": [{"path": "/api/students/"}]},
+            format="json",
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.json()["responses"][0]["status"], 200)
+
+    def test_rejects_foreign_nested_and_unknown_paths(self):
+        self.login(self.teacher)
+        statuses = [
+            item["status"]
+            for item in self.batch(
+                {"path": "https://example.com/api/students/"},
+                {"path": "/admin/"},
+                {"path": "/api/batch/"},
+                {"path": "/api/nothing/"},
+            ).json()["responses"]
+        ]
+        self.assertEqual(statuses, [400, 400, 400, 404])
+
+    def test_failing_item_does_not_fail_batch(self):
+        self.login(self.teacher)
+        with self.assertLogs("students.batch", "ERROR"):
+            response = self.batch(
+                {"id": "students", "path": "/api/students/?class_id=abc"},
+                {"id": "classes", "path": "/api/classes/"},
+            )
+        self.assertEqual(response.status_code, 200)
+        students, classes = response.json()["responses"]
+        self.assertEqual(students["status"], 500)
+        self.assertEqual(classes["status"], 200)
+
+    def test_item_limit(self):
+        self.login(self.teacher)
+        items = [{"path": "/api/subjects/"}] * (BatchSerializer.MAX_ITEMS + 1)
+        self.assertEqual(self.batch(*items).status_code, 400)
+        self.assertEqual(self.batch().status_code, 400)
+
+    def test_requires_login(self):
+        self.assertIn(self.batch({"path": "/api/subjects/"}).status_code, (401, 403))
+
+    @mock.patch("students.middleware.replica_configured", return_value=True)
+    @mock.patch("students.views.batch.replica_configured", return_value=True)
+    def test_consecutive_batches_keep_using_replica(self, *mocks):
+        self.login(self.teacher)
+        with mock.patch(
+            "students.views.batch.activate_replica", side_effect=activate_replica
+        ) as activate:
+            first = self.batch({"path": "/api/students/"})
+            self.assertNotIn(STICKY_COOKIE_NAME, first.cookies)
+            self.batch({"path": "/api/students/"})
+        self.assertEqual(activate.call_count, 2)
+
+
+class BootstrapTests(FixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.login(self.teacher)
+
+    def test_payload_matches_individual_endpoints(self):
+        response = self.client.get("/api/bootstrap/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+        payload = response.json()
+        self.assertEqual(payload["profile"], self.client.get("/api/users/profile/").json())
+        self.assertEqual(payload["subjects"], self.client.get("/api/subjects/").json())
+        classes = self.client.get("/api/classes/?include_students=false").json()
+        self.assertEqual(
+            sorted(payload["classes"], key=lambda row: row["id"]),
+            sorted(classes, key=lambda row: row["id"]),
+        )
+        counts = {row["name"]: row["student_count"] for row in payload["classes"]}
+        self.assertEqual(counts, {"퇴원": 0, "화학A": 2})
+
+    def test_cold_and_warm_query_counts(self):
+        self.use_shared_cache()
+        self.client.get("/api/subjects/")
+        with self.assertNumQueries(3):  # 세션, 프로필 권한 과목, 반 목록 + 학생 수
+            self.client.get("/api/bootstrap/")
+        with self.assertNumQueries(1):  # 세션
+            self.client.get("/api/bootstrap/")
+
+    def test_conditional_get(self):
+        etag = self.client.get("/api/bootstrap/")["ETag"]
+        response = self.client.get("/api/bootstrap/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_attendance_changes_keep_cached_payload(self):
+        self.use_shared_cache()
+        self.client.get("/api/bootstrap/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.attend(self.kim, self.chem_class, date(2026, 10, 19))
+        with self.assertNumQueries(1):  # 세션
+            self.client.get("/api/bootstrap/")
+
+    def test_enrollment_and_class_changes_rebuild_payload(self):
+        etag = self.client.get("/api/bootstrap/")["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.chem_class.students.add(self.choi)
+        response = self.client.get("/api/bootstrap/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        counts = {row["name"]: row["student_count"] for row in response.json()["classes"]}
+        self.assertEqual(counts["화학A"], 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Class.objects.create(name="화학B", subject=self.chem)
+        names = {row["name"] for row in self.client.get("/api/bootstrap/").json()["classes"]}
+        self.assertIn("화학B", names)
+
+    def test_deleting_student_updates_counts(self):
+        self.client.get("/api/bootstrap/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/students/{self.lee.pk}/")
+        counts = {
+            row["name"]: row["student_count"]
+            for row in self.client.get("/api/bootstrap/").json()["classes"]
+        }
+        self.assertEqual(counts["화학A"], 1)
+
+
+class SyncTests(FixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.login(self.teacher)
+        # 픽스처 행은 모두 한 시간 전에 만들어진 것으로 둠
+        past = timezone.now() - timedelta(hours=1)
+        Student.objects.update(updated_at=past)
+        self.since = timezone.now() - timedelta(minutes=1)
+
+    def sync(self, since=None):
+        params = {"since": since.isoformat()} if since else {}
+        response = self.client.get("/api/sync/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_without_since_returns_reset_and_watermark(self):
+        body = self.sync()
+        self.assertTrue(body["reset"])
+        self.assertTrue(body["watermark"])
+
+    def test_returns_only_changed_rows(self):
+        self.kim.school = "대한고"
+        self.kim.save()
+        attendance = self.attend(self.lee, self.chem_class, date(2026, 10, 19))
+
+        body = self.sync(self.since)
+        self.assertFalse(body["reset"])
+        self.assertEqual(
+            sorted(row["id"] for row in body["students"]), sorted([self.kim.pk, self.lee.pk])
+        )
+        self.assertEqual([row["id"] for row in body["attendances"]], [attendance.pk])
+        self.assertEqual(body["deleted"], {"students": [], "attendances": [], "exams": []})
+
+    def test_raw_deletes_are_reported_from_tombstones(self):
+        attendance = self.attend(self.lee, self.chem_class, date(2026, 10, 19))
+        exam = self.exam(attendance)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(f"/api/students/{self.lee.pk}/").status_code, 200)
+
+        body = self.sync(self.since)
+        self.assertEqual(body["deleted"]["students"], [self.lee.pk])
+        self.assertEqual(body["deleted"]["attendances"], [attendance.pk])
+        self.assertEqual(body["deleted"]["exams"], [exam.pk])
+        self.assertEqual(body["attendances"], [])
+
+    def test_student_leaving_scope_is_removed(self):
+        self.chem_class.students.remove(self.kim)
+        self.bio_class.students.add(self.kim)
+
+        body = self.sync(self.since)
+        self.assertIn(self.kim.pk, body["deleted"]["students"])
+        self.assertNotIn(self.kim.pk, [row["id"] for row in body["students"]])
+
+        self.login(self.admin)
+        body = self.sync(self.since)
+        self.assertEqual(body["deleted"]["students"], [])
+        self.assertIn(self.kim.pk, [row["id"] for row in body["students"]])
+
+    @override_settings(SYNC_OVERLAP_SECONDS=30)
+    def test_watermark_covers_oldest_open_transaction(self):
+        now = timezone.now()
+        with mock.patch("students.sync.open_transaction_age", return_value=None):
+            self.assertEqual(watermark(now), now - timedelta(seconds=30))
+        with mock.patch("students.sync.open_transaction_age", return_value=timedelta(seconds=10)):
+            self.assertEqual(watermark(now), now - timedelta(seconds=30))
+        with mock.patch("students.sync.open_transaction_age", return_value=timedelta(minutes=5)):
+            self.assertEqual(watermark(now), now - timedelta(minutes=5))
+
+    def test_open_transaction_age_is_mysql_only(self):
+        self.assertIsNone(open_transaction_age())
+
+
+class AttendanceEventTests(FixtureMixin, TestCase):
+    day = date(2026, 10, 19)
+
+    def setUp(self):
+        super().setUp()
+        self.login(self.teacher)
+        self.since = timezone.now() - timedelta(minutes=1)
+        self.key = topic_key(self.chem_class.pk, self.day)
+
+    def kinds(self, events):
+        return sorted((event["type"], event["action"], event["id"]) for event in events)
+
+    def test_changes_are_limited_to_the_topic(self):
+        attendance = self.attend(self.kim, self.chem_class, self.day)
+        self.attend(self.lee, self.chem_class, date(2026, 10, 20))
+        self.attend(self.park, self.bio_class, self.day)
+
+        events, _ = changes_for(self.key, self.since)
+        self.assertEqual(self.kinds(events), [("attendance", "saved", attendance.pk)])
+
+    def test_tombstones_are_limited_to_the_topic(self):
+        here = self.attend(self.kim, self.chem_class, self.day)
+        exam = self.exam(here)
+        other_day = self.attend(self.lee, self.chem_class, date(2026, 10, 20))
+        other_class = self.attend(self.park, self.bio_class, self.day)
+        other_exam = self.exam(other_class)
+
+        self.login(self.admin)
+        self.client.delete(f"/api/exams/{exam.pk}/")
+        self.client.delete(f"/api/attendances/{here.pk}/")
+        self.client.delete(f"/api/attendances/{other_day.pk}/")
+        self.client.delete(f"/api/students/{self.park.pk}/")
+
+        events, _ = changes_for(self.key, self.since)
+        self.assertEqual(
+            self.kinds(events),
+            [("attendance", "deleted", here.pk), ("exam", "deleted", exam.pk)],
+        )
+        tombstone = Tombstone.objects.get(model_name="exam", object_id=other_exam.pk)
+        self.assertEqual((tombstone.class_id, tombstone.date), (self.bio_class.pk, self.day))
+
+    def test_broker_deduplicates_and_stamps_events(self):
+        broker = EventBroker()
+        row = {"id": 1, "updated_at": "2026-10-19T18:00:00+09:00"}
+
+        async def scenario():
+            subscription = broker.subscribe(self.key)
+            try:
+                broker._set_watermark(self.key, self.since)
+                broker.publish(self.key, [saved_event("attendance", row)])
+                broker.publish(self.key, [saved_event("attendance", row)])
+                broker.publish(self.key, [deleted_event("attendance", 1)])
+                await asyncio.sleep(0)
+                received = []
+                while not subscription.queue.empty():
+                    received.append(subscription.queue.get_nowait())
+                return received
+            finally:
+                broker.unsubscribe(self.key, subscription)
+
+        received = asyncio.run(scenario())
+        self.assertEqual(
+            [(since, event["action"]) for since, event in received],
+            [(self.since, "saved"), (self.since, "deleted")],
+        )
+        self.assertFalse(broker.active)
+
+    def test_stream_requires_asgi(self):
+        response = self.client.get(
+            "/api/events/attendance/", {"class_id": self.chem_class.pk, "date": "2026-10-19"}
+        )
+        self.assertEqual(response.status_code, 503)
+
+    async def test_stream_keeps_role_scope(self):
+        client = AsyncClient()
+        await client.aforce_login(self.teacher)
+        response = await client.get(
+            "/api/events/attendance/", {"class_id": self.bio_class.pk, "date": "2026-10-19"}
+        )
+        self.assertEqual(response.status_code, 403)
+        response = await client.get(
+            "/api/events/attendance/", {"class_id": self.chem_class.pk, "date": "x"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    async def test_stream_replays_changes_after_last_event_id(self):
+        attendance = await sync_to_async(self.attend)(self.kim, self.chem_class, self.day)
+        client = AsyncClient()
+        await client.aforce_login(self.teacher)
+
+        response = await client.get(
+            "/api/events/attendance/",
+            {"class_id": self.chem_class.pk, "date": "2026-10-19"},
+            headers={"Last-Event-ID": self.since.isoformat()},
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        try:
+            self.assertEqual(await anext(stream), b"retry: 3000\n\n")
+            chunk = (await anext(stream)).decode()
+        finally:
+            await stream.aclose()
+        self.assertIn(f"id: {self.since.isoformat()}\n", chunk)
+        self.assertIn("event: attendance.saved\n", chunk)
+        self.assertIn(f'"id":{attendance.pk}', chunk)
+
+
+class RolloverTests(FixtureMixin, TestCase):
+    def rollover(self, plan, *args):
+        path = os.path.join(tempfile.mkdtemp(), "plan.json")
+        self.addCleanup(shutil.rmtree, os.path.dirname(path), ignore_errors=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(plan, f)
+        out = StringIO()
+        call_command("rollover_semester", path, *args, stdout=out)
+        return out.getvalue()
+
+    def members(self, class_info):
+        return set(class_info.students.values_list("pk", flat=True))
+
+    def test_dry_run_makes_no_changes(self):
+        output = self.rollover(
+            {"classes": [{"source": self.chem_class.pk, "day_of_week": "SATURDAY"}]}, "--dry-run"
+        )
+        self.assertIn("Dry run", output)
+        self.assertEqual(Class.objects.count(), 3)
+        self.assertEqual(self.members(self.chem_class), {self.kim.pk, self.lee.pk})
+
+    def test_moves_enrollments_and_withdraws_non_returning_students(self):
+        plan = {
+            "classes": [
+                {
+                    "source": self.chem_class.pk,
+                    "name": "화학A (겨울)",
+                    "day_of_week": "SATURDAY",
+                    "start_time": "14:00",
+                    "exclude": [self.lee.pk],
+                }
+            ]
+        }
+        self.rollover(plan)
+
+        new_class = Class.objects.get(name="화학A (겨울)")
+        self.assertEqual(
+            (new_class.subject_id, new_class.day_of_week, new_class.start_time),
+            (self.chem.pk, "SATURDAY", time(14)),
+        )
+        self.assertEqual(self.members(new_class), {self.kim.pk})
+        self.assertEqual(self.members(self.chem_class), set())
+        self.assertIn(self.lee.pk, self.members(self.withdrawn))
+        self.assertTrue(
+            Enrollment.objects.filter(
+                class_info=self.chem_class, student=self.kim, end_date__isnull=False
+            ).exists()
+        )
+        self.assertTrue(
+            Enrollment.objects.filter(
+                class_info=new_class, student=self.kim, end_date__isnull=True
+            ).exists()
+        )
+
+    def test_rejects_duplicate_slots(self):
+        # 원래 반과 같은 요일/시간
+        with self.assertRaisesMessage(CommandError, "이미 반이 존재합니다"):
+            self.rollover({"classes": [{"source": self.chem_class.pk, "name": "화학B"}]})
+        # 계획 안에서 겹치는 반
+        spec = {"source": self.chem_class.pk, "day_of_week": "SATURDAY", "start_time": "14:00"}
+        with self.assertRaisesMessage(CommandError, "이미 반이 존재합니다"):
+            self.rollover({"classes": [spec, dict(spec, name="화학B")]})
+        self.assertEqual(Class.objects.count(), 3)
+
+    def test_rejects_invalid_specs(self):
+        cases = [
+            ({"source": self.chem_class.pk, "subject": 999, "day_of_week": "SATURDAY"}, "과목"),
+            ({"source": self.chem_class.pk, "teacher": 1}, "알 수 없는 항목"),
+            ({"source": self.chem_class.pk, "day_of_week": "HOLIDAY"}, "요일"),
+            ({"source": self.chem_class.pk, "start_time": "25:00"}, "start_time"),
+            ({"source": self.withdrawn.pk}, "퇴원 반"),
+            ({"source": 999}, "존재하지 않는 반"),
+        ]
+        for spec, message in cases:
+            with self.subTest(spec=spec), self.assertRaisesMessage(CommandError, message):
+                self.rollover({"classes": [spec]})
+        with self.assertRaisesMessage(CommandError, "알 수 없는 항목"):
+            self.rollover({"classes": [{"source": self.chem_class.pk}], "keep": True})
+        self.assertEqual(Class.objects.count(), 3)
+
+
+class RolloverAdminTests(FixtureMixin, TestCase):
+    url = "/admin/students/class/"
+
+    def setUp(self):
+        super().setUp()
+        self.superuser = User.objects.create_superuser(
+            username="root", password="password", name="최고관리자", role=User.Role.ADMIN
+        )
+        self.client.force_login(self.superuser)
+
+    def submit(self, **fields):
+        data = {
+            "action": "rollover_classes",
+            "_selected_action": [self.chem_class.pk, self.withdrawn.pk],
+            "apply": "1",
+            "rollover-TOTAL_FORMS": "1",
+            "rollover-INITIAL_FORMS": "1",
+            "rollover-0-source": self.chem_class.pk,
+            "rollover-0-name": "화학A (다음 학기)",
+            "rollover-0-day_of_week": "MONDAY",
+            "rollover-0-start_time": "18:00",
+        }
+        data.update({f"rollover-0-{key}": value for key, value in fields.items()})
+        return self.client.post(self.url, data, follow=True)
+
+    def members(self, class_info):
+        return set(class_info.students.values_list("pk", flat=True))
+
+    def test_action_asks_for_new_slots(self):
+        response = self.client.post(
+            self.url,
+            {"action": "rollover_classes", "_selected_action": [self.chem_class.pk]},
+        )
+        self.assertTemplateUsed(response, "admin/students/class/rollover.html")
+        self.assertContains(response, "화학A (다음 학기)")
+        self.assertEqual(Class.objects.count(), 3)
+
+    def test_duplicate_slot_is_reported(self):
+        response = self.submit()
+        self.assertContains(response, "이미 반이 존재합니다")
+        self.assertEqual(Class.objects.count(), 3)
+
+    def test_clones_class_with_new_slot(self):
+        response = self.submit(day_of_week="SATURDAY", start_time="14:00")
+        self.assertContains(response, "1개 반을 복제하고 2명의 학생을 배정했습니다.")
+        new_class = Class.objects.get(name="화학A (다음 학기)")
+        self.assertEqual((new_class.day_of_week, new_class.start_time), ("SATURDAY", time(14)))
+        self.assertEqual(self.members(new_class), {self.kim.pk, self.lee.pk})
+        self.assertEqual(self.members(self.chem_class), {self.kim.pk, self.lee.pk})
+
+
+class AlimtalkMetricsTests(FixtureMixin, TestCase):
+    def alimtalk_counts(self):
+        return {tuple(key): value for key, value in registry.snapshot()["alimtalk"]}
+
+    def post(self, outcome, **data):
+        response = mock.Mock(**{"json.return_value": [{"code": outcome}] * 2})
+        with mock.patch("students.views.extra.requests.post", return_value=response):
+            return self.client.post("/api/notifications/", data, format="json")
+
+    def test_outcomes_are_labelled_with_view_and_action(self):
+        self.login(self.teacher)
+        attendance = self.attend(self.kim, self.chem_class, date(2026, 10, 19))
+        self.attend(self.lee, self.chem_class, date(2026, 10, 19))
+        before = self.alimtalk_counts()
+
+        self.post(
+            "success", type="single", student_id=self.kim.pk, attendance_id=attendance.pk
+        )
+        self.post(
+            "fail", type="bulk", student_ids=[self.kim.pk, self.lee.pk], target_date="2026-10-19"
+        )
+        after = self.alimtalk_counts()
+        label = ("KakaoNotificationView", "post")
+        for key, count in [
+            ((*label, "single", "success"), 1),
+            ((*label, "bulk", "failure"), 2),
+        ]:
+            self.assertEqual(after.get(key, 0) - before.get(key, 0), count)
+
+
+class MetricsFileTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        settings = override_settings(METRICS_DIR=self.directory, METRICS_FLUSH_INTERVAL=0)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def worker(self, requests):
+        registry = MetricsRegistry()
+        for _ in range(requests):
+            registry.observe_request("StudentViewSet", "list", "GET", 200, 0.01, 3)
+        return registry
+
+    def total(self, registry):
+        return registry.collect()["status"].get(("StudentViewSet", "list", "GET", "200"), 0)
+
+    def files(self):
+        return sorted(os.listdir(self.directory))
+
+    def move_to_pid(self, registry, pid):
+        """다른 워커가 남긴 파일처럼 보이도록 파일의 pid 를 바꿈"""
+        path = registry._worker_path(self.directory)
+        target = os.path.join(self.directory, f"metrics_{pid}_{registry._boot_id}.json")
+        os.replace(path, target)
+        return target
+
+    def test_worker_files_are_named_per_boot(self):
+        first, second = self.worker(1), self.worker(1)
+        self.assertNotEqual(
+            first._worker_path(self.directory), second._worker_path(self.directory)
+        )
+        self.assertEqual(len([name for name in self.files() if name.endswith(".json")]), 2)
+
+    def test_dead_worker_counts_are_kept_after_pruning(self):
+        live = self.worker(2)
+        path = self.move_to_pid(self.worker(3), 4_000_000)
+
+        with mock.patch("students.metrics._pid_alive", side_effect=lambda pid: pid != 4_000_000):
+            self.assertEqual(self.total(live), 5)
+            self.assertFalse(os.path.exists(path))
+            self.assertIn(RETIRED_FILE, self.files())
+            # 은퇴 합계는 한 번만 더해지고 줄어들지 않음
+            self.assertEqual(self.total(live), 5)
+            live.observe_request("StudentViewSet", "list", "GET", 200, 0.01, 3)
+            self.assertEqual(self.total(live), 6)
+
+    def test_previous_boot_with_same_pid_is_retired(self):
+        previous = self.worker(4)
+        stale = previous._worker_path(self.directory)
+        current = self.worker(1)
+
+        self.assertEqual(self.total(current), 5)
+        self.assertFalse(os.path.exists(stale))
+        self.assertEqual(
+            [name for name in self.files() if name.endswith(".json")],
+            sorted([RETIRED_FILE, os.path.basename(current._worker_path(self.directory))]),
+        )
+
+
+class ConditionalGetTests(FixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.login(self.teacher)
+
+    def test_unchanged_list_returns_304_without_serializing(self):
+        response = self.client.get("/api/students/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+
+        with mock.patch.object(StudentViewSet, "get_serializer", side_effect=AssertionError):
+            response = self.client.get("/api/students/", HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            response = self.client.get(
+                "/api/students/", HTTP_IF_MODIFIED_SINCE=last_modified
+            )
+            self.assertEqual(response.status_code, 304)
+
+    def test_changes_produce_new_etag(self):
+        etag = self.client.get("/api/students/")["ETag"]
+
+        self.kim.school = "대한고"
+        self.kim.save()
+        response = self.client.get("/api/students/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        # 반 배정 변경은 양쪽의 updated_at 을 갱신
+        self.chem_class.students.remove(self.lee)
+        response = self.client.get("/api/students/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        # 목록의 출석 통계에 반영되는 출석 기록
+        self.attend(self.kim, self.chem_class, date(2026, 10, 19))
+        response = self.client.get("/api/students/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_user_and_query(self):
+        teacher_etag = self.client.get("/api/students/")["ETag"]
+        filtered_etag = self.client.get("/api/students/", {"class_id": self.chem_class.pk})["ETag"]
+        self.login(self.admin)
+        response = self.client.get("/api/students/", HTTP_IF_NONE_MATCH=teacher_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(response["ETag"], [teacher_etag, filtered_etag])
+
+    def test_detail_returns_304(self):
+        url = f"/api/students/{self.kim.pk}/"
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.exam(self.attend(self.kim, self.chem_class, date(2026, 10, 19)))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_invalid_detail_id_returns_404(self):
+        self.login(self.admin)
+        for resource in ["students", "classes", "attendances", "exams"]:
+            self.assertEqual(self.client.get(f"/api/{resource}/abc/").status_code, 404)
+
+    def test_deletion_moves_last_modified(self):
+        # 삭제가 마지막 수정과 같은 초에 일어나면 If-Modified-Since 로는 구분되지 않음
+        past = timezone.now() - timedelta(hours=1)
+        Student.objects.update(updated_at=past)
+        Class.objects.update(updated_at=past)
+        response = self.client.get("/api/students/")
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+
+        self.lee.delete()
+        response = self.client.get("/api/students/", HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertGreater(
+            parse_http_date(response["Last-Modified"]), parse_http_date(last_modified)
+        )
+
+    def test_student_delete_touches_class_list(self):
+        etag = self.client.get("/api/classes/")["ETag"]
+        before = Class.objects.get(pk=self.chem_class.pk).updated_at
+        self.lee.delete()
+        self.assertGreater(Class.objects.get(pk=self.chem_class.pk).updated_at, before)
+        response = self.client.get("/api/classes/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class ValuesReadPathTests(FixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.login(self.teacher)
+        for day in [date(2026, 10, 5), date(2026, 10, 12), date(2026, 10, 19)]:
+            for student in [self.kim, self.lee]:
+                attendance = self.attend(student, self.chem_class, day, is_late=day.day == 12)
+                self.exam(attendance, score=day.day)
+        self.exam(self.attend(self.park, self.bio_class, date(2026, 10, 20)))
+
+    def test_rows_match_serializers(self):
+        attendances = Attendance.objects.filter(class_info=self.chem_class).order_by("-date")
+        response = self.client.get("/api/attendances/")
+        self.assertEqual(
+            sorted(response.json(), key=lambda row: row["id"]),
+            sorted(AttendanceSerializer(attendances, many=True).data, key=lambda row: row["id"]),
+        )
+        exams = Exam.objects.filter(attendance__class_info=self.chem_class)
+        response = self.client.get("/api/exams/")
+        self.assertEqual(
+            sorted(response.json(), key=lambda row: row["id"]),
+            sorted(ExamSerializer(exams, many=True).data, key=lambda row: row["id"]),
+        )
+
+    def test_filters_and_role_scope(self):
+        rows = self.client.get("/api/attendances/", {"student_id": self.kim.pk}).json()
+        self.assertEqual(len(rows), 3)
+        self.assertEqual([row["date"] for row in rows], ["2026-10-19", "2026-10-12", "2026-10-05"])
+        self.assertEqual(self.client.get("/api/attendances/", {"class_id": self.bio_class.pk}).json(), [])
+        self.login(self.admin)
+        self.assertEqual(len(self.client.get("/api/exams/").json()), 7)
+
+    def test_list_query_count_does_not_grow_with_rows(self):
+        self.use_shared_cache()
+        self.client.get("/api/attendances/")
+        with self.assertNumQueries(4):
+            # 세션, 검증값 집계, 마지막 삭제 시각, 목록 조회
+            self.client.get("/api/attendances/")
+        for day in range(1, 5):
+            self.attend(self.kim, self.chem_class, date(2026, 9, day))
+        with self.assertNumQueries(4):
+            self.client.get("/api/attendances/")
+
+
+class SlowQueryLogTests(FixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        slow_query_log.clear()
+        self.addCleanup(slow_query_log.clear)
+
+    def test_recorder_explains_selects_only(self):
+        recorder = SlowQueryRecorder(threshold_ms=0.000001)
+        with connection.execute_wrapper(recorder):
+            list(Student.objects.filter(name="김철수"))
+            Student.objects.filter(pk=self.kim.pk).update(school="대한고")
+        with self.assertLogs("students.slow_query", "WARNING") as logs:
+            recorder.explain_all("StudentViewSet", "list", "/api/students/")
+        self.assertEqual(len(logs.records), 2)
+
+        update, select = slow_query_log.entries()
+        self.assertTrue(select["sql"].startswith("SELECT"))
+        self.assertIn("김철수", select["params"])
+        self.assertTrue(select["explain"])
+        self.assertEqual((select["view"], select["action"]), ("StudentViewSet", "list"))
+        self.assertTrue(update["sql"].startswith("UPDATE"))
+        self.assertEqual(update["explain"], "")
+
+    def test_ring_buffer_keeps_latest_entries(self):
+        log = SlowQueryLog(maxlen=2)
+        for i in range(3):
+            log.add({"sql": str(i)})
+        self.assertEqual([entry["sql"] for entry in log.entries()], ["2", "1"])
+
+    def test_shared_file_is_visible_to_every_worker(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        # 워커마다 자신의 SlowQueryLog 인스턴스를 가짐
+        first, second = SlowQueryLog(maxlen=3), SlowQueryLog(maxlen=3)
+        recorded_at = timezone.now()
+        with override_settings(METRICS_DIR=directory):
+            first.add({"sql": "0", "recorded_at": recorded_at})
+            second.extend([{"sql": str(i)} for i in range(1, 4)])
+            entries = first.entries()
+            self.assertEqual([entry["sql"] for entry in entries], ["3", "2", "1"])
+            self.assertEqual(second.entries(), entries)
+
+            first.clear()
+            self.assertEqual(second.entries(), [])
+            second.add({"sql": "4", "recorded_at": recorded_at})
+            # JSON 에는 밀리초까지 저장됨
+            self.assertEqual(
+                first.entries()[0]["recorded_at"],
+                recorded_at.replace(microsecond=recorded_at.microsecond // 1000 * 1000),
+            )
+        self.assertEqual(first.entries(), [])
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0.000001, SLOW_QUERY_EXPLAIN=False)
+    def test_middleware_labels_queries_with_view(self):
+        self.login(self.teacher)
+        with self.assertLogs("students.slow_query", "WARNING"):
+            self.client.get("/api/subjects/")
+        labels = {(entry["view"], entry["action"]) for entry in slow_query_log.entries()}
+        self.assertIn(("SubjectViewSet", "list"), labels)
+
+    def test_admin_view_is_superuser_only(self):
+        slow_query_log.add(
+            {
+                "recorded_at": timezone.now(),
+                "duration_ms": 512.0,
+                "sql": "SELECT 1",
+                "params": "()",
+                "view": "StudentViewSet",
+                "action": "list",
+                "path": "/api/students/",
+                "explain": "",
+            }
+        )
+        staff = User.objects.create_user(
+            username="staff", password="password", name="직원", is_staff=True
+        )
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get("/admin/slow-queries/").status_code, 403)
+
+        root = User.objects.create_superuser(username="root", password="password", name="최고관리자")
+        self.client.force_login(root)
+        self.assertContains(self.client.get("/admin/slow-queries/"), "StudentViewSet.list")
+        self.client.post("/admin/slow-queries/")
+        self.assertEqual(slow_query_log.entries(), [])
+
+
+class JSONRenderingTests(FixtureMixin, TestCase):
+    def test_renderer_matches_drf_output(self):
+        data = {
+            "name": "김철수",
+            "created_at": timezone.make_aware(datetime(2026, 10, 19, 18, 30, 15, 123456)),
+            "date": date(2026, 10, 19),
+            "average": Decimal("87.50"),
+            "content": "line\u2028break\u2029",
+            "big": 2**70,
+            "rows": [{"id": 1, "score": 12.5, "late": False, "memo": None}],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_parser_reads_utf8_and_rejects_invalid_json(self):
+        parsed = FastJSONParser().parse(BytesIO('{"name": "이영희"}'.encode()))
+        self.assertEqual(parsed, {"name": "이영희"})
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(BytesIO(b"{broken"))
+
+    def test_large_responses_are_gzipped(self):
+        self.login(self.admin)
+        for day in range(1, 29):
+            self.attend(self.kim, self.chem_class, date(2026, 9, day))
+
+        response = self.client.get("/api/attendances/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        rows = json.loads(gzip.decompress(response.content))
+        self.assertEqual(len(rows), 28)
+
+        response = self.client.get("/api/subjects/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertNotIn("Content-Encoding", response)
+        response = self.client.get("/api/attendances/")
+        self.assertNotIn("Content-Encoding", response)
+
+    def test_event_streams_are_not_compressed(self):
+        response = HttpResponse(b"x" * 4096, content_type="text/event-stream")
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip")
+        middleware = CompressionMiddleware(lambda request: response)
+        self.assertNotIn("Content-Encoding", middleware(request))
+
+
+class StudentSearchTests(FixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.login(self.admin)
+
+    def search(self, **params):
+        response = self.client.get("/api/students/search/", params)
+        self.assertEqual(response.status_code, 200)
+        return [row["name"] for row in response.json()]
+
+    def test_name_prefix_ignores_spaces_and_case(self):
+        Student.objects.create(name="Kim Minji", parent_phone="010-8888-0000", school="한국고")
+        self.assertEqual(self.search(q="김 철"), ["김철수"])
+        self.assertEqual(self.search(q="kimmin"), ["Kim Minji"])
+        self.assertEqual(self.search(q="철수"), [])
+
+    def test_phone_lookups(self):
+        self.assertEqual(self.search(q="5678"), ["김철수"])
+        self.assertEqual(self.search(q="0001"), ["김철수"])
+        self.assertEqual(self.search(q="555"), ["박민수"])
+        self.assertEqual(self.search(q="010-2222-33"), ["이영희"])
+        self.assertEqual(self.search(q="0104444"), ["박민수"])
+
+    def test_school_filter_and_limit(self):
+        self.assertEqual(self.search(school="한국"), ["김철수", "박민수"])
+        self.assertEqual(self.search(q="김", school="서울고"), [])
+        self.assertEqual(len(self.search(school="서울", limit=1)), 1)
+        response = self.client.get("/api/students/search/")
+        self.assertEqual(response.status_code, 400)
+
+    def test_role_scope_and_masking(self):
+        self.login(self.teacher)
+        self.assertEqual(self.search(school="한국"), ["김철수"])
+        self.login(self.assistant)
+        row = self.client.get("/api/students/search/", {"q": "김철"}).json()[0]
+        self.assertEqual((row["parent_phone"], row["student_phone"]), ("010-****-****",) * 2)
+        for query in ["5678", "010-1234-5", "01012345"]:
+            response = self.client.get("/api/students/search/", {"q": query})
+            self.assertEqual(response.status_code, 403)
+
+    def test_search_fields_follow_updates(self):
+        self.kim.name = "김 영수"
+        self.kim.save(update_fields=["name"])
+        self.assertEqual(self.search(q="김영"), ["김 영수"])
+        self.assertEqual(self.search(q="김철"), [])
+
+
+class PhoneNormalizationTests(FixtureMixin, TestCase):
+    def test_normalized_columns_are_stored(self):
+        student = Student.objects.create(
+            name="정하늘", parent_phone="010 1111 2222", student_phone="+82 10-3333-4444"
+        )
+        student.refresh_from_db()
+        self.assertEqual(student.parent_phone_digits, "01011112222")
+        self.assertEqual(student.student_phone_digits, "821033334444")
+        self.assertEqual(student.parent_phone_e164, "+821011112222")
+
+        student.parent_phone = "010-5555-6666"
+        student.save(update_fields=["parent_phone"])
+        student.refresh_from_db()
+        self.assertEqual(student.parent_phone_e164, "+821055556666")
+
+    def test_e164(self):
+        self.assertEqual(phone_e164("010-1234-5678"), "+821012345678")
+        self.assertEqual(phone_e164("82-10-1234-5678"), "+821012345678")
+        self.assertEqual(phone_e164("10-1234-5678"), "+821012345678")
+        self.assertEqual(phone_e164(""), "")
+
+    def test_duplicate_check_ignores_phone_format(self):
+        Student.objects.create(name="정하늘", parent_phone="01043219876", school="한국고")
+        self.login(self.admin)
+        response = self.client.post(
+            "/api/students/",
+            {"name": "정하늘", "parent_phone": "010-4321-9876", "school": "한국고"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("이미 동일한 이름과 학부모 전화번호", str(response.json()))
+
+
+class ExamScoresMixin(FixtureMixin):
+    """화학A 월말(50점 만점): 최지우 50, 김철수 40, 이영희 30 / 생명A 월말: 박민수 10"""
+
+    def setUp(self):
+        super().setUp()
+        self.login(self.admin)
+        day = date(2026, 10, 5)
+        self.scores = {}
+        for student, score in [(self.choi, 50), (self.kim, 40), (self.lee, 30)]:
+            attendance = self.attend(student, self.chem_class, day)
+            self.scores[student.pk] = self.exam(attendance, name="월말", score=score, max_score=50)
+        self.exam(
+            self.attend(self.park, self.bio_class, day), name="월말", score=10, max_score=50
+        )
+
+    def without_window_functions(self):
+        return mock.patch.object(connection.features, "supports_over_clause", False)
+
+
+class ExamStatisticsTests(ExamScoresMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        for student, grade in [(self.kim, "A"), (self.lee, "A"), (self.choi, "B+")]:
+            attendance = Attendance.objects.get(student=student, class_info=self.chem_class)
+            self.exam(
+                attendance, name="서술1", score=None, max_score=None, category="ESSAY", grade=grade
+            )
+
+    def averages(self, **params):
+        response = self.client.get("/api/exams/exam_averages/", params)
+        self.assertEqual(response.status_code, 200)
+        return {(row["name"], row["category"]): row for row in response.json()}
+
+    def test_normalized_statistics(self):
+        row = self.averages(class_id=self.chem_class.pk)[("월말", "REVIEW")]
+        self.assertEqual(
+            {key: row[key] for key in ["average_score", "max_score", "min_score", "count"]},
+            {"average_score": 40, "max_score": 50, "min_score": 30, "count": 3},
+        )
+        self.assertEqual(row["average_percent"], 80.0)
+        self.assertEqual(row["median_percent"], 80.0)
+        self.assertEqual(row["stddev_percent"], 16.33)
+        self.assertEqual(row["category_display"], "복습테스트")
+
+    def test_grade_distribution(self):
+        row = self.averages(class_id=self.chem_class.pk)[("서술1", "ESSAY")]
+        self.assertEqual(row["grade_distribution"], {"A": 2, "B+": 1})
+        self.assertIsNone(row["average_percent"])
+
+    def test_filters_and_role_scope(self):
+        self.assertEqual(self.averages(subject=self.bio.pk)[("월말", "REVIEW")]["count"], 1)
+        self.assertEqual(self.averages()[("월말", "REVIEW")]["median_percent"], 70.0)
+        self.assertEqual(self.averages(date_from="2026-10-06"), {})
+        response = self.client.get("/api/exams/exam_averages/", {"date_to": "10/05"})
+        self.assertEqual(response.status_code, 400)
+        self.login(self.teacher)
+        self.assertEqual(self.averages()[("월말", "REVIEW")]["count"], 3)
+
+    def test_median_without_window_functions(self):
+        queryset = Exam.objects.all()
+        expected = exam_statistics(queryset)
+        with self.without_window_functions():
+            self.assertEqual(exam_statistics(queryset), expected)
+        # 짝수 개의 중앙값은 가운데 두 값의 평균
+        row = {(row["name"], row["category"]): row for row in expected}[("월말", "REVIEW")]
+        self.assertEqual(row["median_percent"], 70.0)
+
+
+class ExamRankingTests(ExamScoresMixin, TestCase):
+    def rankings(self, **params):
+        response = self.client.get("/api/exams/rankings/", {"name": "월말", **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_ranks_percentiles_and_z_scores(self):
+        body = self.rankings(class_id=self.chem_class.pk)
+        self.assertEqual(
+            (body["count"], body["average_percent"], body["stddev_percent"]), (3, 80.0, 16.33)
+        )
+        self.assertEqual(
+            [
+                (row["student_name"], row["rank"], row["percentile"], row["z_score"])
+                for row in body["results"]
+            ],
+            [("최지우", 1, 100.0, 1.22), ("김철수", 2, 50.0, 0.0), ("이영희", 3, 0.0, -1.22)],
+        )
+
+    def test_ties_share_rank(self):
+        self.exam(
+            self.attend(self.park, self.chem_class, date(2026, 10, 5)),
+            name="월말",
+            score=40,
+            max_score=50,
+        )
+        results = self.rankings(class_id=self.chem_class.pk)["results"]
+        self.assertEqual(
+            [(row["student_name"], row["rank"], row["percentile"]) for row in results],
+            [("최지우", 1, 100.0), ("김철수", 2, 33.33), ("박민수", 2, 33.33), ("이영희", 4, 0.0)],
+        )
+
+    def test_python_fallback_matches_window_functions(self):
+        self.exam(
+            self.attend(self.park, self.chem_class, date(2026, 10, 5)),
+            name="월말",
+            score=40,
+            max_score=50,
+        )
+        queryset = Exam.objects.filter(name="월말")
+        expected = exam_rankings(queryset)
+        with self.without_window_functions():
+            self.assertEqual(exam_rankings(queryset), expected)
+
+    def test_subject_scope_and_validation(self):
+        self.assertEqual(self.rankings(subject=self.bio.pk)["count"], 1)
+        self.login(self.teacher)
+        self.assertEqual(self.rankings(subject=self.bio.pk)["count"], 0)
+        for params in [
+            {},
+            {"class_id": self.chem_class.pk, "subject": self.chem.pk},
+            {"class_id": "x"},
+        ]:
+            response = self.client.get("/api/exams/rankings/", {"name": "월말", **params})
+            self.assertEqual(response.status_code, 400)
+        response = self.client.get("/api/exams/rankings/", {"class_id": self.chem_class.pk})
+        self.assertEqual(response.status_code, 400)
+
+
+class StudentTrendTests(FixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.login(self.admin)
+        Enrollment.objects.all().delete()
+        Enrollment.objects.create(
+            class_info=self.chem_class, student=self.kim, start_date=date(2026, 9, 1)
+        )
+        Enrollment.objects.create(
+            class_info=self.bio_class, student=self.kim, start_date=date(2026, 10, 1)
+        )
+        # 김철수가 빠진 수업일
+        self.attend(self.lee, self.chem_class, date(2026, 9, 21))
+        self.exam(self.attend(self.kim, self.chem_class, date(2026, 9, 7), is_late=True), score=20)
+        self.exam(self.attend(self.kim, self.chem_class, date(2026, 9, 14)), score=15)
+        self.exam(self.attend(self.kim, self.chem_class, date(2026, 10, 5)), score=25)
+        self.exam(self.attend(self.kim, self.bio_class, date(2026, 10, 6)), score=10, max_score=20)
+
+    def trend(self, status=200, **params):
+        response = self.client.get(f"/api/students/{self.kim.pk}/trend/", params)
+        self.assertEqual(response.status_code, status)
+        return response.json()
+
+    def test_monthly_series_per_subject(self):
+        body = self.trend()
+        self.assertEqual((body["bucket"], body["window"]), ("month", 3))
+        self.assertEqual([series["subject_name"] for series in body["series"]], ["생명", "화학"])
+
+        september, october = body["series"][1]["points"]
+        self.assertEqual(september["period"], "2026-09-01")
+        september.pop("homework_accuracy")
+        self.assertEqual(
+            september,
+            {
+                "period": "2026-09-01",
+                "exam_count": 2,
+                "average_percent": 70.0,
+                "moving_average": 70.0,
+                "session_count": 3,
+                "absent_count": 1,
+                "attendance_rate": 66.67,
+                "attendance_count": 2,
+                "late_count": 1,
+                "on_time_rate": 50.0,
+                "late_rate": 50.0,
+                "homework_completion": 100.0,
+            },
+        )
+        self.assertEqual((october["average_percent"], october["moving_average"]), (100.0, 85.0))
+        self.assertEqual((october["session_count"], october["attendance_rate"]), (1, 100.0))
+
+    def test_weekly_buckets_and_window(self):
+        points = self.trend(bucket="week", window=1, subject=self.chem.pk)["series"][0]["points"]
+        self.assertEqual(
+            [(point["period"], point["moving_average"]) for point in points],
+            [
+                ("2026-09-07", 80.0),
+                ("2026-09-14", 60.0),
+                # 결석만 있는 주도 포함되고, 이동평균은 점수가 있는 버킷 기준
+                ("2026-09-21", 60.0),
+                ("2026-10-05", 100.0),
+            ],
+        )
+
+    def test_role_scope_and_validation(self):
+        self.login(self.teacher)
+        self.assertEqual([series["subject_name"] for series in self.trend()["series"]], ["화학"])
+        # 범위 밖 학생은 조회 대상이 아님
+        self.assertEqual(self.client.get(f"/api/students/{self.park.pk}/trend/").status_code, 404)
+        self.trend(status=400, bucket="day")
+        self.trend(status=400, window=13)
+        self.trend(status=400, subject="x")
+
+    def test_cached_trend_follows_new_records(self):
+        self.trend()
+        self.exam(self.attend(self.kim, self.chem_class, date(2026, 10, 12)), score=0)
+        october = self.trend()["series"][1]["points"][1]
+        self.assertEqual((october["exam_count"], october["average_percent"]), (2, 50.0))
+        # 다른 학생만 출석한 수업일도 결석으로 반영
+        self.attend(self.lee, self.chem_class, date(2026, 10, 19))
+        october = self.trend()["series"][1]["points"][1]
+        self.assertEqual((october["absent_count"], october["attendance_rate"]), (1, 66.67))
+
+
+class EnrollmentHistoryMixin(FixtureMixin):
+    """
+    화학A 9월: 김철수 9/1 부터 등록, 이영희 9/1~9/14 등록, 박민수는 미등록으로 9/21 출석
+
+    출석: 9/7 김철수 출석, 이영희 지각 / 9/14 김철수 대체 / 9/21 박민수 출석
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.login(self.admin)
+        Enrollment.objects.all().delete()
+        Enrollment.objects.create(
+            class_info=self.chem_class, student=self.kim, start_date=date(2026, 9, 1)
+        )
+        Enrollment.objects.create(
+            class_info=self.chem_class,
+            student=self.lee,
+            start_date=date(2026, 9, 1),
+            end_date=date(2026, 9, 15),
+        )
+        self.attend(self.kim, self.chem_class, date(2026, 9, 7))
+        self.attend(self.lee, self.chem_class, date(2026, 9, 7), is_late=True)
+        self.attend(
+            self.kim, self.chem_class, date(2026, 9, 14), class_type=Attendance.ClassType.MAKEUP
+        )
+        self.attend(self.park, self.chem_class, date(2026, 9, 21))
+
+
+class AttendanceMatrixTests(EnrollmentHistoryMixin, TestCase):
+    def matrix(self, status=200, **params):
+        response = self.client.get(
+            f"/api/classes/{self.chem_class.pk}/attendance_matrix/", params
+        )
+        self.assertEqual(response.status_code, status)
+        return response.json()
+
+    def test_matrix_uses_enrollment_periods(self):
+        body = self.matrix(month="2026-09")
+        self.assertEqual(body["dates"], ["2026-09-07", "2026-09-14", "2026-09-21"])
+        self.assertEqual(body["student_names"], ["김철수", "박민수", "이영희"])
+        codes = [[body["status_codes"][code] for code in row] for row in body["matrix"]]
+        self.assertEqual(
+            codes,
+            [
+                ["present", "makeup", "absent"],
+                ["not_enrolled", "not_enrolled", "present"],
+                ["late", "absent", "not_enrolled"],
+            ],
+        )
+
+    def test_query_count_does_not_grow_with_roster(self):
+        self.use_shared_cache()
+        self.matrix(month="2026-09")
+        with self.assertNumQueries(4):
+            # 세션, 반, 출석 기록, 등록 기간
+            self.matrix(month="2026-09")
+        for i in range(5):
+            student = Student.objects.create(name=f"학생{i}", parent_phone=f"010-0000-000{i}")
+            Enrollment.objects.create(
+                class_info=self.chem_class, student=student, start_date=date(2026, 9, 1)
+            )
+            self.attend(student, self.chem_class, date(2026, 9, 7))
+        with self.assertNumQueries(4):
+            self.assertEqual(len(self.matrix(month="2026-09")["student_ids"]), 8)
+
+    def test_empty_month_and_validation(self):
+        body = self.matrix(month="2026-08")
+        self.assertEqual((body["dates"], body["matrix"]), ([], []))
+        self.matrix(status=400, month="2026-13")
+        self.matrix(status=400, month="september")
+
+
+class AbsenceTests(EnrollmentHistoryMixin, TestCase):
+    def test_absences_follow_enrollment_periods(self):
+        # 지금 반에 들어온 학생은 지난 달 결석으로 잡히지 않음
+        self.chem_class.students.add(self.choi)
+
+        result = class_absences(self.chem_class, date(2026, 9, 1), date(2026, 9, 30))
+        self.assertEqual(
+            result["dates"],
+            [
+                {
+                    "date": "2026-09-07",
+                    "expected": 2,
+                    "present": 1,
+                    "late": 1,
+                    "absent": 0,
+                    "absent_student_ids": [],
+                },
+                {
+                    "date": "2026-09-14",
+                    "expected": 2,
+                    "present": 1,
+                    "late": 0,
+                    "absent": 1,
+                    "absent_student_ids": [self.lee.pk],
+                },
+                {
+                    "date": "2026-09-21",
+                    "expected": 1,
+                    "present": 1,
+                    "late": 0,
+                    "absent": 1,
+                    "absent_student_ids": [self.kim.pk],
+                },
+            ],
+        )
+        self.assertEqual(
+            [(row["student_name"], row["absent_dates"]) for row in result["students"]],
+            [("김철수", ["2026-09-21"]), ("이영희", ["2026-09-14"])],
+        )
+
+    def test_dashboard_reports_absences(self):
+        body = self.client.get(
+            "/api/dashboard/", {"class_id": self.chem_class.pk, "month": "2026-09"}
+        ).json()
+        self.assertEqual([row["absent"] for row in body["attendance_stats"]], [0, 1, 1])
+        self.assertEqual(
+            [row["student_id"] for row in body["absent_students"]], [self.kim.pk, self.lee.pk]
+        )
+
+    def test_query_count_is_fixed(self):
+        with self.assertNumQueries(2):
+            class_absences(self.chem_class, date(2026, 9, 1), date(2026, 9, 30))
+
+
+class ArchiveTests(FixtureMixin, TestCase):
+    """2025학년도(2025-03-01 ~ 2026-02-28) 기록 2건과 2026학년도 기록 1건"""
+
+    def setUp(self):
+        super().setUp()
+        self.login(self.admin)
+        self.old = [
+            self.attend(self.kim, self.chem_class, date(2025, 9, 1)),
+            self.attend(self.lee, self.chem_class, date(2026, 2, 28), is_late=True),
+        ]
+        self.exam(self.old[0], score=21)
+        self.exam(
+            self.old[1], name="서술1", score=None, max_score=None, category="ESSAY", grade="B"
+        )
+        self.current = self.attend(self.kim, self.chem_class, date(2026, 3, 2))
+        self.exam(self.current)
+
+    def rows(self, model):
+        """복원 시 갱신되는 updated_at 을 뺀 모든 컬럼"""
+        fields = [
+            field.attname for field in model._meta.concrete_fields if field.name != "updated_at"
+        ]
+        return list(model.objects.order_by("pk").values(*fields))
+
+    def archive(self, *args):
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("archive_school_year", "2025", *args, stdout=out)
+        return out.getvalue()
+
+    def test_archive_and_restore_round_trip(self):
+        attendances, exams = self.rows(Attendance), self.rows(Exam)
+        old_ids = sorted(attendance.pk for attendance in self.old)
+
+        self.assertIn("Archived 2 attendances and 2 exams", self.archive())
+        self.assertEqual(list(Attendance.objects.values_list("pk", flat=True)), [self.current.pk])
+        self.assertEqual(
+            sorted(ArchivedAttendance.objects.values_list("pk", "school_year")),
+            [(pk, 2025) for pk in old_ids],
+        )
+        self.assertEqual(ArchivedExam.objects.count(), 2)
+        tombstones = Tombstone.objects.filter(model_name="attendance")
+        self.assertEqual(sorted(tombstones.values_list("object_id", flat=True)), old_ids)
+
+        self.assertIn("Restored 2 attendances and 2 exams", self.archive("--restore"))
+        self.assertEqual(self.rows(Attendance), attendances)
+        self.assertEqual(self.rows(Exam), exams)
+        self.assertFalse(ArchivedAttendance.objects.exists())
+        self.assertFalse(ArchivedExam.objects.exists())
+        self.assertFalse(Tombstone.objects.exists())
+
+    def test_dry_run_and_open_year(self):
+        self.assertIn("Would archive 2 attendances and 2 exams", self.archive("--dry-run"))
+        self.assertEqual(Attendance.objects.count(), 3)
+        with self.assertRaisesMessage(CommandError, "2026학년도는 아직 끝나지 않아"):
+            call_command("archive_school_year", "2026", stdout=StringIO())
+
+    def test_records_endpoints_read_archive_on_request(self):
+        self.archive()
+        url = f"/api/students/{self.kim.pk}/attendance_records/"
+        self.assertEqual([row["date"] for row in self.client.get(url).json()], ["2026-03-02"])
+        self.assertEqual(
+            [row["date"] for row in self.client.get(url, {"include_archived": "true"}).json()],
+            ["2026-03-02", "2025-09-01"],
+        )
+        self.assertEqual(
+            [row["date"] for row in self.client.get(url, {"school_year": "2025"}).json()],
+            ["2025-09-01"],
+        )
+        exams = self.client.get(
+            f"/api/students/{self.kim.pk}/exam_records/", {"school_year": "2025"}
+        ).json()
+        self.assertEqual([row["score"] for row in exams], [21.0])
+
+    def test_dashboard_cache_is_invalidated(self):
+        params = {"class_id": self.chem_class.pk, "month": "2025-09"}
+        self.assertEqual(len(self.client.get("/api/dashboard/", params).json()["grade_stats"]), 1)
+        self.archive()
+        self.assertEqual(self.client.get("/api/dashboard/", params).json()["grade_stats"], [])
+
+
+class RawDeleteTests(FixtureMixin, TestCase):
+    def give_records(self, student, count, start=date(2026, 9, 1)):
+        attendances = []
+        for i in range(count):
+            attendance = self.attend(student, self.chem_class, start + timedelta(days=i))
+            self.exam(attendance)
+            self.exam(attendance, name="복습2")
+            attendances.append(attendance)
+        return attendances
+
+    def queries(self, function, *args):
+        with CaptureQueriesContext(connection) as context:
+            function(*args)
+        return len(context.captured_queries)
+
+    def test_student_delete_removes_everything_in_fixed_queries(self):
+        self.give_records(self.kim, 1)
+        self.give_records(self.lee, 10)
+        self.give_records(self.lee, 1, start=date(2025, 9, 1))
+        archive_school_year(2025)
+        self.assertTrue(ArchivedAttendance.objects.filter(student=self.lee).exists())
+
+        self.assertEqual(self.queries(delete_student, self.kim), self.queries(delete_student, self.lee))
+        for model, field in [
+            (Attendance, "student"),
+            (Exam, "attendance__student"),
+            (ArchivedAttendance, "student"),
+            (ArchivedExam, "attendance__student"),
+            (Enrollment, "student"),
+            (Class.students.through, "student"),
+        ]:
+            self.assertFalse(
+                model.objects.filter(**{f"{field}__in": [self.kim.pk, self.lee.pk]}).exists()
+            )
+        self.assertFalse(Student.objects.filter(pk__in=[self.kim.pk, self.lee.pk]).exists())
+
+    def test_student_delete_leaves_tombstones(self):
+        attendances = self.give_records(self.kim, 2)
+        exam_ids = sorted(Exam.objects.filter(attendance__student=self.kim).values_list("pk", flat=True))
+        self.assertEqual(delete_student(self.kim), {
+            "exams": 4, "attendances": 2, "archived_exams": 0, "archived_attendances": 0
+        })
+
+        tombstones = Tombstone.objects.order_by("object_id")
+        self.assertEqual(
+            list(tombstones.filter(model_name="student").values_list("object_id", flat=True)),
+            [self.kim.pk],
+        )
+        self.assertEqual(
+            list(tombstones.filter(model_name="attendance").values_list("object_id", "class_id", "date")),
+            [(a.pk, self.chem_class.pk, a.date) for a in attendances],
+        )
+        self.assertEqual(
+            list(tombstones.filter(model_name="exam").values_list("object_id", flat=True)), exam_ids
+        )
+
+    def test_attendance_delete_removes_exams(self):
+        small, large = self.give_records(self.kim, 1)[0], self.give_records(self.lee, 1)[0]
+        for i in range(8):
+            self.exam(large, name=f"추가{i}")
+        self.assertEqual(self.queries(delete_attendance, small), self.queries(delete_attendance, large))
+        self.assertFalse(Exam.objects.exists())
+        self.assertEqual(Tombstone.objects.filter(model_name="exam").count(), 12)
+
+    def test_destroy_views_report_counts_and_keep_role_checks(self):
+        self.give_records(self.kim, 2)
+        self.login(self.assistant)
+        self.assertEqual(self.client.delete(f"/api/students/{self.kim.pk}/").status_code, 403)
+        self.login(self.teacher)
+        self.assertEqual(self.client.delete(f"/api/students/{self.park.pk}/").status_code, 404)
+        response = self.client.delete(f"/api/students/{self.kim.pk}/")
+        self.assertEqual(
+            response.json()["message"],
+            "학생과 함께 2개의 출석 기록, 4개의 시험 기록이 성공적으로 삭제되었습니다.",
+        )
+
+
+class EnrollmentDeltaTests(FixtureMixin, TestCase):
+    def change(self, action, students, status=200):
+        response = self.client.post(
+            f"/api/classes/{self.chem_class.pk}/{action}_students/",
+            {"students": students},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status)
+        return response.json()
+
+    def open_students(self):
+        return set(
+            Enrollment.objects.filter(
+                class_info=self.chem_class, end_date__isnull=True
+            ).values_list("student_id", flat=True)
+        )
+
+    def test_add_skips_assigned_students_and_opens_periods(self):
+        self.login(self.admin)
+        before = Class.objects.get(pk=self.chem_class.pk).updated_at
+        self.assertEqual(
+            self.change("add", [self.kim.pk, self.choi.pk]), {"added": 1, "removed": 0}
+        )
+        self.assertEqual(
+            set(self.chem_class.students.values_list("pk", flat=True)),
+            {self.kim.pk, self.lee.pk, self.choi.pk},
+        )
+        self.assertEqual(self.open_students(), {self.kim.pk, self.lee.pk, self.choi.pk})
+        self.assertGreater(Class.objects.get(pk=self.chem_class.pk).updated_at, before)
+
+        self.assertEqual(self.change("add", [self.choi.pk]), {"added": 0, "removed": 0})
+        self.assertEqual(
+            Enrollment.objects.filter(class_info=self.chem_class, student=self.choi).count(), 1
+        )
+
+    def test_remove_skips_unassigned_students_and_closes_periods(self):
+        self.login(self.admin)
+        self.assertEqual(
+            self.change("remove", [self.lee.pk, self.choi.pk]), {"added": 0, "removed": 1}
+        )
+        self.assertFalse(self.chem_class.students.filter(pk=self.lee.pk).exists())
+        self.assertEqual(self.open_students(), {self.kim.pk})
+        self.assertEqual(
+            Enrollment.objects.get(class_info=self.chem_class, student=self.lee).end_date,
+            timezone.localdate(),
+        )
+        self.assertEqual(self.change("remove", [self.lee.pk]), {"added": 0, "removed": 0})
+
+    def test_invalid_student_lists_are_rejected(self):
+        self.login(self.admin)
+        for students in [[], "1", [True], [self.kim.pk, "2"], list(range(1, 10_000))]:
+            self.change("add", students, status=400)
+        self.assertEqual(self.open_students(), {self.kim.pk, self.lee.pk})
+
+    def test_teacher_cannot_remove_from_other_subject(self):
+        self.login(self.teacher)
+        response = self.client.post(
+            f"/api/classes/{self.bio_class.pk}/remove_students/",
+            {"students": [self.park.pk]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(self.bio_class.students.filter(pk=self.park.pk).exists())
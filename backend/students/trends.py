@@ -0,0 +1,201 @@
+"""
+학생별 성적/출석 추이
+
+시험 점수(만점 대비 백분율)와 출석 기록을 주/월 단위로 묶어 과목별 시계열로 만든다.
+버킷 집계는 DB 의 날짜 절삭(TruncWeek/TruncMonth) 집계로 계산하고,
+결과는 학생의 출석/시험 기록과 등록 반의 수업일이 바뀌지 않는 한 캐시에서 재사용한다.
+
+출석률(attendance_rate)은 결석 계산(students.absence)과 같이, 학생이 등록되어 있던 반의
+수업일(그 반에 출석 기록이 있는 날짜) 중 출석 기록이 있는 비율이다.
+on_time_rate/late_rate 는 출석한 기록 중 정시/지각 비율로 결석은 포함하지 않는다.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, Max, Q
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from .absence import is_enrolled
+from .exam_stats import score_percent
+from .models import Attendance
+
+BUCKETS = {"week": TruncWeek, "month": TruncMonth}
+
+
+def enrollment_spans(enrollments):
+    """학생의 등록 기간: {반 id: (과목 id, 과목 이름, [(시작일, 종료일 또는 None), ...])}"""
+    spans = {}
+    rows = enrollments.order_by("class_info_id", "start_date").values_list(
+        "class_info_id",
+        "class_info__subject_id",
+        "class_info__subject__name",
+        "start_date",
+        "end_date",
+    )
+    for class_id, subject_id, subject_name, start_date, end_date in rows:
+        spans.setdefault(class_id, (subject_id, subject_name, []))[2].append((start_date, end_date))
+    return spans
+
+
+def class_sessions(spans):
+    """등록했던 반들의 출석 기록 (수업일 계산용)"""
+    return Attendance.objects.filter(class_info_id__in=spans)
+
+
+def trend_cache_key(student_id, bucket, window, subject_id, scope, spans, querysets):
+    """
+    등록 기간과 각 queryset 의 MAX(updated_at), 행 수를 검증값으로 포함한 캐시 키
+
+    기록이 추가/수정/삭제되거나 등록 반에 새 수업일이 생기면 검증값이 달라지므로 따로 무효화하지 않는다.
+    """
+    parts = [str(student_id), bucket, str(window), str(subject_id or ""), scope]
+    for class_id, (_, _, class_spans) in sorted(spans.items()):
+        periods = ",".join(f"{start}~{end or ''}" for start, end in class_spans)
+        parts.append(f"{class_id}:{periods}")
+    for queryset in querysets:
+        result = queryset.order_by().aggregate(count=Count("pk"), last=Max("updated_at"))
+        parts.append(str(result["count"]))
+        parts.append(result["last"].isoformat() if result["last"] else "")
+    digest = hashlib.md5("|".join(parts).encode(), usedforsecurity=False)
+    return f"student_trend:{student_id}:{digest.hexdigest()}"
+
+
+def student_trend(attendances, exams, spans, bucket="month", window=3):
+    """
+    과목별 추이 목록
+
+    attendances, exams 는 학생 한 명의 (역할 범위가 적용된) 출석/시험 queryset 이고,
+    spans 는 같은 범위의 enrollment_spans() 결과이다.
+    moving_average 는 점수가 있는 최근 window 개 버킷의 average_percent 평균이다.
+    """
+    trunc = BUCKETS[bucket]
+    series = {}
+
+    def point(subject_id, subject_name, period):
+        subject = series.setdefault(
+            subject_id,
+            {"subject_id": subject_id, "subject_name": subject_name, "points": {}},
+        )
+        return subject["points"].setdefault(
+            period,
+            {
+                "period": period,
+                "exam_count": 0,
+                "average_percent": None,
+                "moving_average": None,
+                "session_count": 0,
+                "absent_count": 0,
+                "attendance_rate": None,
+                "attendance_count": 0,
+                "late_count": 0,
+                "on_time_rate": None,
+                "late_rate": None,
+                "homework_completion": None,
+                "homework_accuracy": None,
+            },
+        )
+
+    attendance_buckets = (
+        attendances.order_by()
+        .annotate(period=trunc("date"))
+        .values("period", "class_info__subject_id", "class_info__subject__name")
+        .annotate(
+            total=Count("id"),
+            late=Count("id", filter=Q(is_late=True)),
+            homework_completion=Avg("homework_completion"),
+            homework_accuracy=Avg("homework_accuracy"),
+        )
+    )
+    for row in attendance_buckets:
+        data = point(
+            row["class_info__subject_id"], row["class_info__subject__name"], row["period"]
+        )
+        data["attendance_count"] = row["total"]
+        data["late_count"] = row["late"]
+        data["on_time_rate"] = _percent(row["total"] - row["late"], row["total"])
+        data["late_rate"] = _percent(row["late"], row["total"])
+        data["homework_completion"] = _round(row["homework_completion"])
+        data["homework_accuracy"] = _round(row["homework_accuracy"])
+
+    # 등록 기간 중의 수업일마다 출석 기록이 없으면 결석
+    attended = set(attendances.order_by().values_list("class_info_id", "date"))
+    sessions = (
+        class_sessions(spans)
+        .order_by()
+        .annotate(period=trunc("date"))
+        .values_list("class_info_id", "date", "period")
+        .distinct()
+    )
+    for class_id, day, period in sessions:
+        subject_id, subject_name, class_spans = spans[class_id]
+        if not is_enrolled(class_spans, day):
+            continue
+        data = point(subject_id, subject_name, period)
+        data["session_count"] += 1
+        if (class_id, day) not in attended:
+            data["absent_count"] += 1
+
+    exam_buckets = (
+        exams.order_by()
+        .annotate(period=trunc("attendance__date"))
+        .values(
+            "period",
+            "attendance__class_info__subject_id",
+            "attendance__class_info__subject__name",
+        )
+        .annotate(average_percent=Avg(score_percent()), exam_count=Count(score_percent()))
+    )
+    for row in exam_buckets:
+        data = point(
+            row["attendance__class_info__subject_id"],
+            row["attendance__class_info__subject__name"],
+            row["period"],
+        )
+        data["exam_count"] = row["exam_count"]
+        data["average_percent"] = _round(row["average_percent"])
+
+    results = []
+    for subject in sorted(series.values(), key=lambda s: (s["subject_name"] or "")):
+        points = [subject["points"][period] for period in sorted(subject["points"])]
+        recent = []
+        for data in points:
+            data["attendance_rate"] = _percent(
+                data["session_count"] - data["absent_count"], data["session_count"]
+            )
+            if data["average_percent"] is not None:
+                recent = (recent + [data["average_percent"]])[-window:]
+            if recent:
+                data["moving_average"] = _round(sum(recent) / len(recent))
+        subject["points"] = points
+        results.append(subject)
+    return results
+
+
+def cached_student_trend(
+    student, attendances, exams, enrollments, bucket, window, subject_id, scope
+):
+    spans = enrollment_spans(enrollments)
+    key = trend_cache_key(
+        student.pk,
+        bucket,
+        window,
+        subject_id,
+        scope,
+        spans,
+        (attendances, exams, class_sessions(spans)),
+    )
+    results = cache.get(key)
+    if results is None:
+        results = student_trend(attendances, exams, spans, bucket=bucket, window=window)
+        cache.set(key, results, settings.TREND_CACHE_TIMEOUT)
+    return results
+
+
+def _percent(part, total):
+    return round(part * 100 / total, 2) if total else None
+
+
+def _round(value):
+    return None if value is None else round(value, 2)
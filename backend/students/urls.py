@@ -15,5 +15,15 @@ urlpatterns = [
     path("login/", views.LoginView.as_view(), name="login"),
     path("logout/", views.LogoutView.as_view(), name="logout"),
     path("dashboard/", views.DashboardView.as_view(), name="dashboard"),
+    path("enrollments/", views.EnrollmentView.as_view(), name="enrollments"),
+    path("sync/", views.SyncView.as_view(), name="sync"),
+    path("batch/", views.BatchView.as_view(), name="batch"),
+    path("bootstrap/", views.BootstrapView.as_view(), name="bootstrap"),
+    path(
+        "events/attendance/",
+        views.AttendanceEventStreamView.as_view(),
+        name="attendance-events",
+    ),
     path("notifications/", views.KakaoNotificationView.as_view(), name="notifications"),
+    path("metrics/", views.MetricsView.as_view(), name="metrics"),
 ]
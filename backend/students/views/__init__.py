@@ -1,5 +1,11 @@
 from .auth import LoginView, LogoutView
+from .batch import BatchView
+from .bootstrap import BootstrapView
 from .user import UserViewSet
 from .class_student import ClassViewSet, StudentViewSet
 from .record import AttendanceViewSet, ExamViewSet
+from .enrollment import EnrollmentView
+from .events import AttendanceEventStreamView
 from .extra import DashboardView, KakaoNotificationView, SubjectViewSet
+from .monitoring import MetricsView
+from .sync import SyncView
@@ -0,0 +1,124 @@
+import json
+import logging
+from urllib.parse import urlsplit
+
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+
+from ..routers import (
+    activate_replica,
+    deactivate_replica,
+    has_recent_write,
+    replica_configured,
+    replica_eligible,
+)
+from ..serializers import BatchSerializer
+
+logger = logging.getLogger("students.batch")
+
+API_PREFIX = "/api/"
+
+# 하위 요청으로 넘기지 않는 부모 요청 헤더 (조건부 GET 은 항목별 if_none_match 로 지정)
+_DROPPED_META = ("CONTENT_LENGTH", "CONTENT_TYPE", "HTTP_IF_NONE_MATCH", "HTTP_IF_MODIFIED_SINCE")
+
+
+class BatchView(APIView):
+    """
+    여러 GET 요청을 한 번의 HTTP 요청으로 실행
+
+    {"requests": [{"id": "students", "path": "/api/students/?class_id=2", "if_none_match": "..."}]}
+    응답은 요청 순서대로 {"responses": [{"id", "status", "etag", "body"}]} 이다.
+    하위 요청은 같은 세션과 인증된 사용자(캐시된 principal)를 공유하므로 인증과 권한 과목 조회를
+    다시 하지 않고, 각 뷰의 권한 검사와 역할 범위는 그대로 적용된다.
+    응답 본문은 하위 뷰에서 렌더링하지 않고 이 응답에서 한 번만 렌더링한다.
+    하위 뷰에서 처리되지 않은 예외는 그 항목만 500 으로 응답하고 나머지 항목은 계속 실행한다.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    # 하위 요청은 모두 GET 이므로 이 POST 뒤에 사용자를 기본 DB 에 고정하지 않음 (students.routers)
+    read_only = True
+
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        parent = request._request
+        responses = [
+            self._run(parent, request.user, index, item)
+            for index, item in enumerate(serializer.validated_data["requests"])
+        ]
+        return Response({"responses": responses})
+
+    def _run(self, parent, user, index, item):
+        result = {"id": item.get("id", str(index)), "status": None, "etag": None, "body": None}
+        pieces = urlsplit(item["path"])
+        if pieces.scheme or pieces.netloc or not pieces.path.startswith(API_PREFIX):
+            return self._error(result, status.HTTP_400_BAD_REQUEST, "/api/ 경로만 요청할 수 있습니다.")
+
+        try:
+            match = resolve(pieces.path)
+        except Resolver404:
+            return self._error(result, status.HTTP_404_NOT_FOUND, "존재하지 않는 경로입니다.")
+
+        view_class = getattr(match.func, "cls", None)
+        if view_class is None or not issubclass(view_class, APIView) or view_class is BatchView:
+            return self._error(
+                result, status.HTTP_400_BAD_REQUEST, "묶음 요청으로 호출할 수 없는 경로입니다."
+            )
+
+        sub = self._sub_request(parent, user, pieces, match, item.get("if_none_match"))
+        token = None
+        if (
+            replica_configured()
+            and replica_eligible(sub, match.func)
+            and not has_recent_write(parent, user.pk)
+        ):
+            token = activate_replica()
+        try:
+            response = match.func(sub, *match.args, **match.kwargs)
+        except Exception:
+            logger.exception("Batch item %s failed: %s", result["id"], item["path"])
+            return self._error(
+                result, status.HTTP_500_INTERNAL_SERVER_ERROR, "요청을 처리하지 못했습니다."
+            )
+        finally:
+            if token is not None:
+                deactivate_replica(token)
+
+        result["status"] = response.status_code
+        result["etag"] = response.get("ETag")
+        if hasattr(response, "data"):
+            result["body"] = response.data
+        elif response.get("Content-Type", "").startswith("application/json"):
+            result["body"] = json.loads(response.content)
+        return result
+
+    def _sub_request(self, parent, user, pieces, match, if_none_match):
+        sub = HttpRequest()
+        sub.method = "GET"
+        sub.path = sub.path_info = pieces.path
+        sub.META = {
+            key: value for key, value in parent.META.items() if key not in _DROPPED_META
+        }
+        sub.META.update(REQUEST_METHOD="GET", PATH_INFO=pieces.path, QUERY_STRING=pieces.query)
+        if if_none_match:
+            sub.META["HTTP_IF_NONE_MATCH"] = if_none_match
+        sub.GET = QueryDict(pieces.query)
+        sub.COOKIES = parent.COOKIES
+        sub.session = parent.session
+        sub.user = user
+        sub.resolver_match = match
+        # CachedSessionAuthentication 이 세션/사용자를 다시 조회하지 않도록 부모의 principal 을 공유
+        principal = getattr(parent, "_cached_principal", None)
+        if principal is not None:
+            sub._cached_principal = principal
+        return sub
+
+    def _error(self, result, status_code, detail):
+        result["status"] = status_code
+        result["body"] = {"detail": detail}
+        return result
@@ -0,0 +1,67 @@
+import hashlib
+import json
+
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count
+from django.utils.cache import get_conditional_response
+
+from ..authentication import get_user_version
+from ..caching import get_roster_version, reference
+from ..reports import accessible_classes, subject_scope
+from ..serializers import ClassSerializer, UserSerializer
+
+
+class BootstrapView(APIView):
+    """
+    화면 첫 로딩에 필요한 프로필, 과목 목록, 접근 가능한 반(학생 수 포함)을 한 번에 반환
+
+    users/profile/, subjects/, classes/?include_students=false 와 같은 모양이다.
+    (사용자 버전, 참조 데이터 버전, 반 배정 버전) 별로 캐시하므로 출석/시험 저장으로는 무효화되지 않는다.
+    ETag 는 응답 내용으로 계산하므로 버전이 올라가도 내용이 같으면 304 를 반환한다.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        key = (
+            f"bootstrap:{user.pk}:{get_user_version(user.pk)}:"
+            f"{reference.version()}:{get_roster_version()}"
+        )
+        cached = cache.get(key)
+        if cached is None:
+            payload = self._build(request)
+            body = json.dumps(payload, cls=DjangoJSONEncoder, sort_keys=True)
+            etag = f'W/"{hashlib.md5(body.encode(), usedforsecurity=False).hexdigest()}"'
+            cached = (etag, payload)
+            cache.set(key, cached, settings.BOOTSTRAP_CACHE_TIMEOUT)
+
+        etag, payload = cached
+        not_modified = get_conditional_response(request._request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        response = Response(payload)
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+    def _build(self, request):
+        user = request.user
+        classes = (
+            accessible_classes(subject_scope(user))
+            .select_related("subject")
+            .annotate(annotated_student_count=Count("students", distinct=True))
+            .order_by("id")
+        )
+        context = {"request": request, "include_students": False}
+        return {
+            "profile": UserSerializer(user).data,
+            "subjects": reference.subjects(),
+            "classes": ClassSerializer(classes, many=True, context=context).data,
+        }
@@ -1,30 +1,55 @@
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q
-
-from ..models import User, Class, Student, Exam
+from django.db.models import Count, Prefetch, Q
+from django.utils import timezone
+
+from ..archive import school_year_range
+from ..caching import reference
+from ..deletion import delete_student
+from ..enrollment import apply_changes
+from ..models import User, Class, Student, Attendance, Exam, ArchivedExam, Enrollment
+from ..normalization import normalize_search_text, phone_digits
+from ..readers import attendance_matrix, attendance_rows, exam_rows, month_range
 from ..serializers import (
     ClassSerializer,
+    EnrollmentChangeSerializer,
     StudentSerializer,
     StudentDetailSerializer,
-    AttendanceSerializer,
-    ExamSerializer,
+    include_students,
 )
+from ..trends import BUCKETS, cached_student_trend
+from .enrollment import check_enrollment_targets
+from .mixins import ConditionalGetMixin
 
 
-class ClassViewSet(viewsets.ModelViewSet):
+class ClassViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Class.objects.all()
     serializer_class = ClassSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # 읽기 복제 DB 로 보낼 수 있는 조회 액션 (students.routers)
+    replica_actions = {"list", "attendance_matrix"}
 
     def get_queryset(self):
+        queryset = self._scoped_queryset().select_related("subject")
+        if self.action in ["list", "retrieve"]:
+            # 학생 수는 반마다 COUNT 쿼리 대신 한 번에 집계
+            queryset = queryset.annotate(
+                annotated_student_count=Count("students", distinct=True)
+            )
+            if include_students(self.request):
+                queryset = queryset.prefetch_related(
+                    Prefetch("students", queryset=Student.objects.only("id"))
+                )
+        return queryset
+
+    def _scoped_queryset(self):
         queryset = Class.objects.all()
         user = self.request.user
 
         if user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
             # 사용자의 과목에 해당하는 반 또는 "퇴원" 반을 가져옴
-            queryset = queryset.filter(Q(subject__in=user.subjects.all()) | Q(name="퇴원"))
+            queryset = queryset.filter(Q(subject__in=user.get_subject_ids()) | Q(name="퇴원"))
 
         subject = self.request.query_params.get("subject", None)
         if subject:
@@ -33,6 +58,13 @@ class ClassViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(Q(subject=subject) | Q(name="퇴원"))
         return queryset
 
+    def get_validator_querysets(self, pk=None):
+        # 검증값 집계에는 학생 수 annotate/prefetch 가 필요 없음
+        queryset = self._scoped_queryset()
+        if pk is not None:
+            queryset = queryset.filter(pk=pk)
+        return [(queryset, self.validator_fields)]
+
     def get_permissions(self):
         if self.action in ["create", "update", "partial_update", "destroy"]:
             if self.request.user.role == User.Role.ASSISTANT:
@@ -49,7 +81,7 @@ class ClassViewSet(viewsets.ModelViewSet):
         name = request.data.get("name")
         if name == "퇴원":
             # "퇴원" 반은 이미 존재할 가능성이 높으므로 체크
-            if Class.objects.filter(name="퇴원").exists():
+            if any(row["name"] == "퇴원" for row in reference.classes().values()):
                 return Response(
                     {"detail": '"퇴원" 반은 이미 존재합니다.'},
                     status=status.HTTP_400_BAD_REQUEST,
@@ -57,7 +89,7 @@ class ClassViewSet(viewsets.ModelViewSet):
             # "퇴원" 반은 누구나 생성 가능 (관리자나 선생님)
         elif request.user.role == User.Role.TEACHER:
             subject_id = request.data.get("subject")
-            if subject_id and not request.user.subjects.filter(id=subject_id).exists():
+            if subject_id and not request.user.has_subject(subject_id):
                 return Response(
                     {"detail": "자신의 과목의 반만 생성할 수 있습니다."},
                     status=status.HTTP_403_FORBIDDEN,
@@ -85,7 +117,7 @@ class ClassViewSet(viewsets.ModelViewSet):
             )
 
         if request.user.role == User.Role.TEACHER:
-            if instance.name != "퇴원" and instance.subject not in request.user.subjects.all():
+            if instance.name != "퇴원" and instance.subject_id not in request.user.get_subject_ids():
                 return Response(
                     {"detail": "자신의 과목의 반만 수정할 수 있습니다."},
                     status=status.HTTP_403_FORBIDDEN,
@@ -94,7 +126,7 @@ class ClassViewSet(viewsets.ModelViewSet):
             subject_id = request.data.get("subject")
             if (
                 subject_id
-                and not request.user.subjects.filter(id=subject_id).exists()
+                and not request.user.has_subject(subject_id)
                 and request.data.get("name") != "퇴원"
             ):
                 return Response(
@@ -120,7 +152,7 @@ class ClassViewSet(viewsets.ModelViewSet):
             )
 
         if request.user.role == User.Role.TEACHER:
-            if instance.name != "퇴원" and instance.subject not in request.user.subjects.all():
+            if instance.name != "퇴원" and instance.subject_id not in request.user.get_subject_ids():
                 return Response(
                     {"detail": "자신의 과목의 반만 수정할 수 있습니다."},
                     status=status.HTTP_403_FORBIDDEN,
@@ -129,7 +161,7 @@ class ClassViewSet(viewsets.ModelViewSet):
             subject_id = request.data.get("subject")
             if (
                 subject_id
-                and not request.user.subjects.filter(id=subject_id).exists()
+                and not request.user.has_subject(subject_id)
                 and (request.data.get("name") or instance.name) != "퇴원"
             ):
                 return Response(
@@ -155,7 +187,7 @@ class ClassViewSet(viewsets.ModelViewSet):
             )
 
         if request.user.role == User.Role.TEACHER:
-            if instance.subject not in request.user.subjects.all():
+            if instance.subject_id not in request.user.get_subject_ids():
                 return Response(
                     {"detail": "자신의 과목의 반만 삭제할 수 있습니다."},
                     status=status.HTTP_403_FORBIDDEN,
@@ -167,11 +199,68 @@ class ClassViewSet(viewsets.ModelViewSet):
             status=status.HTTP_200_OK,
         )
 
+    @action(detail=True, methods=["post"])
+    def add_students(self, request, pk=None):
+        """반에 학생 추가 ({"students": [id, ...]}, 이미 배정된 학생은 건너뜀)"""
+        return self._change_students(request, add=True)
+
+    @action(detail=True, methods=["post"])
+    def remove_students(self, request, pk=None):
+        """반에서 학생 제외 ({"students": [id, ...]}, 배정되지 않은 학생은 건너뜀)"""
+        return self._change_students(request, add=False)
+
+    def _change_students(self, request, add):
+        class_obj = self.get_object()
+        student_ids = request.data.get("students")
+        if (
+            not isinstance(student_ids, list)
+            or not student_ids
+            or len(student_ids) > EnrollmentChangeSerializer.MAX_ITEMS
+            or not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in student_ids)
+        ):
+            return Response(
+                {
+                    "detail": f"students 에 학생 id 목록을 입력해주세요. (최대 {EnrollmentChangeSerializer.MAX_ITEMS}명)"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        error = check_enrollment_targets(request.user, {class_obj.pk}, set(student_ids))
+        if error is not None:
+            return error
 
-class StudentViewSet(viewsets.ModelViewSet):
+        pairs = {(class_obj.pk, student_id) for student_id in student_ids}
+        if add:
+            result = apply_changes(add=pairs)
+        else:
+            result = apply_changes(remove=pairs)
+        return Response(result, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["get"])
+    def attendance_matrix(self, request, pk=None):
+        """
+        월별 출석 매트릭스 (month=YYYY-MM, 기본 이번 달)
+
+        matrix[i][j] 는 student_ids[i] 학생의 dates[j] 수업 상태이며 status_codes 의 인덱스이다.
+        """
+        month = request.query_params.get("month") or timezone.localdate().strftime("%Y-%m")
+        period = month_range(month)
+        if period is None:
+            return Response(
+                {"detail": "month 는 YYYY-MM 형식이어야 합니다."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        class_obj = self.get_object()
+        return Response(attendance_matrix(class_obj, *period))
+
+
+class StudentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Student.objects.all()
     serializer_class = StudentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    validator_fields = ["updated_at", "classes__updated_at"]
+    replica_actions = {"list", "search", "attendance_records", "exam_records", "trend"}
 
     def get_serializer_class(self):
         if self.action == "retrieve":
@@ -184,7 +273,7 @@ class StudentViewSet(viewsets.ModelViewSet):
 
         if user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
             # 사용자의 과목에 속한 반의 학생이거나, "퇴원" 반 학생이거나, 반이 없는 학생
-            user_subjects = user.subjects.all()
+            user_subjects = user.get_subject_ids()
             queryset = queryset.filter(
                 Q(classes__subject__in=user_subjects) | 
                 Q(classes__name="퇴원") |
@@ -196,6 +285,26 @@ class StudentViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(classes__id=class_id)
         return queryset
 
+    def get_validator_querysets(self, pk=None):
+        # 목록의 출석/시험 통계와 상세의 출석/시험 기록도 검증값에 반영
+        validators = super().get_validator_querysets(pk=pk)
+        user = self.request.user
+
+        attendances = Attendance.objects.all()
+        exams = Exam.objects.all()
+        if user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
+            user_subjects = user.get_subject_ids()
+            attendances = attendances.filter(class_info__subject__in=user_subjects)
+            exams = exams.filter(attendance__class_info__subject__in=user_subjects)
+        if pk is not None:
+            attendances = attendances.filter(student_id=pk)
+            exams = exams.filter(attendance__student_id=pk)
+
+        return validators + [
+            (attendances, ["updated_at"]),
+            (exams, ["updated_at", "attendance__updated_at"]),
+        ]
+
     def get_permissions(self):
         if self.action in ["create", "update", "partial_update", "destroy"]:
             if self.request.user.role == User.Role.ASSISTANT:
@@ -240,52 +349,52 @@ class StudentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
+        instance = self.get_object()
+
         if request.user.role == User.Role.TEACHER:
-            instance = self.get_object()
-            user_subjects = request.user.subjects.all()
-            is_assigned = instance.classes.exists()
+            user_subjects = request.user.get_subject_ids()
+            assigned = instance.classes.aggregate(
+                total=Count("pk"),
+                allowed=Count("pk", filter=Q(subject__in=user_subjects) | Q(name="퇴원")),
+            )
             # 반이 없거나, 자신의 과목 반에 속해있거나, "퇴원" 반에 속해있으면 삭제 가능
-            can_delete = not is_assigned or instance.classes.filter(
-                Q(subject__in=user_subjects) | Q(name="퇴원")
-            ).exists()
-            if not can_delete:
+            if assigned["total"] and not assigned["allowed"]:
                 return Response(
                     {"detail": "자신의 과목에 속하지 않은 학생은 삭제할 수 없습니다."},
                     status=status.HTTP_403_FORBIDDEN,
                 )
 
-        instance = self.get_object()
-
-        if instance.attendance_set.exists():
-            exam_count = Exam.objects.filter(attendance__student=instance).count()
-            Exam.objects.filter(attendance__student=instance).delete()
-
-            attendance_count = instance.attendance_set.count()
-            instance.attendance_set.all().delete()
-
-            instance.delete()
+        counts = delete_student(instance)
 
+        if counts["attendances"]:
             return Response(
                 {
-                    "message": f"학생과 함께 {attendance_count}개의 출석 기록, {exam_count}개의 시험 기록이 성공적으로 삭제되었습니다."
+                    "message": f"학생과 함께 {counts['attendances']}개의 출석 기록, {counts['exams']}개의 시험 기록이 성공적으로 삭제되었습니다."
                 },
                 status=status.HTTP_200_OK,
             )
-        else:
-            instance.delete()
-            return Response(
-                {"message": "학생이 성공적으로 삭제되었습니다."},
-                status=status.HTTP_200_OK,
-            )
+        return Response(
+            {"message": "학생이 성공적으로 삭제되었습니다."},
+            status=status.HTTP_200_OK,
+        )
 
     @action(detail=True, methods=["get"])
     def attendance_records(self, request, pk=None):
         student = self.get_object()
         user = request.user
         
+        history = self._history_scope(request)
+        if history is None:
+            return Response(
+                {"detail": "school_year 는 숫자여야 합니다."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        date_range, include_archived = history
+
         attendances = student.attendance_set.all().order_by("-date")
+        archived = student.archived_attendances.all().order_by("-date")
         if user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
-            user_subjects = user.subjects.all()
+            user_subjects = user.get_subject_ids()
             # 자신의 과목 반 학생이거나 "퇴원" 반 학생이거나 반이 없는 경우 접근 허용
             if not student.classes.filter(Q(subject__in=user_subjects) | Q(name="퇴원")).exists() and student.classes.exists():
                 return Response(
@@ -294,20 +403,39 @@ class StudentViewSet(viewsets.ModelViewSet):
                 )
             # 출석 기록 필터링: 자신의 과목 또는 "퇴원" 반 기록
             attendances = attendances.filter(Q(class_info__subject__in=user_subjects) | Q(class_info__name="퇴원"))
+            archived = archived.filter(Q(class_info__subject__in=user_subjects) | Q(class_info__name="퇴원"))
 
-        serializer = AttendanceSerializer(attendances, many=True)
-        return Response(serializer.data)
+        if date_range:
+            attendances = attendances.filter(date__range=date_range)
+            archived = archived.filter(date__range=date_range)
+
+        rows = attendance_rows(attendances)
+        if include_archived:
+            # 보관된 학년도는 항상 진행 중인 기록보다 이전이므로 뒤에 이어 붙이면 날짜 역순이 유지된다
+            rows.extend(attendance_rows(archived))
+        return Response(rows)
 
     @action(detail=True, methods=["get"])
     def exam_records(self, request, pk=None):
         student = self.get_object()
         user = request.user
 
+        history = self._history_scope(request)
+        if history is None:
+            return Response(
+                {"detail": "school_year 는 숫자여야 합니다."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        date_range, include_archived = history
+
         exams = Exam.objects.filter(attendance__student=student).order_by(
             "-attendance__date"
         )
+        archived = ArchivedExam.objects.filter(attendance__student=student).order_by(
+            "-attendance__date"
+        )
         if user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
-            user_subjects = user.subjects.all()
+            user_subjects = user.get_subject_ids()
             if not student.classes.filter(Q(subject__in=user_subjects) | Q(name="퇴원")).exists() and student.classes.exists():
                 return Response(
                     {"detail": "해당 학생의 시험 기록에 접근할 권한이 없습니다."},
@@ -315,6 +443,161 @@ class StudentViewSet(viewsets.ModelViewSet):
                 )
             # 시험 기록 필터링: 자신의 과목 또는 "퇴원" 반 기록
             exams = exams.filter(Q(attendance__class_info__subject__in=user_subjects) | Q(attendance__class_info__name="퇴원"))
+            archived = archived.filter(Q(attendance__class_info__subject__in=user_subjects) | Q(attendance__class_info__name="퇴원"))
+
+        if date_range:
+            exams = exams.filter(attendance__date__range=date_range)
+            archived = archived.filter(attendance__date__range=date_range)
+
+        rows = exam_rows(exams)
+        if include_archived:
+            rows.extend(exam_rows(archived))
+        return Response(rows)
+
+    def _history_scope(self, request):
+        """
+        기록 조회 범위: (날짜 범위 또는 None, 보관 기록 포함 여부). school_year 가 잘못되면 None
+
+        기본은 보관되지 않은 (진행 중인) 기록만 조회한다.
+        school_year=YYYY 는 해당 학년도 기록을 보관 여부와 관계없이 조회하고,
+        include_archived=true 는 보관된 모든 학년도 기록을 함께 조회한다.
+        """
+        school_year = request.query_params.get("school_year")
+        include_archived = request.query_params.get("include_archived", "").lower() in ("1", "true")
+        if not school_year:
+            return None, include_archived
+        if not school_year.isdigit():
+            return None
+        return school_year_range(int(school_year)), True
+
+    @action(detail=True, methods=["get"])
+    def trend(self, request, pk=None):
+        """
+        주/월 단위 과목별 성적(만점 대비 백분율)과 출석 추이
+
+        출석률은 등록 기간 중 수업일 대비 출석한 비율 (students.trends 참고)
+        bucket: week | month (기본 month), window: 이동평균 버킷 수 (기본 3), subject: 과목 id
+        """
+        bucket = request.query_params.get("bucket", "month")
+        window = request.query_params.get("window", "3")
+        subject_id = request.query_params.get("subject")
+
+        if bucket not in BUCKETS:
+            return Response(
+                {"detail": "bucket 은 week 또는 month 여야 합니다."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not window.isdigit() or not 1 <= int(window) <= 12:
+            return Response(
+                {"detail": "window 는 1 이상 12 이하의 숫자여야 합니다."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if subject_id and not subject_id.isdigit():
+            return Response(
+                {"detail": "subject 는 숫자여야 합니다."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        student = self.get_object()
+        user = request.user
+
+        attendances = Attendance.objects.filter(student=student)
+        exams = Exam.objects.filter(attendance__student=student)
+        # 출석률의 분모가 되는 등록 반 ("퇴원" 반에는 수업이 없음)
+        enrollments = Enrollment.objects.filter(student=student).exclude(class_info__name="퇴원")
+        scope = "all"
+        if user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
+            user_subjects = user.get_subject_ids()
+            if not student.classes.filter(Q(subject__in=user_subjects) | Q(name="퇴원")).exists() and student.classes.exists():
+                return Response(
+                    {"detail": "해당 학생의 기록에 접근할 권한이 없습니다."},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+            attendances = attendances.filter(Q(class_info__subject__in=user_subjects) | Q(class_info__name="퇴원"))
+            exams = exams.filter(Q(attendance__class_info__subject__in=user_subjects) | Q(attendance__class_info__name="퇴원"))
+            enrollments = enrollments.filter(class_info__subject__in=user_subjects)
+            scope = ",".join(str(pk) for pk in sorted(user_subjects))
+
+        if subject_id:
+            attendances = attendances.filter(class_info__subject_id=subject_id)
+            exams = exams.filter(attendance__class_info__subject_id=subject_id)
+            enrollments = enrollments.filter(class_info__subject_id=subject_id)
+
+        series = cached_student_trend(
+            student, attendances, exams, enrollments, bucket, int(window), subject_id, scope
+        )
+        return Response(
+            {
+                "student_id": student.pk,
+                "bucket": bucket,
+                "window": int(window),
+                "series": series,
+            }
+        )
+
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        """
+        학생 검색: 이름 접두어, 부모님/학생 전화번호 끝 4자리, 학교 필터
+        예) /api/students/search/?q=김철&school=한국고&limit=20
+        """
+        query = request.query_params.get("q", "").strip()
+        school = request.query_params.get("school", "").strip()
+        try:
+            limit = min(max(int(request.query_params.get("limit", 20)), 1), 100)
+        except ValueError:
+            limit = 20
+
+        if not query and not school:
+            return Response(
+                {"detail": "검색어(q) 또는 학교(school)를 입력해주세요."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = self.get_queryset()
+        if query:
+            digits = phone_digits(query)
+            if digits and len(digits) == len(query.replace("-", "").replace(" ", "")):
+                # 번호가 마스킹되는 조교가 접두어를 한 자리씩 늘려 전체 번호를 알아낼 수 없도록 막음
+                if request.user.role == User.Role.ASSISTANT:
+                    return Response(
+                        {"detail": "조교는 전화번호로 검색할 수 없습니다."},
+                        status=status.HTTP_403_FORBIDDEN,
+                    )
+                # 숫자만 입력한 경우: 5자리 이상은 전체 번호 접두어, 그 이하는 끝자리 검색
+                suffix = digits[-4:]
+                if len(digits) > 4:
+                    phone_q = Q(parent_phone_digits__startswith=digits) | Q(
+                        student_phone_digits__startswith=digits
+                    )
+                elif len(suffix) == 4:
+                    phone_q = Q(parent_phone_last4=suffix) | Q(student_phone_last4=suffix)
+                else:
+                    phone_q = Q(parent_phone_last4__endswith=suffix) | Q(
+                        student_phone_last4__endswith=suffix
+                    )
+                queryset = queryset.filter(phone_q)
+            else:
+                queryset = queryset.filter(
+                    search_name__startswith=normalize_search_text(query)
+                )
+        if school:
+            queryset = queryset.filter(
+                search_school__startswith=normalize_search_text(school)
+            )
+
+        results = list(
+            queryset.order_by("search_name", "id").values(
+                "id", "name", "school", "parent_phone", "student_phone"
+            )[:limit]
+        )
+
+        # 조교(ASSISTANT)인 경우 전화번호 마스킹 처리 (개인정보 보호)
+        if request.user.role == User.Role.ASSISTANT:
+            mask = "010-****-****"
+            for row in results:
+                row["parent_phone"] = mask
+                if row["student_phone"]:
+                    row["student_phone"] = mask
 
-        serializer = ExamSerializer(exams, many=True)
-        return Response(serializer.data)
+        return Response(results)
@@ -0,0 +1,118 @@
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.db.models import Count, Q
+
+from ..caching import reference
+from ..enrollment import apply_changes
+from ..models import User, Student
+from ..serializers import EnrollmentChangeSerializer
+
+
+def check_enrollment_targets(user, class_ids, student_ids):
+    """
+    반 배정 변경 대상 검증 (반은 참조 데이터 캐시, 학생은 IN 쿼리 한 번)
+
+    선생님은 자신의 과목 반(또는 "퇴원" 반)만, 그리고 학생 목록에서 볼 수 있는 학생
+    (자신의 과목 반이나 "퇴원" 반 학생, 반이 없는 학생)만 변경할 수 있다.
+    문제가 있으면 오류 Response 를, 없으면 None 을 반환한다.
+    """
+    if user.role == User.Role.ASSISTANT:
+        return Response(
+            {"detail": "조교는 반 배정을 변경할 수 없습니다."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    cached = reference.classes()
+    classes = {
+        pk: (cached[pk]["name"], cached[pk]["subject_id"]) for pk in class_ids if pk in cached
+    }
+    missing_classes = sorted(set(class_ids) - set(classes))
+    is_teacher = user.role == User.Role.TEACHER
+    students = Student.objects.filter(pk__in=student_ids)
+    if is_teacher:
+        # 학생별 전체 반 수와 접근 가능한 반 수를 같은 쿼리에서 집계 ({학생 id: 접근 가능 여부})
+        found_students = {
+            pk: not total or allowed > 0
+            for pk, total, allowed in students.annotate(
+                total=Count("classes"),
+                allowed=Count(
+                    "classes",
+                    filter=Q(classes__subject__in=user.get_subject_ids()) | Q(classes__name="퇴원"),
+                ),
+            ).values_list("pk", "total", "allowed")
+        }
+    else:
+        found_students = dict.fromkeys(students.values_list("pk", flat=True), True)
+    missing_students = sorted(set(student_ids) - set(found_students))
+    if missing_classes or missing_students:
+        return Response(
+            {
+                "detail": "존재하지 않는 반 또는 학생이 포함되어 있습니다.",
+                "missing_classes": missing_classes,
+                "missing_students": missing_students,
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    if is_teacher:
+        user_subjects = user.get_subject_ids()
+        forbidden = sorted(
+            pk
+            for pk, (name, subject_id) in classes.items()
+            if name != "퇴원" and subject_id not in user_subjects
+        )
+        if forbidden:
+            return Response(
+                {
+                    "detail": "자신의 과목 반의 배정만 변경할 수 있습니다.",
+                    "forbidden_classes": forbidden,
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        forbidden_students = sorted(pk for pk, accessible in found_students.items() if not accessible)
+        if forbidden_students:
+            return Response(
+                {
+                    "detail": "자신의 과목 학생의 배정만 변경할 수 있습니다.",
+                    "forbidden_students": forbidden_students,
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+    return None
+
+
+class EnrollmentView(APIView):
+    """
+    여러 학생의 반 배정을 한 번에 변경
+
+    {"add": [{"student", "class_info"}], "remove": [...],
+     "move": [{"student", "from_class", "to_class"}]}
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = EnrollmentChangeSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        add = {(item["class_info"], item["student"]) for item in data.get("add", [])}
+        remove = {(item["class_info"], item["student"]) for item in data.get("remove", [])}
+        for item in data.get("move", []):
+            if item["from_class"] == item["to_class"]:
+                continue
+            remove.add((item["from_class"], item["student"]))
+            add.add((item["to_class"], item["student"]))
+
+        pairs = add | remove
+        error = check_enrollment_targets(
+            request.user,
+            {class_id for class_id, _ in pairs},
+            {student_id for _, student_id in pairs},
+        )
+        if error is not None:
+            return error
+
+        return Response(apply_changes(add=add, remove=remove), status=status.HTTP_200_OK)
@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from django.views import View
+
+from ..authentication import load_principal
+from ..caching import reference
+from ..events import broker, catch_up, parse_event_id, topic_key
+from ..models import User
+
+
+def _format(event, since):
+    # 재연결 시 Last-Event-ID 로 돌아오는 값. 겹치는 구간의 이벤트는 클라이언트가 덮어쓴다
+    event_id = since.isoformat()
+    name = "reset" if event["type"] == "reset" else f"{event['type']}.{event['action']}"
+    data = json.dumps(event, ensure_ascii=False, separators=(",", ":"))
+    return f"id: {event_id}\nevent: {name}\ndata: {data}\n\n"
+
+
+class AttendanceEventStreamView(View):
+    """
+    반/날짜의 출석, 시험 변경을 Server-Sent Events 로 전달
+
+    GET /api/events/attendance/?class_id=&date=YYYY-MM-DD
+    이벤트: attendance.saved, attendance.deleted, exam.saved, exam.deleted, reset
+    saved 의 data 는 목록 조회와 같은 모양의 행이다. ASGI 서버가 아니면 503 을 반환하므로
+    클라이언트는 기존 목록 조회로 돌아간다.
+    """
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse(
+                {"detail": "실시간 이벤트는 ASGI 서버에서만 사용할 수 있습니다."}, status=503
+            )
+
+        user = await sync_to_async(load_principal)(request)
+        if not user or not user.is_active:
+            return JsonResponse({"detail": "로그인이 필요합니다."}, status=401)
+
+        date_value = request.GET.get("date")
+        try:
+            date = parse_date(date_value or "")
+        except ValueError:
+            date = None
+        if date is None:
+            return JsonResponse(
+                {"detail": "date 는 YYYY-MM-DD 형식이어야 합니다."}, status=400
+            )
+
+        class_row = await sync_to_async(reference.get_class)(request.GET.get("class_id"))
+        if class_row is None:
+            return JsonResponse({"detail": "존재하지 않는 반입니다."}, status=400)
+        if (
+            user.role in [User.Role.TEACHER, User.Role.ASSISTANT]
+            and class_row["name"] != "퇴원"
+            and class_row["subject_id"] not in user.get_subject_ids()
+        ):
+            return JsonResponse(
+                {"detail": "자신의 과목의 반만 구독할 수 있습니다."}, status=403
+            )
+
+        key = topic_key(class_row["id"], date)
+        since = parse_event_id(request.headers.get("Last-Event-ID"))
+        response = StreamingHttpResponse(
+            self._stream(key, since), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        # nginx 등 프록시가 이벤트를 모아서 보내지 않도록 함
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    async def _stream(self, key, since):
+        subscription = broker.subscribe(key)
+        try:
+            yield "retry: 3000\n\n"
+            if since is not None:
+                for event in await catch_up(key, since):
+                    yield _format(event, since)
+            while True:
+                try:
+                    event_since, event = await asyncio.wait_for(
+                        subscription.queue.get(), settings.EVENTS_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _format(event, event_since)
+        finally:
+            broker.unsubscribe(key, subscription)
@@ -5,12 +5,14 @@ from django.db.models import Avg, Max, Min, Count
 from django.conf import settings
 from datetime import date
 import requests
-import calendar
 
-from ..models import User, Class, Student, Attendance, Exam, Subject
+from ..metrics import registry as metrics
+from ..models import User, Student, Attendance, Exam, Subject
+from ..reports import cached_dashboard, subject_scope
 
 
 from rest_framework import permissions, status, viewsets
+from ..caching import reference
 from ..serializers import SubjectSerializer
 
 
@@ -19,6 +21,10 @@ class SubjectViewSet(viewsets.ModelViewSet):
     serializer_class = SubjectSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def list(self, request, *args, **kwargs):
+        # 과목 목록은 참조 데이터 캐시에서 반환 (SubjectSerializer 와 같은 필드)
+        return Response(reference.subjects())
+
     def create(self, request, *args, **kwargs):
         if request.user.role != User.Role.ADMIN and not request.user.is_superuser:
             return Response(
@@ -64,37 +70,18 @@ class SubjectViewSet(viewsets.ModelViewSet):
 
 class DashboardView(APIView):
     """
-    학원 대시보드 통계 뷰
+    학원 대시보드 통계 뷰 (집계와 캐시는 reports 모듈)
     """
 
     permission_classes = [permissions.IsAuthenticated]
+    replica_actions = {"get"}
 
     def get(self, request):
-        user = request.user
         class_id = request.query_params.get("class_id")
         month_param = request.query_params.get("month")
 
         target_month = self._parse_target_month(month_param)
-        classes = self._get_accessible_classes(user)
-
-        response_data = {
-            "class_stats": self._get_class_list_stats(classes),
-            "attendance_stats": [],
-            "grade_stats": [],
-        }
-
-        if class_id:
-            selected_class = classes.filter(id=class_id).first()
-            if selected_class:
-                first_day, last_day = self._get_month_range(target_month)
-                response_data["attendance_stats"] = self._get_attendance_stats(
-                    selected_class, first_day, last_day
-                )
-                response_data["grade_stats"] = self._get_grade_stats(
-                    selected_class, first_day, last_day
-                )
-
-        return Response(response_data)
+        return Response(cached_dashboard(subject_scope(request.user), target_month, class_id))
 
     def _parse_target_month(self, month_param):
         if month_param:
@@ -105,79 +92,6 @@ class DashboardView(APIView):
                 pass
         return date.today().replace(day=1)
 
-    def _get_accessible_classes(self, user):
-        classes = Class.objects.all()
-        if user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
-            from django.db.models import Q
-
-            return classes.filter(Q(subject__in=user.subjects.all()) | Q(name="퇴원"))
-        return classes
-
-    def _get_class_list_stats(self, classes):
-        return [
-            {
-                "id": c.id,
-                "name": c.name,
-                "subject": c.subject.name if c.subject else "과목없음",
-                "student_count": c.students.count(),
-            }
-            for c in classes
-        ]
-
-    def _get_month_range(self, target_month):
-        first_day = target_month.replace(day=1)
-        last_day = target_month.replace(
-            day=calendar.monthrange(target_month.year, target_month.month)[1]
-        )
-        return first_day, last_day
-
-    def _get_attendance_stats(self, selected_class, first_day, last_day):
-        attendances = Attendance.objects.filter(
-            class_info=selected_class, date__range=(first_day, last_day)
-        ).order_by("date")
-
-        total_students = selected_class.students.count()
-        stats_by_date = {}
-
-        for att in attendances:
-            d_str = att.date.strftime("%Y-%m-%d")
-            if d_str not in stats_by_date:
-                stats_by_date[d_str] = {"present": 0, "late": 0, "absent": 0}
-
-            if att.is_late:
-                stats_by_date[d_str]["late"] += 1
-            else:
-                stats_by_date[d_str]["present"] += 1
-
-        result = []
-        for d_str, counts in sorted(stats_by_date.items()):
-            counts["absent"] = total_students - (counts["present"] + counts["late"])
-            result.append({"date": d_str, **counts})
-        return result
-
-    def _get_grade_stats(self, selected_class, first_day, last_day):
-        recent_exams = Exam.objects.filter(
-            attendance__class_info=selected_class,
-            attendance__date__range=(first_day, last_day),
-        ).exclude(score__isnull=True)
-
-        exam_groups = {}
-        for exam in recent_exams:
-            if exam.name not in exam_groups:
-                exam_groups[exam.name] = []
-            exam_groups[exam.name].append(exam.score)
-
-        return [
-            {
-                "exam_name": name,
-                "average": sum(scores) // len(scores) if scores else 0,
-                "highest": max(scores) if scores else 0,
-                "lowest": min(scores) if scores else 0,
-                "count": len(scores),
-            }
-            for name, scores in exam_groups.items()
-        ]
-
 
 class AlimtalkService:
     """
@@ -191,7 +105,14 @@ class AlimtalkService:
         self.template_id = settings.BIZM_TEMPLATE_ID
         self.headers = {"Content-type": "application/json", "userid": self.user_id}
 
-    def send(self, notification_data, retry=True):
+    def send(self, notification_data, retry=True, label=None):
+        """label 은 메트릭에 기록할 (뷰, 액션)"""
+        sent = self._send(notification_data, retry)
+        view, action = label or ("unmatched", "")
+        metrics.record_alimtalk(view, action, "single", "success" if sent else "failure")
+        return sent
+
+    def _send(self, notification_data, retry=True):
         payload = self._build_payload(notification_data)
         if not payload:
             return False
@@ -209,13 +130,13 @@ class AlimtalkService:
                 return True
 
             if retry:
-                return self.send(notification_data, retry=False)
+                return self._send(notification_data, retry=False)
         except:
             if retry:
-                return self.send(notification_data, retry=False)
+                return self._send(notification_data, retry=False)
         return False
 
-    def send_bulk(self, bulk_data):
+    def send_bulk(self, bulk_data, label=None):
         valid_items = []
         for idx, item in enumerate(bulk_data):
             p = self._build_payload(item)
@@ -252,6 +173,12 @@ class AlimtalkService:
             for idx in final_failed_indices:
                 failed_items.append(bulk_data[idx])
 
+        view, action = label or ("unmatched", "")
+        metrics.record_alimtalk(view, action, "bulk", "success", success_count)
+        metrics.record_alimtalk(view, action, "bulk", "failure", len(failed_items))
+        metrics.record_alimtalk(
+            view, action, "bulk", "skipped", len(bulk_data) - len(valid_items)
+        )
         return success_count, failed_items
 
     def _post_chunk(self, chunk, failed_log):
@@ -273,7 +200,11 @@ class AlimtalkService:
             return 0
 
     def _build_payload(self, data):
-        phone = self._format_phone(data["student"]["parent_phone"])
+        # 저장된 E.164 번호(+8210...)를 우선 사용하고, 없으면 기존 방식으로 변환
+        e164 = data["student"].get("parent_phone_e164")
+        phone = e164.lstrip("+") if e164 else self._format_phone(
+            data["student"]["parent_phone"]
+        )
         if not phone:
             return None
 
@@ -355,6 +286,10 @@ class KakaoNotificationView(APIView):
         except Exception as e:
             return Response({"detail": str(e)}, status=500)
 
+    def _metrics_label(self, request):
+        # MetricsMiddleware 가 요청에 붙인 (뷰, 액션), 미들웨어가 꺼져 있으면 직접 계산
+        return getattr(request, "_metrics_view", (type(self).__name__, request.method.lower()))
+
     def _handle_single(self, request):
         s_id, a_id = request.data.get("student_id"), request.data.get("attendance_id")
         if not s_id or not a_id:
@@ -369,15 +304,13 @@ class KakaoNotificationView(APIView):
         # 권한 체크
         if request.user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
             if attendance.class_info:
-                if not request.user.subjects.filter(
-                    id=attendance.class_info.subject_id
-                ).exists():
+                if not request.user.has_subject(attendance.class_info.subject_id):
                     return Response({"detail": "권한이 없습니다."}, status=403)
             elif attendance.class_info and attendance.class_info.name != "퇴원":
                 return Response({"detail": "권한이 없습니다."}, status=403)
 
         data = self._prepare_notification_data(student, attendance)
-        if self.alimtalk.send(data):
+        if self.alimtalk.send(data, label=self._metrics_label(request)):
             return Response({"message": f"{student.name} 학생 전송 성공", "data": data})
         return Response({"detail": "발송 실패"}, status=500)
 
@@ -392,7 +325,7 @@ class KakaoNotificationView(APIView):
             from django.db.models import Q
 
             students = students.filter(
-                Q(classes__subject__in=request.user.subjects.all())
+                Q(classes__subject__in=request.user.get_subject_ids())
                 | Q(classes__name="퇴원")
             ).distinct()
 
@@ -404,9 +337,7 @@ class KakaoNotificationView(APIView):
             if att and request.user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
                 if (
                     att.class_info
-                    and not request.user.subjects.filter(
-                        id=att.class_info.subject_id
-                    ).exists()
+                    and not request.user.has_subject(att.class_info.subject_id)
                     and att.class_info.name != "퇴원"
                 ):
                     continue
@@ -420,7 +351,9 @@ class KakaoNotificationView(APIView):
         if request.data.get("preview"):
             return Response(bulk_data)
 
-        success_count, failed_items = self.alimtalk.send_bulk(bulk_data)
+        success_count, failed_items = self.alimtalk.send_bulk(
+            bulk_data, label=self._metrics_label(request)
+        )
         return Response(
             {
                 "message": f"{success_count}명 전송 성공",
@@ -464,6 +397,7 @@ class KakaoNotificationView(APIView):
                 "id": student.id,
                 "name": student.name,
                 "parent_phone": student.parent_phone,
+                "parent_phone_e164": student.parent_phone_e164,
             },
             "attendance": {
                 "id": attendance.id,
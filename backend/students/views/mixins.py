@@ -0,0 +1,122 @@
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from ..caching import reference
+from ..models import Tombstone
+
+
+class ConditionalGetMixin:
+    """
+    목록/상세 조회에 ETag, Last-Modified 를 붙이고, 변경이 없으면 직렬화 전에 304 를 반환
+
+    검증값은 역할 범위가 적용된 queryset 의 MAX(updated_at) 과 행 수로 계산한다.
+    삭제는 updated_at 을 바꾸지 않으므로 마지막 삭제 기록(Tombstone)의 시각도 함께 반영한다.
+    응답에 포함되는 연관 테이블의 변경도 반영하려면 validator_fields 에
+    "student__updated_at" 처럼 연관 필드를 추가하거나 get_validator_querysets 를 재정의한다.
+    """
+
+    validator_fields = ["updated_at"]
+
+    def get_validator_querysets(self, pk=None):
+        """(queryset, updated_at 필드 목록) 쌍의 목록"""
+        queryset = self.filter_queryset(self.get_queryset())
+        if pk is not None:
+            queryset = queryset.filter(pk=pk)
+        return [(queryset, self.validator_fields)]
+
+    def list(self, request, *args, **kwargs):
+        validators = self._compute_validators()
+        not_modified = self._not_modified_response(request, *validators)
+        if not_modified is not None:
+            return not_modified
+        return self._set_validator_headers(
+            super().list(request, *args, **kwargs), *validators
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            validators = self._compute_validators(pk=kwargs.get(lookup_url_kwarg))
+        except (ValueError, TypeError, ValidationError):
+            # "/api/students/abc/" 처럼 잘못된 id 는 get_object() 와 같이 404 로 처리
+            raise Http404
+        not_modified = self._not_modified_response(request, *validators)
+        if not_modified is not None:
+            return not_modified
+        return self._set_validator_headers(
+            super().retrieve(request, *args, **kwargs), *validators
+        )
+
+    def _compute_validators(self, pk=None):
+        parts = []
+        last_modified = None
+        for queryset, fields in self.get_validator_querysets(pk=pk):
+            aggregates = {f"last_{i}": Max(field) for i, field in enumerate(fields)}
+            result = queryset.order_by().aggregate(
+                count=Count("pk", distinct=True), **aggregates
+            )
+            parts.append(str(result["count"]))
+            for i in range(len(fields)):
+                value = result[f"last_{i}"]
+                parts.append(value.isoformat() if value else "")
+                if value and (last_modified is None or value > last_modified):
+                    last_modified = value
+
+        # 삭제만 있었다면 MAX(updated_at) 이 그대로라 If-Modified-Since 만 보내는 요청에 304 가 나감
+        deleted_at = Tombstone.objects.aggregate(last=Max("deleted_at"))["last"]
+        parts.append(deleted_at.isoformat() if deleted_at else "")
+        if deleted_at and (last_modified is None or deleted_at > last_modified):
+            last_modified = deleted_at
+
+        # 같은 데이터라도 사용자(역할, 과목)와 응답 형식에 따라 표현이 달라진다
+        user = self.request.user
+        parts.extend(
+            [
+                self.request.get_full_path(),
+                str(user.pk),
+                user.role,
+                ",".join(str(pk) for pk in sorted(user.get_subject_ids())),
+                # 과목 이름 등 참조 데이터 변경은 updated_at 에 잡히지 않음
+                str(reference.version()),
+                getattr(self.request, "accepted_media_type", ""),
+            ]
+        )
+        digest = hashlib.md5("|".join(parts).encode(), usedforsecurity=False)
+        etag = f'W/"{digest.hexdigest()}"'
+        return etag, last_modified
+
+    def _not_modified_response(self, request, etag, last_modified):
+        return get_conditional_response(
+            request._request,
+            etag=etag,
+            last_modified=int(last_modified.timestamp()) if last_modified else None,
+        )
+
+    def _set_validator_headers(self, response, etag, last_modified):
+        if response.status_code == 200:
+            response["ETag"] = etag
+            if last_modified:
+                response["Last-Modified"] = http_date(last_modified.timestamp())
+            # 공유 캐시에는 저장하지 않고, 브라우저는 매번 재검증하도록 함
+            response["Cache-Control"] = "private, no-cache"
+        return response
+
+
+class ValuesListMixin:
+    """
+    목록 조회를 serializer 대신 values() 기반 행 생성 함수로 처리
+
+    list_rows 는 queryset 을 받아 serializer 와 같은 모양의 dict 목록을 반환한다.
+    """
+
+    list_rows = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(type(self).list_rows(queryset))
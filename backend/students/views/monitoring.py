@@ -0,0 +1,54 @@
+from rest_framework import permissions, renderers
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+
+from ..metrics import registry
+from ..models import User
+
+
+class IsMetricsScraper(permissions.BasePermission):
+    """
+    METRICS_TOKEN 으로 인증된 수집기 또는 관리자만 허용
+    """
+
+    def has_permission(self, request, view):
+        token = settings.METRICS_TOKEN
+        if token:
+            header = request.META.get("HTTP_AUTHORIZATION", "")
+            if constant_time_compare(header, f"Bearer {token}"):
+                return True
+
+        user = request.user
+        return bool(
+            user
+            and user.is_authenticated
+            and (user.role == User.Role.ADMIN or user.is_superuser)
+        )
+
+
+class PrometheusTextRenderer(renderers.BaseRenderer):
+    media_type = "text/plain"
+    format = "txt"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            # 인증 실패 등 오류 응답은 detail 메시지만 출력
+            data = data.get("detail", "")
+        return str(data).encode(self.charset)
+
+
+class MetricsView(APIView):
+    """
+    Prometheus 텍스트 포맷 메트릭 엔드포인트
+    """
+
+    permission_classes = [IsMetricsScraper]
+    renderer_classes = [PrometheusTextRenderer]
+
+    def get(self, request):
+        return Response(
+            registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
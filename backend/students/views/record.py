@@ -1,23 +1,33 @@
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Avg, Max, Min, Count, Q
-
-from ..models import User, Attendance, Exam, Class
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+
+from ..caching import reference
+from ..deletion import delete_attendance
+from ..exam_stats import exam_rankings
+from ..models import User, Attendance, Exam
+from ..readers import attendance_rows, exam_rows
+from ..reports import cached_exam_averages, subject_scope
 from ..serializers import AttendanceSerializer, ExamSerializer
+from .mixins import ConditionalGetMixin, ValuesListMixin
 
 
-class AttendanceViewSet(viewsets.ModelViewSet):
+class AttendanceViewSet(ConditionalGetMixin, ValuesListMixin, viewsets.ModelViewSet):
     queryset = Attendance.objects.all()
     serializer_class = AttendanceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    validator_fields = ["updated_at", "student__updated_at", "class_info__updated_at"]
+    replica_actions = {"list"}
+    list_rows = staticmethod(attendance_rows)
 
     def get_queryset(self):
-        queryset = Attendance.objects.all()
+        queryset = Attendance.objects.select_related("student", "class_info")
         user = self.request.user
 
         if user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
-            user_subjects = user.subjects.all()
+            user_subjects = user.get_subject_ids()
             queryset = queryset.filter(Q(class_info__subject__in=user_subjects) | Q(class_info__name="퇴원"))
 
         student_id = self.request.query_params.get("student_id", None)
@@ -38,21 +48,20 @@ class AttendanceViewSet(viewsets.ModelViewSet):
 
     def create(self, request, *args, **kwargs):
         if request.user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
-            user_subjects = request.user.subjects.all()
+            user_subjects = request.user.get_subject_ids()
             class_id = request.data.get("class_info")
             if class_id:
-                try:
-                    class_obj = Class.objects.get(id=class_id)
-                    if class_obj.name != "퇴원" and class_obj.subject not in user_subjects:
-                        return Response(
-                            {"detail": "자신의 과목의 반에 대한 출석 기록만 생성할 수 있습니다."},
-                            status=status.HTTP_403_FORBIDDEN,
-                        )
-                except Class.DoesNotExist:
+                class_row = reference.get_class(class_id)
+                if class_row is None:
                     return Response(
                         {"detail": "존재하지 않는 반입니다."},
                         status=status.HTTP_400_BAD_REQUEST,
                     )
+                if class_row["name"] != "퇴원" and class_row["subject_id"] not in user_subjects:
+                    return Response(
+                        {"detail": "자신의 과목의 반에 대한 출석 기록만 생성할 수 있습니다."},
+                        status=status.HTTP_403_FORBIDDEN,
+                    )
 
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
@@ -62,9 +71,9 @@ class AttendanceViewSet(viewsets.ModelViewSet):
 
     def update(self, request, *args, **kwargs):
         if request.user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
-            user_subjects = request.user.subjects.all()
+            user_subjects = request.user.get_subject_ids()
             instance = self.get_object()
-            if instance.class_info and instance.class_info.name != "퇴원" and instance.class_info.subject not in user_subjects:
+            if instance.class_info and instance.class_info.name != "퇴원" and instance.class_info.subject_id not in user_subjects:
                 return Response(
                     {"detail": "자신의 과목의 학생의 출석 기록만 수정할 수 있습니다."},
                     status=status.HTTP_403_FORBIDDEN,
@@ -74,9 +83,9 @@ class AttendanceViewSet(viewsets.ModelViewSet):
 
     def partial_update(self, request, *args, **kwargs):
         if request.user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
-            user_subjects = request.user.subjects.all()
+            user_subjects = request.user.get_subject_ids()
             instance = self.get_object()
-            if instance.class_info and instance.class_info.name != "퇴원" and instance.class_info.subject not in user_subjects:
+            if instance.class_info and instance.class_info.name != "퇴원" and instance.class_info.subject_id not in user_subjects:
                 return Response(
                     {"detail": "자신의 과목의 학생의 출석 기록만 수정할 수 있습니다."},
                     status=status.HTTP_403_FORBIDDEN,
@@ -85,19 +94,16 @@ class AttendanceViewSet(viewsets.ModelViewSet):
         return super().partial_update(request, *args, **kwargs)
 
     def destroy(self, request, *args, **kwargs):
+        instance = self.get_object()
         if request.user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
-            user_subjects = request.user.subjects.all()
-            instance = self.get_object()
-            if instance.class_info and instance.class_info.name != "퇴원" and instance.class_info.subject not in user_subjects:
+            user_subjects = request.user.get_subject_ids()
+            if instance.class_info and instance.class_info.name != "퇴원" and instance.class_info.subject_id not in user_subjects:
                 return Response(
                     {"detail": "자신의 과목의 학생의 출석 기록만 삭제할 수 있습니다."},
                     status=status.HTTP_403_FORBIDDEN,
                 )
 
-        instance = self.get_object()
-        exam_count = instance.exam_set.count()
-        instance.exam_set.all().delete()
-        instance.delete()
+        exam_count = delete_attendance(instance)
 
         return Response(
             {
@@ -107,17 +113,26 @@ class AttendanceViewSet(viewsets.ModelViewSet):
         )
 
 
-class ExamViewSet(viewsets.ModelViewSet):
+class ExamViewSet(ConditionalGetMixin, ValuesListMixin, viewsets.ModelViewSet):
     queryset = Exam.objects.all()
     serializer_class = ExamSerializer
     permission_classes = [permissions.IsAuthenticated]
+    validator_fields = [
+        "updated_at",
+        "attendance__updated_at",
+        "attendance__student__updated_at",
+    ]
+    list_rows = staticmethod(exam_rows)
+    replica_actions = {"list", "exam_averages", "rankings"}
 
     def get_queryset(self):
-        queryset = Exam.objects.all()
+        queryset = Exam.objects.select_related(
+            "attendance__student", "attendance__class_info"
+        )
         user = self.request.user
 
         if user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
-            user_subjects = user.subjects.all()
+            user_subjects = user.get_subject_ids()
             queryset = queryset.filter(
                 Q(attendance__class_info__subject__in=user_subjects) | Q(attendance__class_info__name="퇴원")
             )
@@ -137,41 +152,103 @@ class ExamViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=["get"])
     def exam_averages(self, request):
-        user = request.user
+        """
+        시험(이름, 종류)별 통계
+
+        필터: class_id, subject, date_from, date_to (출석 날짜 기준, YYYY-MM-DD)
+        """
         class_id = request.query_params.get("class_id", None)
+        subject_id = request.query_params.get("subject", None)
+
+        date_range = {}
+        for param in ("date_from", "date_to"):
+            value = request.query_params.get(param)
+            if not value:
+                continue
+            try:
+                parsed = parse_date(value)
+            except ValueError:
+                parsed = None
+            if parsed is None:
+                return Response(
+                    {"detail": f"{param} 는 YYYY-MM-DD 형식이어야 합니다."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            date_range[param] = parsed
 
-        queryset = Exam.objects.all()
+        return Response(
+            cached_exam_averages(
+                subject_scope(request.user),
+                class_id=class_id,
+                subject_id=subject_id,
+                date_from=date_range.get("date_from"),
+                date_to=date_range.get("date_to"),
+            )
+        )
 
-        if user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
-            user_subjects = user.subjects.all()
-            queryset = queryset.filter(
-                Q(attendance__class_info__subject__in=user_subjects) | Q(attendance__class_info__name="퇴원")
+    @action(detail=False, methods=["get"])
+    def rankings(self, request):
+        """
+        시험 하나에 대한 학생별 석차, 백분위, 표준점수
+
+        name 은 필수이고, 비교 범위는 class_id(반) 또는 subject(과목의 모든 반) 중 하나로 지정한다.
+        category 를 주면 같은 이름의 다른 종류 시험을 제외한다.
+        """
+        name = request.query_params.get("name")
+        category = request.query_params.get("category")
+        class_id = request.query_params.get("class_id")
+        subject_id = request.query_params.get("subject")
+
+        if not name:
+            return Response(
+                {"detail": "시험 이름(name)을 지정해주세요."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        scope = class_id or subject_id
+        if bool(class_id) == bool(subject_id) or not scope.isdigit():
+            return Response(
+                {"detail": "class_id 와 subject 중 하나만 숫자로 지정해주세요."},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
+        queryset = self._scoped_exams(request.user).filter(name=name)
+        if category:
+            queryset = queryset.filter(category=category)
         if class_id:
             queryset = queryset.filter(attendance__class_info_id=class_id)
+        else:
+            queryset = queryset.filter(attendance__class_info__subject_id=subject_id)
 
-        exam_stats = (
-            queryset.values("name")
-            .annotate(
-                average_score=Avg("score"),
-                max_score=Max("score"),
-                min_score=Min("score"),
-                count=Count("id"),
-            )
-            .order_by("name")
+        summary, results = exam_rankings(queryset)
+        return Response(
+            {
+                "name": name,
+                "category": category,
+                "class_id": int(class_id) if class_id else None,
+                "subject": int(subject_id) if subject_id else None,
+                **summary,
+                "results": results,
+            }
         )
 
-        return Response(exam_stats)
+    def _scoped_exams(self, user):
+        """역할 범위가 적용된 시험 queryset (목록 조회용 필터/정렬 없이)"""
+        queryset = Exam.objects.all()
+        if user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
+            user_subjects = user.get_subject_ids()
+            queryset = queryset.filter(
+                Q(attendance__class_info__subject__in=user_subjects) | Q(attendance__class_info__name="퇴원")
+            )
+        return queryset
 
     def create(self, request, *args, **kwargs):
         if request.user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
-            user_subjects = request.user.subjects.all()
+            user_subjects = request.user.get_subject_ids()
             attendance_id = request.data.get("attendance")
             if attendance_id:
                 try:
                     attendance = Attendance.objects.get(id=attendance_id)
-                    if attendance.class_info and attendance.class_info.name != "퇴원" and attendance.class_info.subject not in user_subjects:
+                    if attendance.class_info and attendance.class_info.name != "퇴원" and attendance.class_info.subject_id not in user_subjects:
                         return Response(
                             {
                                 "detail": "자신의 과목의 학생의 시험 기록만 생성할 수 있습니다."
@@ -192,9 +269,9 @@ class ExamViewSet(viewsets.ModelViewSet):
 
     def update(self, request, *args, **kwargs):
         if request.user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
-            user_subjects = request.user.subjects.all()
+            user_subjects = request.user.get_subject_ids()
             instance = self.get_object()
-            if instance.attendance.class_info and instance.attendance.class_info.name != "퇴원" and instance.attendance.class_info.subject not in user_subjects:
+            if instance.attendance.class_info and instance.attendance.class_info.name != "퇴원" and instance.attendance.class_info.subject_id not in user_subjects:
                 return Response(
                     {"detail": "자신의 과목의 학생의 시험 기록만 수정할 수 있습니다."},
                     status=status.HTTP_403_FORBIDDEN,
@@ -204,9 +281,9 @@ class ExamViewSet(viewsets.ModelViewSet):
 
     def partial_update(self, request, *args, **kwargs):
         if request.user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
-            user_subjects = request.user.subjects.all()
+            user_subjects = request.user.get_subject_ids()
             instance = self.get_object()
-            if instance.attendance.class_info and instance.attendance.class_info.name != "퇴원" and instance.attendance.class_info.subject not in user_subjects:
+            if instance.attendance.class_info and instance.attendance.class_info.name != "퇴원" and instance.attendance.class_info.subject_id not in user_subjects:
                 return Response(
                     {"detail": "자신의 과목의 학생의 시험 기록만 수정할 수 있습니다."},
                     status=status.HTTP_403_FORBIDDEN,
@@ -216,9 +293,9 @@ class ExamViewSet(viewsets.ModelViewSet):
 
     def destroy(self, request, *args, **kwargs):
         if request.user.role in [User.Role.TEACHER, User.Role.ASSISTANT]:
-            user_subjects = request.user.subjects.all()
+            user_subjects = request.user.get_subject_ids()
             instance = self.get_object()
-            if instance.attendance.class_info and instance.attendance.class_info.name != "퇴원" and instance.attendance.class_info.subject not in user_subjects:
+            if instance.attendance.class_info and instance.attendance.class_info.name != "퇴원" and instance.attendance.class_info.subject_id not in user_subjects:
                 return Response(
                     {"detail": "자신의 과목의 학생의 시험 기록만 삭제할 수 있습니다."},
                     status=status.HTTP_403_FORBIDDEN,
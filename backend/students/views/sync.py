@@ -0,0 +1,37 @@
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..sync import changes_since
+
+
+class SyncView(APIView):
+    """
+    학생/출석/시험 증분 동기화
+
+    GET /api/sync/?since=<이전 응답의 watermark>
+    since 없이 호출하면 reset 과 시작 watermark 만 반환하므로, 목록 전체를 불러오기 전에 호출한다.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        since = None
+        value = request.query_params.get("since")
+        if value:
+            try:
+                # 인코딩하지 않은 "+09:00" 의 + 는 쿼리 문자열에서 공백이 됨
+                since = parse_datetime(value.replace(" ", "+"))
+            except ValueError:
+                since = None
+            if since is None:
+                return Response(
+                    {"detail": "since 는 ISO 8601 날짜시간 형식이어야 합니다."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        return Response(changes_since(request.user, since, {"request": request}))